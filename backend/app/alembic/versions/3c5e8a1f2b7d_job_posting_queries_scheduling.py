@@ -0,0 +1,55 @@
+"""job posting queries scheduling
+
+Revision ID: 3c5e8a1f2b7d
+Revises: 946e63009473
+Create Date: 2024-08-05 10:12:31.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '3c5e8a1f2b7d'
+down_revision = '946e63009473'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep a single row per url before making it unique
+    op.execute(
+        """
+        DELETE FROM job_posting_queries a
+        USING job_posting_queries b
+        WHERE a.url = b.url AND a.id > b.id
+        """
+    )
+    op.create_unique_constraint('uq_job_posting_queries_url', 'job_posting_queries', ['url'])
+    op.add_column('job_posting_queries', sa.Column('is_active', sa.Boolean(), server_default=sa.true(), nullable=False))
+    op.add_column('job_posting_queries', sa.Column('priority', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('job_posting_queries', sa.Column('refresh_interval_minutes', sa.Integer(), server_default='60', nullable=False))
+    op.add_column('job_posting_queries', sa.Column('next_run_at', sa.DateTime(), nullable=True))
+    op.add_column('job_posting_queries', sa.Column('last_run_at', sa.DateTime(), nullable=True))
+    op.add_column('job_posting_queries', sa.Column('last_run_new_ids', sa.Integer(), nullable=True))
+    op.add_column('job_posting_queries', sa.Column('last_run_duration_seconds', sa.Float(), nullable=True))
+    op.add_column('job_posting_queries', sa.Column('total_runs', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('job_posting_queries', sa.Column('total_new_ids', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('job_posting_queries', sa.Column('date_created', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+    op.create_index(op.f('ix_job_posting_queries_next_run_at'), 'job_posting_queries', ['next_run_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_job_posting_queries_next_run_at'), table_name='job_posting_queries')
+    op.drop_column('job_posting_queries', 'date_created')
+    op.drop_column('job_posting_queries', 'total_new_ids')
+    op.drop_column('job_posting_queries', 'total_runs')
+    op.drop_column('job_posting_queries', 'last_run_duration_seconds')
+    op.drop_column('job_posting_queries', 'last_run_new_ids')
+    op.drop_column('job_posting_queries', 'last_run_at')
+    op.drop_column('job_posting_queries', 'next_run_at')
+    op.drop_column('job_posting_queries', 'refresh_interval_minutes')
+    op.drop_column('job_posting_queries', 'priority')
+    op.drop_column('job_posting_queries', 'is_active')
+    op.drop_constraint('uq_job_posting_queries_url', 'job_posting_queries', type_='unique')
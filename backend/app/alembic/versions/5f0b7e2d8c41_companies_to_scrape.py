@@ -0,0 +1,62 @@
+"""companies to scrape
+
+Revision ID: 5f0b7e2d8c41
+Revises: e4a9c7d1f356
+Create Date: 2024-08-14 16:21:37.904512
+
+"""
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '5f0b7e2d8c41'
+down_revision = 'e4a9c7d1f356'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('companies_to_scrape',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('company_url', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), server_default='pending', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.Column('last_error', sa.TEXT(), nullable=True),
+    sa.Column('date_created', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.Column('date_scraped', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('company_url', name='uq_companies_to_scrape_company_url')
+    )
+    op.create_index(
+        'ix_companies_to_scrape_due',
+        'companies_to_scrape',
+        ['next_attempt_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+    # Seed the queue with the companies of the stored job postings, the ones
+    # already in institutions are done
+    op.execute(
+        """
+        INSERT INTO companies_to_scrape (company_url, status, date_scraped)
+        SELECT DISTINCT
+            job_postings.company_url,
+            CASE WHEN institutions.id IS NULL THEN 'pending' ELSE 'done' END,
+            institutions.date_created
+        FROM job_postings
+        LEFT JOIN LATERAL (
+            SELECT id, date_created FROM institutions
+            WHERE institutions.url = job_postings.company_url
+            LIMIT 1
+        ) AS institutions ON TRUE
+        WHERE job_postings.company_url IS NOT NULL
+        """
+    )
+
+
+def downgrade():
+    op.drop_index('ix_companies_to_scrape_due', table_name='companies_to_scrape')
+    op.drop_table('companies_to_scrape')
@@ -0,0 +1,40 @@
+"""job postings to scrape leasing
+
+Revision ID: 7d2f4c9b1e08
+Revises: 3c5e8a1f2b7d
+Create Date: 2024-08-07 18:40:02.117845
+
+"""
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '7d2f4c9b1e08'
+down_revision = '3c5e8a1f2b7d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('job_postings_to_scrape', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('job_postings_to_scrape', sa.Column('leased_by', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('job_postings_to_scrape', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+    op.add_column('job_postings_to_scrape', sa.Column('dead_lettered', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('job_postings_to_scrape', sa.Column('last_error', sa.TEXT(), nullable=True))
+    op.create_index(
+        'ix_job_postings_to_scrape_pending',
+        'job_postings_to_scrape',
+        ['id'],
+        unique=False,
+        postgresql_where=sa.text('NOT processed AND NOT dead_lettered'),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_job_postings_to_scrape_pending', table_name='job_postings_to_scrape')
+    op.drop_column('job_postings_to_scrape', 'last_error')
+    op.drop_column('job_postings_to_scrape', 'dead_lettered')
+    op.drop_column('job_postings_to_scrape', 'lease_expires_at')
+    op.drop_column('job_postings_to_scrape', 'leased_by')
+    op.drop_column('job_postings_to_scrape', 'attempts')
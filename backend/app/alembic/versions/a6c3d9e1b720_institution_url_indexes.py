@@ -0,0 +1,25 @@
+"""institution url indexes
+
+Revision ID: a6c3d9e1b720
+Revises: 5f0b7e2d8c41
+Create Date: 2024-08-16 10:48:52.671309
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'a6c3d9e1b720'
+down_revision = '5f0b7e2d8c41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Both sides of the url join used to set job_postings.institution_id
+    op.create_index('ix_institutions_url', 'institutions', ['url'], unique=False)
+    op.create_index('ix_job_postings_company_url', 'job_postings', ['company_url'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_job_postings_company_url', table_name='job_postings')
+    op.drop_index('ix_institutions_url', table_name='institutions')
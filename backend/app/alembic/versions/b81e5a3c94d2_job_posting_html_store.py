@@ -0,0 +1,135 @@
+"""job posting html store
+
+Revision ID: b81e5a3c94d2
+Revises: 7d2f4c9b1e08
+Create Date: 2024-08-09 11:02:45.318264
+
+"""
+import hashlib
+import zlib
+from datetime import datetime
+
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'b81e5a3c94d2'
+down_revision = '7d2f4c9b1e08'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+job_postings = sa.table(
+    'job_postings',
+    sa.column('id', sa.Integer),
+    sa.column('html', sa.TEXT),
+    sa.column('html_hash', sa.String),
+)
+job_posting_html = sa.table(
+    'job_posting_html',
+    sa.column('hash', sa.String),
+    sa.column('compression', sa.String),
+    sa.column('content', sa.LargeBinary),
+    sa.column('size', sa.Integer),
+    sa.column('date_created', sa.DateTime),
+)
+
+
+def upgrade():
+    op.create_table('job_posting_html',
+    sa.Column('hash', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('compression', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('content', sa.LargeBinary(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('date_created', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    op.add_column('job_postings', sa.Column('html_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_foreign_key('job_postings_html_hash_fkey', 'job_postings', 'job_posting_html', ['html_hash'], ['hash'])
+
+    # Move the existing pages to the new table in batches. They are compressed
+    # with zlib, which needs no extra dependency, the compression column tells
+    # readers how each page was stored
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(job_postings.c.id, job_postings.c.html)
+            .where(job_postings.c.id > last_id)
+            .where(job_postings.c.html.is_not(None))
+            .order_by(job_postings.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        pages = {}
+        hashes = []
+        for job_posting_id, html in rows:
+            data = html.encode()
+            html_hash = hashlib.sha256(data).hexdigest()
+            hashes.append({'b_id': job_posting_id, 'b_html_hash': html_hash})
+            pages[html_hash] = {
+                'hash': html_hash,
+                'compression': 'zlib',
+                'content': zlib.compress(data, 6),
+                'size': len(data),
+                'date_created': datetime.utcnow(),
+            }
+        connection.execute(
+            postgresql.insert(job_posting_html)
+            .values(list(pages.values()))
+            .on_conflict_do_nothing(index_elements=['hash'])
+        )
+        connection.execute(
+            job_postings.update()
+            .where(job_postings.c.id == sa.bindparam('b_id'))
+            .values(html_hash=sa.bindparam('b_html_hash')),
+            hashes,
+        )
+        last_id = rows[-1][0]
+
+    op.drop_column('job_postings', 'html')
+
+
+def downgrade():
+    op.add_column('job_postings', sa.Column('html', sa.TEXT(), nullable=True))
+
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(
+                job_postings.c.id,
+                job_posting_html.c.compression,
+                job_posting_html.c.content,
+            )
+            .join(job_posting_html, job_posting_html.c.hash == job_postings.c.html_hash)
+            .where(job_postings.c.id > last_id)
+            .order_by(job_postings.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        pages = []
+        for job_posting_id, compression, content in rows:
+            if compression == 'zstd':
+                import zstandard
+
+                data = zstandard.ZstdDecompressor().decompress(content)
+            else:
+                data = zlib.decompress(content)
+            pages.append({'b_id': job_posting_id, 'b_html': data.decode()})
+        connection.execute(
+            job_postings.update()
+            .where(job_postings.c.id == sa.bindparam('b_id'))
+            .values(html=sa.bindparam('b_html')),
+            pages,
+        )
+        last_id = rows[-1][0]
+
+    op.drop_constraint('job_postings_html_hash_fkey', 'job_postings', type_='foreignkey')
+    op.drop_column('job_postings', 'html_hash')
+    op.drop_table('job_posting_html')
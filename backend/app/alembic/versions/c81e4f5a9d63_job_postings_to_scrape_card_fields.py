@@ -0,0 +1,40 @@
+"""job postings to scrape card fields
+
+Revision ID: c81e4f5a9d63
+Revises: a6c3d9e1b720
+Create Date: 2024-08-19 09:12:37.480126
+
+"""
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'c81e4f5a9d63'
+down_revision = 'a6c3d9e1b720'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('job_postings_to_scrape', sa.Column('title', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('job_postings_to_scrape', sa.Column('company', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('job_postings_to_scrape', sa.Column('company_url', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('job_postings_to_scrape', sa.Column('location', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('job_postings_to_scrape', sa.Column('date_posted', sa.DateTime(), nullable=True))
+    op.create_index(
+        'ix_job_postings_to_scrape_pending_date_posted',
+        'job_postings_to_scrape',
+        [sa.text('date_posted DESC NULLS LAST'), 'id'],
+        unique=False,
+        postgresql_where=sa.text('NOT processed AND NOT dead_lettered'),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_job_postings_to_scrape_pending_date_posted', table_name='job_postings_to_scrape')
+    op.drop_column('job_postings_to_scrape', 'date_posted')
+    op.drop_column('job_postings_to_scrape', 'location')
+    op.drop_column('job_postings_to_scrape', 'company_url')
+    op.drop_column('job_postings_to_scrape', 'company')
+    op.drop_column('job_postings_to_scrape', 'title')
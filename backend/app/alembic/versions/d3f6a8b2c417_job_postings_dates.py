@@ -0,0 +1,25 @@
+"""job postings dates
+
+Revision ID: d3f6a8b2c417
+Revises: c81e4f5a9d63
+Create Date: 2024-08-21 15:03:44.918652
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'd3f6a8b2c417'
+down_revision = 'c81e4f5a9d63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('job_postings', sa.Column('date_posted', sa.DateTime(), nullable=True))
+    op.add_column('job_postings', sa.Column('valid_through', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('job_postings', 'valid_through')
+    op.drop_column('job_postings', 'date_posted')
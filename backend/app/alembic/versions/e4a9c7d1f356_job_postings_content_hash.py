@@ -0,0 +1,25 @@
+"""job postings content hash
+
+Revision ID: e4a9c7d1f356
+Revises: b81e5a3c94d2
+Create Date: 2024-08-12 09:27:14.506731
+
+"""
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e4a9c7d1f356'
+down_revision = 'b81e5a3c94d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows get their hash the next time they are scraped
+    op.add_column('job_postings', sa.Column('content_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('job_postings', 'content_hash')
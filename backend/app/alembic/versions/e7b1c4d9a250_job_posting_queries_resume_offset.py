@@ -0,0 +1,23 @@
+"""job posting queries resume offset
+
+Revision ID: e7b1c4d9a250
+Revises: d3f6a8b2c417
+Create Date: 2024-08-23 11:27:05.362418
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e7b1c4d9a250'
+down_revision = 'd3f6a8b2c417'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('job_posting_queries', sa.Column('resume_offset', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('job_posting_queries', 'resume_offset')
@@ -0,0 +1,23 @@
+"""job postings to scrape closed
+
+Revision ID: f2a9c6e1d834
+Revises: e7b1c4d9a250
+Create Date: 2024-08-26 10:14:52.907316
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'f2a9c6e1d834'
+down_revision = 'e7b1c4d9a250'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('job_postings_to_scrape', sa.Column('closed', sa.Boolean(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('job_postings_to_scrape', 'closed')
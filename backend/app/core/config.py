@@ -48,6 +48,10 @@ class Settings(BaseSettings):
 
     PROJECT_NAME: str
     SENTRY_DSN: HttpUrl | None = None
+    # Prometheus metrics of the scrapers, served on a port or written to a
+    # file for the node exporter textfile collector
+    SCRAPER_METRICS_PORT: int | None = None
+    SCRAPER_METRICS_TEXTFILE: str | None = None
     DB_INSTANCE: str
     DB_PORT: int = 5432
     DB_USER: str
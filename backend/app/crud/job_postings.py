@@ -13,6 +13,9 @@ from app.models import (
     SalaryRangeFilters,
     InstitutionSizes,
 )
+from app.scraper.company_scrape_queue import enqueue_companies
+from app.scraper.html_store import load_html, store_html
+from app.scraper.institution_linker import link_institutions
 
 logger = Logger(prefix="JobPostingsCRUD", log_file_name="crud.log").get_logger()
 
@@ -27,6 +30,19 @@ def get_job_posting_by_id(session: Session, job_posting_id: int) -> JobPostings:
     return job_posting
 
 
+def get_job_posting_html(session: Session, job_posting_id: int) -> str | None:
+    """
+    Loads the raw page a job posting was scraped from, which is kept out of the
+    job_postings table
+    """
+    html_hash = session.exec(
+        select(JobPostings.html_hash).where(JobPostings.id == job_posting_id)
+    ).one_or_none()
+    if html_hash is None:
+        return None
+    return load_html(session, html_hash)
+
+
 def get_job_postings_by_similarity(
     session: Session, params: JobQueryParams
 ) -> JobPostings:
@@ -119,8 +135,13 @@ def create_job_posting(*, session: Session, job_posting_in: JobPostings) -> JobP
 def api_create_job_posting(
     session: Session, job_posting: JobPostingCreate
 ) -> JobPostings:
-    db_job_posting = JobPostings.model_validate(job_posting)
+    update = {}
+    if job_posting.html:
+        update["html_hash"] = store_html(session, [job_posting.html])[0]
+    db_job_posting = JobPostings.model_validate(job_posting, update=update)
     session.add(db_job_posting)
+    enqueue_companies(session, [db_job_posting.company_url])
+    link_institutions(session, [db_job_posting.company_url])
     session.commit()
     session.refresh(db_job_posting)
     return db_job_posting
@@ -142,7 +163,7 @@ def get_job_posting_complete_by_id(
         )
         .outerjoin(
             Institutions,
-            JobPostings.company_url == Institutions.url,  # type: ignore
+            JobPostings.institution_id == Institutions.id,  # type: ignore
         )
         .outerjoin(
             InstitutionSizes,
@@ -1,7 +1,7 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import String, TEXT, table
+from sqlalchemy import Index, LargeBinary, String, TEXT, table, text
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.dialects.postgresql import JSON, ARRAY
 from sqlmodel import (
@@ -372,6 +372,8 @@ class InstitutionsPublic(SQLModel):
 
 
 class Institutions(InstitutionBase, table=True):
+    __table_args__ = (Index("ix_institutions_url", "url"),)
+
     id: int = Field(default=None, primary_key=True)
     date_created: datetime = Field(default_factory=datetime.utcnow)
     date_updated: datetime = Field(
@@ -404,6 +406,8 @@ class JobPostingBase(SQLModel):
     job_salary_max: int | None = None
     job_poster_name: str | None = None
     job_poster_profile: str | None = None
+    date_posted: datetime | None = None
+    valid_through: datetime | None = None
     summary: dict | None = Field(sa_column=Column(JSON), default=None)
 
 
@@ -438,12 +442,29 @@ class JobPostingsPublic(SQLModel):
     data: list[JobPostingPublic]
 
 
+class JobPostingHtml(SQLModel, table=True):
+    """Raw job posting pages, compressed and addressed by the sha256 of the html"""
+
+    @declared_attr  # type: ignore
+    def __tablename__(cls) -> str:  # type: ignore
+        return snake_case(cls.__name__)
+
+    hash: str = Field(primary_key=True)
+    compression: str
+    content: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    size: int
+    date_created: datetime = Field(default_factory=datetime.utcnow)
+
+
 class JobPostings(JobPostingBase, table=True):
     @declared_attr  # type: ignore
     def __tablename__(cls) -> str:  # type: ignore
         return snake_case(cls.__name__)
 
-    __table_args__ = (UniqueConstraint("linkedin_id", name="uq_linkedin_id"),)
+    __table_args__ = (
+        UniqueConstraint("linkedin_id", name="uq_linkedin_id"),
+        Index("ix_job_postings_company_url", "company_url"),
+    )
 
     linkedin_id: int | None = Field(sa_column=Column(BigInteger))
     institution_id: int | None = Field(foreign_key="institutions.id", default=None)
@@ -464,7 +485,10 @@ class JobPostings(JobPostingBase, table=True):
         foreign_key="remote_modalities.id", default=None
     )
 
-    html: str | None = Field(sa_column=Column(TEXT))
+    # The raw page lives in job_posting_html, loaded only when asked for
+    html_hash: str | None = Field(default=None, foreign_key="job_posting_html.hash")
+    # Hash of the extracted fields, a re-scrape with the same hash is not written
+    content_hash: str | None = None
     date_created: datetime = Field(default_factory=datetime.utcnow)
     date_updated: datetime = Field(
         default_factory=datetime.utcnow,
@@ -482,7 +506,22 @@ class JobPostingsToScrape(SQLModel, table=True):
     def __tablename__(cls) -> str:  # type: ignore
         return snake_case(cls.__name__)
 
-    __table_args__ = (UniqueConstraint("linkedin_job_id", name="uq_linkedin_job_id"),)
+    __table_args__ = (
+        UniqueConstraint("linkedin_job_id", name="uq_linkedin_job_id"),
+        # Only the rows still waiting to be scraped are looked up when leasing
+        Index(
+            "ix_job_postings_to_scrape_pending",
+            "id",
+            postgresql_where=text("NOT processed AND NOT dead_lettered"),
+        ),
+        # Leasing the newest postings first
+        Index(
+            "ix_job_postings_to_scrape_pending_date_posted",
+            text("date_posted DESC NULLS LAST"),
+            "id",
+            postgresql_where=text("NOT processed AND NOT dead_lettered"),
+        ),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
     linkedin_job_id: int | None = Field(sa_column=Column(BigInteger))
@@ -490,6 +529,52 @@ class JobPostingsToScrape(SQLModel, table=True):
     date_created: datetime = Field(default_factory=datetime.utcnow)
     date_scraped: datetime | None = None
 
+    # Search result card, read when the job id is fetched
+    title: str | None = None
+    company: str | None = None
+    company_url: str | None = None
+    location: str | None = None
+    date_posted: datetime | None = None
+    # The card says the posting no longer accepts applications
+    closed: bool | None = None
+
+    # Work queue
+    attempts: int = 0
+    leased_by: str | None = None
+    lease_expires_at: datetime | None = None
+    dead_lettered: bool = False
+    last_error: str | None = Field(default=None, sa_column=Column(TEXT))
+
+
+class CompaniesToScrape(SQLModel, table=True):
+    """Companies seen in job postings whose LinkedIn page has to be scraped"""
+
+    @declared_attr  # type: ignore
+    def __tablename__(cls) -> str:  # type: ignore
+        return snake_case(cls.__name__)
+
+    __table_args__ = (
+        UniqueConstraint("company_url", name="uq_companies_to_scrape_company_url"),
+        # Only the companies still waiting to be scraped are looked up when leasing
+        Index(
+            "ix_companies_to_scrape_due",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    company_url: str
+    # pending, done or failed, failed companies are never tried again
+    status: str = "pending"
+    attempts: int = 0
+    # Set to the end of the lease while a consumer scrapes the company and
+    # pushed back exponentially after each failure
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    last_error: str | None = Field(default=None, sa_column=Column(TEXT))
+    date_created: datetime = Field(default_factory=datetime.utcnow)
+    date_scraped: datetime | None = None
+
 
 ############# COMPARISONS #############
 
@@ -641,6 +726,8 @@ class JobPostingQueries(SQLModel, table=True):
     def __tablename__(cls) -> str:  # type: ignore
         return snake_case(cls.__name__)
 
+    __table_args__ = (UniqueConstraint("url", name="uq_job_posting_queries_url"),)
+
     id: int | None = Field(default=None, primary_key=True)
     url: str
     keywords: str
@@ -660,6 +747,20 @@ class JobPostingQueries(SQLModel, table=True):
     )
     time_filter_id: int | None = Field(foreign_key="time_filters.id", default=None)
 
+    # Scheduling
+    is_active: bool = True
+    priority: int = 0
+    refresh_interval_minutes: int = 60
+    next_run_at: datetime | None = Field(default=None, index=True)
+    last_run_at: datetime | None = None
+    last_run_new_ids: int | None = None
+    last_run_duration_seconds: float | None = None
+    total_runs: int = 0
+    total_new_ids: int = 0
+    # Offset an interrupted full run resumes from, None once a run completes
+    resume_offset: int | None = None
+    date_created: datetime = Field(default_factory=datetime.utcnow)
+
 
 ######## WORK_EPXERIENCE_EXAMPLES ########
 
@@ -0,0 +1,154 @@
+import time
+
+from app.logger import Logger
+from app.scraper.benchmark.standin_server import FIRST_JOB_ID, LinkedInStandIn
+from app.scraper.extractors.job_postings_extractor import JobPostingDataExtractor
+from app.scraper.job_posting_publisher import JobIdsFetcher
+from app.scraper.rate_limiter import AdaptiveRateLimiter
+
+WORKER_COUNTS = (1, 5, 10, 20)
+BENCHMARK_KEYWORDS = "Data Engineer"
+BENCHMARK_LOCATION = "Washington DC"
+# High enough for the rate limiter not to be what is measured, throttling
+# injected by the stand-in still goes through its backoff
+BENCHMARK_RATE = 1000.0
+
+logger = Logger(prefix="ScraperBenchmark", log_file_name="benchmark.log").get_logger()
+
+
+def benchmark_rate_limiter(workers: int) -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter(
+        name="benchmark",
+        initial_rate=BENCHMARK_RATE,
+        max_rate=BENCHMARK_RATE,
+        initial_concurrency=workers,
+        max_concurrency=workers,
+        max_pause=5.0,
+        log_file_name="benchmark.log",
+    )
+
+
+class DryRunJobPostingDataExtractor(JobPostingDataExtractor):
+    """Fetches and parses job postings without storing them"""
+
+    def save_job_postings(self, job_postings: list[tuple[str, str, dict]]) -> list[int]:
+        return [int(job_id) for job_id, _, _ in job_postings]
+
+
+def _result(
+    name: str, workers: int, items: int, seconds: float, standin: LinkedInStandIn
+) -> dict:
+    return {
+        "benchmark": name,
+        "workers": workers,
+        "items": items,
+        "seconds": round(seconds, 3),
+        "items_per_second": round(items / seconds, 1) if seconds else 0.0,
+        "requests": standin.stats["requests"],
+        "throttled": standin.stats["throttled"],
+    }
+
+
+def benchmark_job_ids_fetcher(standin: LinkedInStandIn, workers: int) -> dict:
+    """Paginates one search through JobIdsFetcher, without storing the job ids"""
+    standin.stats.clear()
+    fetcher = JobIdsFetcher(
+        jobs_base_url=standin.search_url,
+        job_ids_fetch_workers=workers,
+        ids_per_request=standin.ids_per_page,
+        max_wait_time=5,
+        rate_limiter=benchmark_rate_limiter(workers),
+        log_file_name="benchmark.log",
+    )
+    url = fetcher.build_query(
+        BENCHMARK_KEYWORDS, BENCHMARK_LOCATION, None, None, None, None, None
+    ).build_url()
+    start_time = time.perf_counter()
+    job_ids = fetcher.fetch_all_job_ids(url)
+    return _result(
+        "job_ids_fetcher",
+        workers,
+        len(job_ids),
+        time.perf_counter() - start_time,
+        standin,
+    )
+
+
+def benchmark_job_postings_extractor(
+    standin: LinkedInStandIn,
+    workers: int,
+    job_postings: int = 200,
+    store: bool = False,
+) -> dict:
+    """
+    Fetches and parses job_postings pages through
+    JobPostingDataExtractor.stream_job_postings
+    :param store: write the job postings to the database too
+    """
+    standin.stats.clear()
+    extractor_class = (
+        JobPostingDataExtractor if store else DryRunJobPostingDataExtractor
+    )
+    extractor = extractor_class(
+        log_file_name="benchmark.log",
+        job_posting_base_url=standin.job_posting_url,
+        rate_limiter=benchmark_rate_limiter(workers),
+    )
+    job_ids = [str(FIRST_JOB_ID + offset) for offset in range(job_postings)]
+    start_time = time.perf_counter()
+    extracted = extractor.stream_job_postings(job_ids, max_workers=workers)
+    return _result(
+        "job_postings_extractor",
+        workers,
+        extracted,
+        time.perf_counter() - start_time,
+        standin,
+    )
+
+
+def run_benchmarks(
+    worker_counts: tuple[int, ...] = WORKER_COUNTS,
+    total_results: int = 1000,
+    job_postings: int = 200,
+    latency: float = 0.05,
+    jitter: float = 0.02,
+    throttle_probability: float = 0.0,
+    store: bool = False,
+) -> list[dict]:
+    """
+    Runs every benchmark against a fresh stand-in server for each worker count
+    :return: One result dict per benchmark and worker count
+    """
+    results = []
+    with LinkedInStandIn(
+        total_results=total_results,
+        latency=latency,
+        jitter=jitter,
+        throttle_probability=throttle_probability,
+    ) as standin:
+        for workers in worker_counts:
+            results.append(benchmark_job_ids_fetcher(standin, workers))
+            results.append(
+                benchmark_job_postings_extractor(
+                    standin, workers, job_postings=job_postings, store=store
+                )
+            )
+    for result in results:
+        logger.info(result)
+    return results
+
+
+def main():
+    for throttle_probability in (0.0, 0.05):
+        print(f"Throttle probability {throttle_probability}")
+        for result in run_benchmarks(throttle_probability=throttle_probability):
+            print(
+                f"{result['benchmark']:<24} workers={result['workers']:<3} "
+                f"{result['items_per_second']:>8} items/s "
+                f"({result['items']} items, {result['requests']} requests, "
+                f"{result['throttled']} throttled, {result['seconds']}s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+PAGES_DIR = Path(__file__).parent / "pages"
+SEARCH_PATH = "/jobs-guest/jobs/api/seeMoreJobPostings/search"
+JOB_POSTING_PATH = "/jobs-guest/jobs/api/jobPosting/"
+IDS_PER_PAGE = 10
+FIRST_JOB_ID = 3_900_000_000
+
+
+class LinkedInStandIn:
+    """
+    Local HTTP server that answers like the LinkedIn guest endpoints the
+    scrapers use, from recorded pages, so they can be benchmarked without
+    network access.
+
+    Searches return pages of ids_per_page job cards selected by the start
+    parameter, up to total_results and an empty page after that, the way
+    seeMoreJobPostings paginates. Every search query gets its own job ids.
+    Job posting pages are served for any id. Each response is delayed by
+    latency plus or minus jitter seconds, and a throttle_probability share of
+    the requests is answered with a 429 and a Retry-After header.
+    """
+
+    def __init__(
+        self,
+        total_results: int = 1000,
+        ids_per_page: int = IDS_PER_PAGE,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        throttle_probability: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.total_results = total_results
+        self.ids_per_page = ids_per_page
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_probability = throttle_probability
+        self.retry_after = retry_after
+        self.search_card = (PAGES_DIR / "search_card.html").read_text()
+        self.job_posting = (PAGES_DIR / "job_posting.html").read_text().encode()
+        self.stats: Counter[str] = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _StandInRequestHandler)
+        self._server.daemon_threads = True
+        self._server.standin = self  # type: ignore
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def search_url(self) -> str:
+        """Search endpoint to use as JobIdsFetcher's jobs_base_url"""
+        return self.base_url + SEARCH_PATH
+
+    @property
+    def job_posting_url(self) -> str:
+        """Job posting endpoint to use as JobPostingDataExtractor's job_posting_base_url"""
+        return self.base_url + JOB_POSTING_PATH
+
+    def start(self) -> "LinkedInStandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "LinkedInStandIn":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def search_job_ids(self, query: str, start: int) -> list[int]:
+        """The job ids of the search results page of query starting at start"""
+        # Ids are spread per query so different searches do not overlap
+        first_job_id = FIRST_JOB_ID + zlib.crc32(query.encode()) % 1000 * 1_000_000
+        end = min(start + self.ids_per_page, self.total_results)
+        return [first_job_id + position for position in range(start, end)]
+
+    def render_search_page(self, job_ids: list[int]) -> bytes:
+        return "".join(
+            self.search_card.format(job_id=job_id, position=position)
+            for position, job_id in enumerate(job_ids, start=1)
+        ).encode()
+
+    def should_throttle(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.throttle_probability
+
+    def delay(self) -> float:
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter, self.jitter)
+        return max(self.latency + jitter, 0.0)
+
+    def record(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+
+class _StandInRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        standin: LinkedInStandIn = self.server.standin  # type: ignore
+        standin.record("requests")
+        time.sleep(standin.delay())
+        if standin.should_throttle():
+            standin.record("throttled")
+            self._send(429, b"", {"Retry-After": str(standin.retry_after)})
+            return
+
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") == SEARCH_PATH:
+            params = parse_qsl(url.query)
+            start = int(dict(params).get("start", 0))
+            query = urlencode([(key, value) for key, value in params if key != "start"])
+            standin.record("search_pages")
+            body = standin.render_search_page(standin.search_job_ids(query, start))
+            self._send(200, body)
+        elif url.path.startswith(JOB_POSTING_PATH):
+            standin.record("job_postings")
+            self._send(200, standin.job_posting)
+        else:
+            self._send(404, b"")
+
+    def _send(self, status: int, body: bytes, headers: dict | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        # Requests are counted in LinkedInStandIn.stats instead
+        pass
@@ -0,0 +1,158 @@
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from app.logger import Logger
+
+POOL_SIZE = 5
+MAX_PAGES_PER_BROWSER = 50
+PAGE_LOAD_TIMEOUT = 30
+
+
+def chrome_options() -> webdriver.ChromeOptions:
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    return options
+
+
+@dataclass
+class PooledBrowser:
+    driver: webdriver.Chrome
+    pages: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class BrowserPool:
+    """
+    Pool of long-lived headless Chrome sessions shared by scraper threads.
+
+    The chromedriver is resolved once per pool, browsers are started on demand
+    up to size, health checked before being handed out and recycled after
+    max_pages_per_browser pages or when an error escapes the browser() block.
+    """
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        max_pages_per_browser: int = MAX_PAGES_PER_BROWSER,
+        page_load_timeout: int = PAGE_LOAD_TIMEOUT,
+        log_file_name: str = "scraper.log",
+    ):
+        self.logger = Logger(
+            prefix="BrowserPool", log_file_name=log_file_name
+        ).get_logger()
+        self.size = size
+        self.max_pages_per_browser = max_pages_per_browser
+        self.page_load_timeout = page_load_timeout
+
+        self._lock = threading.Lock()
+        self._idle: queue.LifoQueue[PooledBrowser] = queue.LifoQueue()
+        # One slot per browser that may be alive at the same time
+        self._slots = threading.BoundedSemaphore(size)
+        self._driver_path: str | None = None
+        self._closed = False
+        self.started = 0
+        self.recycled = 0
+
+    def _get_driver_path(self) -> str:
+        with self._lock:
+            if self._driver_path is None:
+                self._driver_path = ChromeDriverManager().install()
+            return self._driver_path
+
+    def _start_browser(self) -> PooledBrowser:
+        driver = webdriver.Chrome(
+            service=Service(self._get_driver_path()), options=chrome_options()
+        )
+        driver.set_page_load_timeout(self.page_load_timeout)
+        with self._lock:
+            self.started += 1
+        self.logger.info(f"Started browser ({self.started} started so far)")
+        return PooledBrowser(driver=driver)
+
+    def _quit_browser(self, browser: PooledBrowser) -> None:
+        try:
+            browser.driver.quit()
+        except Exception as e:
+            self.logger.warning(f"Failed to quit browser: {e}")
+
+    @staticmethod
+    def is_healthy(browser: PooledBrowser) -> bool:
+        try:
+            # Any command round trips to the browser, a crashed one raises
+            _ = browser.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _checkout(self) -> PooledBrowser:
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    browser = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._start_browser()
+                if self.is_healthy(browser):
+                    return browser
+                self.logger.warning("Discarding a browser that failed its health check")
+                self._quit_browser(browser)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _checkin(self, browser: PooledBrowser, broken: bool) -> None:
+        browser.pages += 1
+        if broken or self._closed or browser.pages >= self.max_pages_per_browser:
+            with self._lock:
+                self.recycled += 1
+            self._quit_browser(browser)
+        else:
+            self._idle.put(browser)
+        self._slots.release()
+
+    @contextmanager
+    def browser(self) -> Iterator[webdriver.Chrome]:
+        """
+        Lends a browser for one page, blocking while all of them are in use.
+        The browser is recycled if the block raises
+        """
+        browser = self._checkout()
+        broken = False
+        try:
+            yield browser.driver
+        except BaseException:
+            broken = True
+            raise
+        finally:
+            self._checkin(browser, broken)
+
+    def close(self) -> None:
+        """Quits the idle browsers, the ones in use are quit when returned"""
+        self._closed = True
+        while True:
+            try:
+                self._quit_browser(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        self.logger.info(
+            f"Closed browser pool, {self.started} browsers started, "
+            f"{self.recycled} recycled"
+        )
+
+    def __enter__(self) -> "BrowserPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -1,39 +1,42 @@
-from app.scraper.extractors.company_extractor import CompanyExtractor
 from app.logger import Logger
-from sqlmodel import Session, select, exists
-from app.models import JobPostings, Institutions
-from app.core.db import engine
-import random
+from app.scraper.browser_pool import BrowserPool
+from app.scraper.company_scrape_queue import CompanyScrapeQueue
+from app.scraper.extractors.company_extractor import CompanyExtractor
+from app.scraper.metrics import flush_metrics_export, start_metrics_export
 
 logger = Logger(
     prefix="CompaniesScraper", log_file_name="companies_scraper.log"
 ).get_logger()
 
 
-def get_companies_to_scrape():
-    with Session(engine) as session:
-        # Building the query
-        statement = select(JobPostings.company_url).where(
-            ~exists().where(Institutions.url == JobPostings.company_url)  # type: ignore
-        )
-        # Executing the query
-        companies_to_scrape = session.exec(statement).all()
-        not_in_institutions = set(companies_to_scrape)
-        return list(not_in_institutions)
-
-
-def scrape_companies(companies: list[str | None], max_workers: int, batch_size: int):
-    companies_to_scrape = random.sample(companies, batch_size)
-    print(companies_to_scrape)
-    extractor = CompanyExtractor(log_file_name="companies_scraper.log", wait_time=300)
-    extractor.process_companies_parallel(
-        company_urls=companies_to_scrape,  # type: ignore
-        max_workers=max_workers,
+def scrape_companies(max_workers: int, batch_size: int):
+    """Scrapes the companies of the queue that are due, batch after batch"""
+    queue = CompanyScrapeQueue(log_file_name="companies_scraper.log")
+    extractor = CompanyExtractor(
+        log_file_name="companies_scraper.log",
+        wait_time=300,
+        browser_pool=BrowserPool(
+            size=max_workers, log_file_name="companies_scraper.log"
+        ),
     )
+    try:
+        while company_urls := queue.lease(batch_size):
+            logger.info(
+                f"Scraping {len(company_urls)} companies, queue stats: {queue.stats()}"
+            )
+            extractor.process_companies_parallel(
+                company_urls=company_urls,
+                max_workers=max_workers,
+                on_result=queue.record_result,
+            )
+    finally:
+        extractor.close()
+    logger.info(f"No companies due, queue stats: {queue.stats()}")
 
 
 if __name__ == "__main__":
-    companies = get_companies_to_scrape()
-    print(companies)
-    if companies:
-        scrape_companies(companies, max_workers=10, batch_size=10)
+    start_metrics_export()
+    try:
+        scrape_companies(max_workers=10, batch_size=10)
+    finally:
+        flush_metrics_export()
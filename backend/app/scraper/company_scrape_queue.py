@@ -0,0 +1,207 @@
+import datetime
+from collections.abc import Iterable
+
+from sqlalchemy import String, any_, bindparam, func, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlmodel import Session, col, select
+
+from app.core.db import engine
+from app.logger import Logger
+from app.models import CompaniesToScrape, Institutions
+from app.scraper.metrics import set_backlog
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+LEASE_SECONDS = 30 * 60
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 15 * 60
+BACKOFF_MAX_SECONDS = 7 * 24 * 60 * 60
+
+
+class CompanyPageNotFound(Exception):
+    """The company has no LinkedIn page, scraping it again will not help"""
+
+
+def enqueue_companies(session: Session, company_urls: Iterable[str | None]) -> int:
+    """
+    Adds the companies that are neither queued nor in institutions yet to
+    companies_to_scrape. The caller commits
+    :param session: Session the rows are inserted in
+    :param company_urls: LinkedIn company urls, None values are skipped
+    :return: The number of companies queued
+    """
+    urls = sorted({url for url in company_urls if url})
+    if not urls:
+        return 0
+    known = set(
+        session.execute(
+            select(Institutions.url).where(
+                col(Institutions.url) == any_(bindparam("urls", urls, ARRAY(String)))
+            )
+        ).scalars()
+    )
+    rows = [{"company_url": url} for url in urls if url not in known]
+    if not rows:
+        return 0
+    statement = (
+        insert(CompaniesToScrape)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["company_url"])
+        .returning(CompaniesToScrape.company_url)
+    )
+    return len(session.execute(statement).all())
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before the next attempt of a company that failed attempts times"""
+    return min(BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), BACKOFF_MAX_SECONDS)
+
+
+class CompanyScrapeQueue:
+    """
+    Work queue over the companies_to_scrape table.
+
+    Only pending companies whose next_attempt_at has passed are leased, which
+    is a lookup on a partial index. Leasing pushes next_attempt_at to the end
+    of the lease so a crashed consumer's companies come back on their own. A
+    failure schedules the next attempt with exponential backoff and companies
+    that fail max_attempts times, or that have no LinkedIn page, are marked
+    failed and never tried again.
+    """
+
+    def __init__(
+        self,
+        lease_seconds: int = LEASE_SECONDS,
+        max_attempts: int = MAX_ATTEMPTS,
+        log_file_name: str = "companies_scraper.log",
+    ):
+        self.logger = Logger(
+            prefix="CompanyScrapeQueue", log_file_name=log_file_name
+        ).get_logger()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def lease(self, batch_size: int) -> list[str]:
+        """
+        Leases up to batch_size companies that are due
+        :param batch_size: maximum number of companies to lease
+        :return: The leased company urls
+        """
+        now = datetime.datetime.utcnow()
+        with Session(engine) as session:
+            self._fail_exhausted(session, now)
+            candidates = (
+                select(CompaniesToScrape.id)
+                .where(CompaniesToScrape.status == PENDING)
+                .where(col(CompaniesToScrape.next_attempt_at) <= now)
+                .where(col(CompaniesToScrape.attempts) < self.max_attempts)
+                .order_by(col(CompaniesToScrape.next_attempt_at))
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            statement = (
+                update(CompaniesToScrape)
+                .where(col(CompaniesToScrape.id).in_(candidates.scalar_subquery()))
+                .values(
+                    next_attempt_at=now
+                    + datetime.timedelta(seconds=self.lease_seconds),
+                    attempts=CompaniesToScrape.attempts + 1,
+                )
+                .returning(CompaniesToScrape.company_url)
+            )
+            company_urls = list(session.execute(statement).scalars().all())
+            session.commit()
+        self.logger.info(f"Leased {len(company_urls)} companies")
+        return company_urls
+
+    def _fail_exhausted(self, session: Session, now: datetime.datetime) -> None:
+        """Fails companies whose last allowed attempt was lost with its consumer"""
+        statement = (
+            update(CompaniesToScrape)
+            .where(CompaniesToScrape.status == PENDING)
+            .where(col(CompaniesToScrape.attempts) >= self.max_attempts)
+            .where(col(CompaniesToScrape.next_attempt_at) <= now)
+            .values(
+                status=FAILED,
+                last_error=func.coalesce(CompaniesToScrape.last_error, "Lease expired"),
+            )
+        )
+        failed = session.execute(statement).rowcount
+        if failed:
+            self.logger.warning(f"Failed {failed} companies with expired leases")
+
+    def complete(self, company_url: str) -> None:
+        with Session(engine) as session:
+            session.execute(
+                update(CompaniesToScrape)
+                .where(CompaniesToScrape.company_url == company_url)
+                .values(
+                    status=DONE,
+                    date_scraped=datetime.datetime.utcnow(),
+                    last_error=None,
+                )
+            )
+            session.commit()
+
+    def fail(self, company_url: str, error: str, permanent: bool = False) -> None:
+        """
+        Schedules the next attempt of a failed company with exponential backoff,
+        or marks it failed when it is permanent or has used all its attempts
+        """
+        now = datetime.datetime.utcnow()
+        with Session(engine) as session:
+            company = session.exec(
+                select(CompaniesToScrape).where(
+                    CompaniesToScrape.company_url == company_url
+                )
+            ).one_or_none()
+            if company is None:
+                return
+            company.last_error = error
+            if permanent or company.attempts >= self.max_attempts:
+                company.status = FAILED
+            else:
+                company.next_attempt_at = now + datetime.timedelta(
+                    seconds=backoff_seconds(company.attempts)
+                )
+            session.add(company)
+            session.commit()
+            status = company.status
+        if status == FAILED:
+            self.logger.warning(f"{company_url} - Failed permanently: {error}")
+
+    def record_result(
+        self, company_url: str, result: Institutions | None, error: Exception | None
+    ) -> None:
+        """Callback for CompanyExtractor.process_companies_parallel"""
+        if error is None:
+            self.complete(company_url)
+        else:
+            self.fail(
+                company_url,
+                str(error),
+                permanent=isinstance(error, CompanyPageNotFound),
+            )
+
+    def stats(self) -> dict:
+        now = datetime.datetime.utcnow()
+        pending = CompaniesToScrape.status == PENDING
+        with Session(engine) as session:
+            row = session.exec(
+                select(
+                    func.count().filter(
+                        pending, col(CompaniesToScrape.next_attempt_at) <= now
+                    ),
+                    func.count().filter(
+                        pending, col(CompaniesToScrape.next_attempt_at) > now
+                    ),
+                    func.count().filter(CompaniesToScrape.status == DONE),
+                    func.count().filter(CompaniesToScrape.status == FAILED),
+                )
+            ).one()
+        due, waiting, done, failed = row
+        stats = {"due": due, "waiting": waiting, "done": done, "failed": failed}
+        set_backlog("companies", stats)
+        return stats
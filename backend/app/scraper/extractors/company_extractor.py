@@ -1,20 +1,50 @@
 import time
 import re
+from collections.abc import Callable
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import httpx
 from bs4 import BeautifulSoup
 
-from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 
 from app.logger import Logger
+from app.scraper.browser_pool import BrowserPool
+from app.scraper.company_scrape_queue import CompanyPageNotFound
+from app.scraper.institution_linker import link_institutions
+from app.scraper.metrics import (
+    DB_WRITE_DURATION,
+    ITEMS,
+    PARSE_DURATION,
+    observe_duration,
+    record_request,
+)
+from app.scraper.rate_limiter import (
+    AdaptiveRateLimiter,
+    linkedin_rate_limiter,
+    parse_retry_after,
+)
 from app.models import Institutions, InstitutionSizesEnum
 from app.core.db import engine
 from sqlmodel import Session
 
+HTTP_TIMEOUT = 10.0
+MAX_RETRY_AFTER = 60.0
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+# Present on the public company page, missing from the login wall
+COMPANY_PAGE_MARKER = "top-card-layout__title"
+BROWSER_WAIT_TIMEOUT = 10
+SEARCH_RESULTS_TO_CHECK = 9
+
 
 class CompanyExtractor:
     def __init__(
@@ -22,12 +52,24 @@ class CompanyExtractor:
         search_page: str = "https://www.google.com/",
         log_file_name="scraper.log",
         wait_time: int = 1,
+        browser_pool: BrowserPool | None = None,
+        rate_limiter: AdaptiveRateLimiter = linkedin_rate_limiter,
+        transport: httpx.BaseTransport | None = None,
     ):
         self.logger = Logger(
             prefix="CompanyExtractor", log_file_name=log_file_name
         ).get_logger()
         self.search_page = search_page
         self.wait_time = wait_time
+        self.browser_pool = browser_pool or BrowserPool(log_file_name=log_file_name)
+        self.rate_limiter = rate_limiter
+        # Keep-alive client shared by the scraper threads
+        self.http_client = httpx.Client(
+            headers=HTTP_HEADERS,
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+            transport=transport,
+        )
 
     @staticmethod
     def get_location(text: str):
@@ -151,7 +193,10 @@ class CompanyExtractor:
 
     def parse_company_html(self, html: str) -> dict:
         """Parse the HTML of the company page and return the company details"""
-        company_soup = BeautifulSoup(html, "html.parser")
+        with observe_duration(PARSE_DURATION, "companies"):
+            return self._parse_company_soup(BeautifulSoup(html, "html.parser"))
+
+    def _parse_company_soup(self, company_soup: BeautifulSoup) -> dict:
         location, followers = self.get_location_and_followers_from_html(company_soup)
         about = self.get_about(company_soup)
         company_name = self.get_company_name(company_soup)
@@ -175,6 +220,48 @@ class CompanyExtractor:
             "tagline": tagline,
         }
 
+    @staticmethod
+    def get_company_page_url(company_url: str) -> str:
+        if company_url.startswith(("http://", "https://")):
+            return company_url
+        return f"https://{company_url}"
+
+    def fetch_company_html(self, company_url: str) -> str | None:
+        """
+        Downloads the public company page over plain HTTP
+        :param company_url: LinkedIn company url
+        :return: The HTML of the company page, None if LinkedIn did not serve it
+        (error, throttling or login wall) and the browser has to be used instead
+        :raises CompanyPageNotFound: if the company page does not exist
+        """
+        self.rate_limiter.acquire()
+        start_time = time.perf_counter()
+        try:
+            response = self.http_client.get(self.get_company_page_url(company_url))
+        except httpx.HTTPError as e:
+            self.rate_limiter.release(None)
+            record_request("companies", None, time.perf_counter() - start_time)
+            self.logger.warning(f"{company_url} - HTTP request failed: {e}")
+            return None
+        record_request(
+            "companies", response.status_code, time.perf_counter() - start_time
+        )
+        self.rate_limiter.release(
+            response.status_code,
+            parse_retry_after(
+                response.headers.get("Retry-After"), max_wait=MAX_RETRY_AFTER
+            ),
+        )
+        if response.status_code == 404:
+            raise CompanyPageNotFound(f"No LinkedIn page for company: {company_url}")
+        if response.status_code != 200:
+            self.logger.info(f"{company_url} - HTTP status {response.status_code}")
+            return None
+        if COMPANY_PAGE_MARKER not in response.text:
+            self.logger.info(f"{company_url} - Login wall served over HTTP")
+            return None
+        return response.text
+
     def search_linkedin_company_and_get_html(self, company_url: str, driver, wait):
         """Search for a company on LinkedIn and return the HTML of the company page
         Why looking for the company linkedin in google? to avoid the linkedin login page
@@ -183,62 +270,78 @@ class CompanyExtractor:
         self.logger.info(f"Searching for {company_url}")
         try:
             driver.get(self.search_page)
-            time.sleep(3)
-            search_box = driver.find_element(By.NAME, "q")
+            search_box = wait.until(EC.element_to_be_clickable((By.NAME, "q")))
             search_box.send_keys(company_url)
             search_box.send_keys(Keys.ENTER)
-            time.sleep(3)
-            for i in range(1, 10):
-                result = driver.find_element(By.XPATH, f"(//h3)[{i}]/../../a")
-                if "linkedin.com" in result.get_attribute("href"):
+            wait.until(EC.presence_of_element_located((By.XPATH, "//h3/../../a")))
+            results = driver.find_elements(By.XPATH, "//h3/../../a")
+            for i, result in enumerate(results[:SEARCH_RESULTS_TO_CHECK], start=1):
+                if "linkedin.com" in (result.get_attribute("href") or ""):
                     self.logger.info(f" found {company_url} in search result {i}")
                     result.click()
-                    time.sleep(5)
-                    html = driver.page_source
-                    return html
-                else:
-                    if i == 9:
-                        self.logger.warning(f"LinkedIn URL not found for {company_url}")
+                    wait.until(
+                        EC.presence_of_element_located(
+                            (By.CLASS_NAME, COMPANY_PAGE_MARKER)
+                        )
+                    )
+                    return driver.page_source
+            self.logger.warning(f"LinkedIn URL not found for {company_url}")
+            return None
+        except TimeoutException:
+            self.logger.warning(f"Timed out waiting for the pages of {company_url}")
+            return None
+        except WebDriverException as e:
+            # Let the browser pool recycle the browser
+            self.logger.error(f"Browser error occurred for {company_url}: {e}")
+            raise
         except Exception as e:
             self.logger.error(f"Error occurred for {company_url}: {e}")
             return None
-        finally:
-            driver.quit()
 
     def process_company(self, company_url: str) -> Institutions:
-        options = webdriver.ChromeOptions()
-        options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), options=options
-        )
-        wait = WebDriverWait(driver, 10)
-
-        # Search for the company on LinkedIn and get the HTML of the company page
-        html = self.search_linkedin_company_and_get_html(company_url, driver, wait)
+        # Fast path, the public company page fetched without a browser
+        html = self.fetch_company_html(company_url)
+        used_browser = html is None
+        if used_browser:
+            # The browser comes from the shared pool and goes back to it afterwards
+            with self.browser_pool.browser() as driver:
+                wait = WebDriverWait(driver, BROWSER_WAIT_TIMEOUT)
+                # Search for the company on LinkedIn and get the HTML of the company page
+                html = self.search_linkedin_company_and_get_html(
+                    company_url, driver, wait
+                )
         # Parse the HTML of the company page and return the company details
         if html:
             institution_db = Institutions(
                 url=company_url, **self.parse_company_html(html)
             )
             self.write_company_to_database(institution_db)
-            self.logger.info(
-                f"company_processed {company_url}, waiting {self.wait_time} seconds"
-            )
-            time.sleep(self.wait_time)
+            ITEMS.labels("companies", "browser" if used_browser else "http").inc()
+            if used_browser:
+                # Only the search engine scraping needs to be paced, the HTTP
+                # path is paced by the rate limiter
+                self.logger.info(
+                    f"company_processed {company_url}, waiting {self.wait_time} seconds"
+                )
+                time.sleep(self.wait_time)
+            else:
+                self.logger.info(f"company_processed {company_url} over HTTP")
             return institution_db
         else:
+            ITEMS.labels("companies", "failed").inc()
             self.logger.error(f"Failed to get HTML for company: {company_url}")
             raise Exception(f"Failed to get HTML for company: {company_url}")
 
     def process_companies_parallel(
-        self, company_urls: list[str], max_workers: int = 10
+        self,
+        company_urls: list[str],
+        max_workers: int = 10,
+        on_result: Callable[[str, Institutions | None, Exception | None], None]
+        | None = None,
     ) -> list[Institutions]:
         """
         Processes a list of company URLs in parallel, returning a list of Institution objects.
+        on_result is called with (company url, institution, error) as each company completes.
         """
         institutions = []  # This will store the Institution objects or None for failures
 
@@ -252,17 +355,32 @@ class CompanyExtractor:
             for future in as_completed(future_to_company_url):
                 company_url = future_to_company_url[future]
                 try:
-                    institutions.append(future.result())
+                    institution = future.result()
+                    error = None
                 except Exception as exc:
                     self.logger.error(
                         f"Company URL {company_url} generated an exception: {exc}"
                     )
-                    institutions.append(None)
+                    institution = None
+                    error = exc
+                institutions.append(institution)
+                if on_result is not None:
+                    on_result(company_url, institution, error)
 
         return institutions
 
+    def close(self) -> None:
+        self.http_client.close()
+        self.browser_pool.close()
+
     def write_company_to_database(self, company: Institutions):
-        with Session(engine) as session:
+        with observe_duration(DB_WRITE_DURATION, "companies"), Session(
+            engine
+        ) as session:
             self.logger.info(f"{company.url} - Adding to database")
             session.merge(company)
+            session.flush()
+            # The job postings of the company point to it from now on
+            linked = link_institutions(session, [company.url])
             session.commit()
+        self.logger.info(f"{company.url} - Linked {linked} job postings")
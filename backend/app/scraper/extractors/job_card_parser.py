@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from bs4 import BeautifulSoup, Tag
+
+from app.scraper.extractors.job_posting_parser import clean_url
+
+# JobPostingsToScrape fields read from a search result card
+JOB_CARD_FIELDS = (
+    "linkedin_job_id",
+    "title",
+    "company",
+    "company_url",
+    "location",
+    "date_posted",
+    "closed",
+)
+
+CLOSED_TEXT = "no longer accepting applications"
+
+
+def _text(card: Tag, class_name: str) -> str | None:
+    element = card.find(class_=class_name)
+    if element is None:
+        return None
+    return " ".join(element.get_text().split()) or None
+
+
+def _date_posted(card: Tag) -> datetime | None:
+    time_tag = card.find("time")
+    if time_tag is None or not time_tag.get("datetime"):
+        return None
+    try:
+        return datetime.strptime(time_tag["datetime"], "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def _closed(card: Tag) -> bool:
+    """The benefits line of a closed posting replaces e.g. Actively Hiring"""
+    benefits = _text(card, "job-posting-benefits__text")
+    return benefits is not None and CLOSED_TEXT in benefits.lower()
+
+
+def parse_job_card(card: Tag) -> dict | None:
+    """
+    :param card: base-card element of a search results page
+    :return: The JOB_CARD_FIELDS of the card with the job id as a string,
+        None if it has no job id
+    """
+    urn = card.get("data-entity-urn")
+    if not urn:
+        return None
+    company_link = card.select_one(".base-search-card__subtitle a")
+    company_url = company_link.get("href") if company_link is not None else None
+    return {
+        "linkedin_job_id": urn.split(":")[-1],
+        "title": _text(card, "base-search-card__title"),
+        "company": _text(card, "base-search-card__subtitle"),
+        "company_url": clean_url(company_url) if company_url else None,
+        "location": _text(card, "job-search-card__location"),
+        "date_posted": _date_posted(card),
+        "closed": _closed(card),
+    }
+
+
+def parse_job_cards(html_content: str) -> list[dict]:
+    """Parses the job cards of a seeMoreJobPostings search results page"""
+    soup = BeautifulSoup(html_content, "html.parser")
+    cards = (parse_job_card(card) for card in soup.find_all("div", class_="base-card"))
+    return [card for card in cards if card is not None]
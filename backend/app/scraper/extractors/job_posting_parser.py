@@ -0,0 +1,506 @@
+import hashlib
+import html as html_entities
+import json
+import re
+from collections.abc import Collection
+from datetime import datetime, timezone
+
+import lxml.html
+from lxml.etree import ParserError, _Comment, _Element
+
+from app.models import EmploymentTypesEnum, SeniorityLevelsEnum
+
+SALARY_PATTERN = re.compile(r"\$\d{1,3}(?:,\d{3})*(?:\.\d{2})?")
+# BeautifulSoup's get_text() leaves out the strings of these elements
+NON_TEXT_TAGS = frozenset(("script", "style", "template"))
+
+JOB_TITLE_CLASS = "top-card-layout__title font-sans text-lg papabear:text-xl font-bold leading-open text-color-text mb-0 topcard__title"
+COMPANY_LINK_CLASS = "topcard__org-name-link topcard__flavor--black-link"
+JOB_LOCATION_CLASS = "topcard__flavor topcard__flavor--bullet"
+JOB_POSTER_CLASS = "message-the-recruiter"
+JOB_POSTER_PROFILE_CLASS = (
+    "base-card__full-link absolute top-0 right-0 bottom-0 left-0 p-0 z-[2]"
+)
+JOB_POSTER_TITLE_CLASS = (
+    "base-main-card__subtitle body-text text-color-text overflow-hidden"
+)
+SALARY_CLASS = "salary compensation__salary"
+JOB_DESCRIPTION_CLASS = "show-more-less-html__markup"
+JOB_CRITERIA_ITEM_CLASS = "description__job-criteria-item"
+JOB_CRITERIA_TEXT_CLASS = "description__job-criteria-text"
+JSON_LD_TYPE = "application/ld+json"
+# Elements the fields missing from the JSON-LD are read from, as (class
+# attribute prefix, tag, fields) tuples
+DOM_FALLBACK_ELEMENTS = (
+    (JOB_TITLE_CLASS, "h2", ("title",)),
+    (COMPANY_LINK_CLASS, "a", ("company", "company_url")),
+    (JOB_LOCATION_CLASS, "span", ("location",)),
+    (SALARY_CLASS, "div", ("job_salary_min", "job_salary_max")),
+    (JOB_DESCRIPTION_CLASS, "div", ("description",)),
+    (JOB_POSTER_CLASS, "div", ("job_poster_profile", "job_poster_name")),
+    (
+        "description__job-criteria-list",
+        "ul",
+        ("seniority_level_id", "employment_type_id", "job_functions", "industries"),
+    ),
+)
+# schema.org employmentType values, as EmploymentTypesEnum names
+JSON_LD_EMPLOYMENT_TYPES = {
+    "FULL_TIME": "Full-time",
+    "PART_TIME": "Part-time",
+    "CONTRACTOR": "Contract",
+    "TEMPORARY": "Temporary",
+    "INTERN": "Internship",
+    "OTHER": "Other",
+}
+
+# JobPostings fields extracted from a job posting page
+JOB_POSTING_FIELDS = (
+    "title",
+    "location",
+    "seniority_level_id",
+    "employment_type_id",
+    "description",
+    "company",
+    "company_url",
+    "job_salary_min",
+    "job_salary_max",
+    "job_poster_profile",
+    "job_poster_name",
+    "job_functions",
+    "industries",
+    "date_posted",
+    "valid_through",
+)
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def hash_job_posting_fields(fields: dict) -> str:
+    """
+    Hashes the extracted fields of a job posting, with whitespace normalized,
+    to tell whether a re-scraped posting changed
+    :param fields: Dict of JobPostings fields
+    :return: Hex sha256 of the fields
+    """
+    normalized = {field: _normalize(fields.get(field)) for field in JOB_POSTING_FIELDS}
+    return hashlib.sha256(
+        json.dumps(normalized, sort_keys=True, ensure_ascii=False).encode()
+    ).hexdigest()
+
+
+def parse_seniority_level(seniority_level: str | None) -> int | None:
+    if seniority_level:
+        return SeniorityLevelsEnum.get_id(seniority_level.strip())
+    return None
+
+
+def parse_employment_type(employment_type: str | None) -> int | None:
+    if employment_type:
+        return EmploymentTypesEnum.get_id(employment_type.strip())
+    return None
+
+
+def parse_job_functions(job_functions: str | None) -> list[str]:
+    if job_functions:
+        job_functions = job_functions.replace("and", ",")
+        return [
+            job_function.strip().replace("and ", ",")
+            for job_function in job_functions.split(",")
+        ]
+    return []
+
+
+def parse_industries(industries: str | None) -> list[str]:
+    if industries:
+        return [
+            industry.strip().replace("and ", "") for industry in industries.split(",")
+        ]
+    return []
+
+
+def parse_salary_range(salary_text: str) -> tuple | None:
+    """
+    Extracts the salary range from the text of the salary element
+    :param salary_text: Text of the salary element
+    :return: Tuple of salary range (low, high)
+    """
+    matches = SALARY_PATTERN.findall(salary_text)
+    # if we found two matches, return them as a tuple
+    if len(matches) == 2:
+        return tuple(
+            int(float(salary.replace("$", "").replace(",", ""))) for salary in matches
+        )
+    return None
+
+
+def clean_url(url: str) -> str:
+    """Removes LinkedIn's tracking parameters from a url"""
+    return url.split("?trk")[0]
+
+
+def load_json_ld_job_posting(json_ld: str | None) -> dict | None:
+    """
+    :param json_ld: Content of a JSON-LD script element
+    :return: The schema.org JobPosting object it holds, None if there is none
+    """
+    if not json_ld:
+        return None
+    try:
+        data = json.loads(json_ld)
+    except ValueError:
+        return None
+    if isinstance(data, dict):
+        data = data.get("@graph", [data])
+    if not isinstance(data, list):
+        return None
+    return next(
+        (
+            item
+            for item in data
+            if isinstance(item, dict) and item.get("@type") == "JobPosting"
+        ),
+        None,
+    )
+
+
+def find_json_ld_job_posting(html: str) -> dict | None:
+    """Reads the JSON-LD JobPosting of a page without parsing its HTML"""
+    position = html.find(JSON_LD_TYPE)
+    while position != -1:
+        start = html.find(">", position) + 1
+        end = html.find("</script>", start)
+        if start == 0 or end == -1:
+            return None
+        job_posting = load_json_ld_job_posting(html[start:end])
+        if job_posting is not None:
+            return job_posting
+        position = html.find(JSON_LD_TYPE, end)
+    return None
+
+
+def parse_json_ld_date(value) -> datetime | None:
+    """Parses an ISO 8601 date of the JSON-LD into a naive UTC datetime"""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_json_ld_dates(job_posting: dict | None) -> dict:
+    """:return: The date_posted and valid_through fields of a JSON-LD JobPosting"""
+    job_posting = job_posting or {}
+    return {
+        "date_posted": parse_json_ld_date(job_posting.get("datePosted")),
+        "valid_through": parse_json_ld_date(job_posting.get("validThrough")),
+    }
+
+
+def _parse_json_ld_salary(base_salary) -> tuple | None:
+    if not isinstance(base_salary, dict):
+        return None
+    value = base_salary.get("value")
+    if not isinstance(value, dict):
+        return None
+    try:
+        return int(float(value["minValue"])), int(float(value["maxValue"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _parse_json_ld_description(description: str) -> str:
+    # LinkedIn escapes the markup of the description once more in the JSON-LD
+    if "&lt;" in description:
+        description = html_entities.unescape(description)
+    return _parse_job_description(
+        lxml.html.fragment_fromstring(description, create_parent="div")
+    )
+
+
+def parse_json_ld_fields(job_posting: dict) -> dict:
+    """
+    Maps a JSON-LD JobPosting onto the JobPostings fields it holds, fields it
+    does not have are left out
+    :param job_posting: schema.org JobPosting object of a job posting page
+    :return: Dict of JobPostings fields
+    """
+    fields = {}
+    if isinstance(job_posting.get("title"), str):
+        fields["title"] = job_posting["title"].strip()
+    organization = job_posting.get("hiringOrganization")
+    if isinstance(organization, dict):
+        if isinstance(organization.get("name"), str):
+            fields["company"] = organization["name"].strip()
+        if isinstance(organization.get("sameAs"), str):
+            fields["company_url"] = clean_url(organization["sameAs"])
+    employment_type = job_posting.get("employmentType")
+    if isinstance(employment_type, list):
+        employment_type = employment_type[0] if employment_type else None
+    if employment_type in JSON_LD_EMPLOYMENT_TYPES:
+        fields["employment_type_id"] = parse_employment_type(
+            JSON_LD_EMPLOYMENT_TYPES[employment_type]
+        )
+    salary_range = _parse_json_ld_salary(job_posting.get("baseSalary"))
+    if salary_range is not None:
+        fields["job_salary_min"], fields["job_salary_max"] = salary_range
+    if isinstance(job_posting.get("description"), str):
+        fields["description"] = _parse_json_ld_description(job_posting["description"])
+    return {**fields, **parse_json_ld_dates(job_posting)}
+
+
+def _has_class(element: "_Element", class_name: str) -> bool:
+    """
+    Matches classes the way BeautifulSoup's class_ filter does: a single class
+    matches any of the element's classes, several classes must match the whole
+    attribute
+    """
+    classes = element.get("class", "").split()
+    if " " in class_name:
+        return " ".join(classes) == class_name
+    return class_name in classes
+
+
+def _iter_strings(element: "_Element"):
+    if element.text:
+        yield element.text
+    for child in element:
+        if not isinstance(child, _Comment) and child.tag not in NON_TEXT_TAGS:
+            yield from _iter_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _get_text(element: "_Element", separator: str = "", strip: bool = False) -> str:
+    """Equivalent of BeautifulSoup's Tag.get_text()"""
+    strings = _iter_strings(element)
+    if strip:
+        strings = (string.strip() for string in strings)
+        return separator.join(string for string in strings if string)
+    return separator.join(strings)
+
+
+def _parse_job_description(description_tag: "_Element") -> str:
+    """Same formatting as JobPostingDataExtractor._extract_job_description"""
+    formatted_text_pieces = []
+
+    def add_text(text: str | None) -> None:
+        if text and text.strip():
+            formatted_text_pieces.append(text.strip())
+
+    add_text(description_tag.text)
+    for child in description_tag:
+        if isinstance(child, _Comment):
+            pass
+        elif child.tag == "strong":
+            formatted_text_pieces.append(f"{_get_text(child).strip()}\n")
+        elif child.tag == "p":
+            formatted_text_pieces.append(_get_text(child, "\n", strip=True))
+        elif child.tag in ["ul", "ol"]:
+            list_items = [_get_text(li, "\n", strip=True) for li in child.iter("li")]
+            formatted_text_pieces.append(
+                "\n".join([f"- {item}" for item in list_items])
+            )
+        elif child.tag != "br":
+            add_text(_get_text(child, "\n", strip=True))
+        add_text(child.tail)
+
+    return "\n\n".join(formatted_text_pieces)
+
+
+def _parse_job_poster(job_poster_tag: "_Element") -> dict | None:
+    profile_tag = None
+    detail_title_tag = None
+    for element in job_poster_tag.iterdescendants("a", "h4"):
+        if (
+            profile_tag is None
+            and element.tag == "a"
+            and _has_class(element, JOB_POSTER_PROFILE_CLASS)
+        ):
+            profile_tag = element
+        elif (
+            detail_title_tag is None
+            and element.tag == "h4"
+            and _has_class(element, JOB_POSTER_TITLE_CLASS)
+        ):
+            detail_title_tag = element
+    if profile_tag is None or detail_title_tag is None:
+        return None
+
+    name_tag = next(
+        (
+            span
+            for span in profile_tag.iterdescendants("span")
+            if _has_class(span, "sr-only")
+        ),
+        None,
+    )
+    profile_url = profile_tag.get("href")
+    return {
+        "name": _get_text(name_tag).strip() if name_tag is not None else None,
+        "title": _get_text(detail_title_tag).strip(),
+        "profile_url": clean_url(profile_url) if profile_url is not None else None,
+    }
+
+
+def _outer_html(html: str, class_name: str, tag: str) -> str | None:
+    """
+    Slices the first tag element whose class attribute starts with class_name
+    out of html, by counting the tags nested in it
+    """
+    attribute = html.find(f'class="{class_name}')
+    start = html.rfind(f"<{tag}", 0, attribute)
+    if attribute == -1 or start == -1 or ">" in html[start:attribute]:
+        return None
+    opening, closing = f"<{tag}", f"</{tag}>"
+    depth = 1
+    position = html.find(">", attribute)
+    while depth:
+        next_closing = html.find(closing, position)
+        if next_closing == -1:
+            return None
+        next_opening = html.find(opening, position, next_closing)
+        if next_opening == -1:
+            depth -= 1
+            position = next_closing + len(closing)
+        else:
+            # <a also starts <abbr, only whole tag names are nested elements
+            if html[next_opening + len(opening)] in " \t\n>":
+                depth += 1
+            position = next_opening + len(opening)
+    return html[start:position]
+
+
+def parse_job_posting_lxml(html: str, known_fields: Collection[str] = ()) -> dict:
+    """
+    Extracts every JobPostings field from a job posting page in a single walk
+    of an lxml tree. The output matches JobPostingDataExtractor's BeautifulSoup
+    extraction, which stays the reference implementation
+    :param html: Job posting page
+    :param known_fields: fields the caller already has, the costly ones among
+        them (description, salary and dates) are not extracted
+    :return: Dict of JobPostings fields
+    """
+    try:
+        root = lxml.html.document_fromstring(html)
+    except ParserError:
+        # Empty documents
+        root = lxml.html.document_fromstring("<html></html>")
+
+    title_tag = company_tag = location_tag = None
+    job_poster_tag = salary_tag = description_tag = None
+    json_ld_job_posting = None
+    criteria: dict[str, str] = {}
+    for element in root.iter("h2", "a", "span", "div", "li", "script"):
+        tag = element.tag
+        if tag == "h2":
+            if title_tag is None and _has_class(element, JOB_TITLE_CLASS):
+                title_tag = element
+        elif tag == "a":
+            if company_tag is None and _has_class(element, COMPANY_LINK_CLASS):
+                company_tag = element
+        elif tag == "span":
+            if location_tag is None and _has_class(element, JOB_LOCATION_CLASS):
+                location_tag = element
+        elif tag == "div":
+            if job_poster_tag is None and _has_class(element, JOB_POSTER_CLASS):
+                job_poster_tag = element
+            elif salary_tag is None and _has_class(element, SALARY_CLASS):
+                salary_tag = element
+            elif description_tag is None and _has_class(element, JOB_DESCRIPTION_CLASS):
+                description_tag = element
+        elif tag == "script":
+            if (
+                json_ld_job_posting is None
+                and "date_posted" not in known_fields
+                and element.get("type") == JSON_LD_TYPE
+            ):
+                json_ld_job_posting = load_json_ld_job_posting(element.text)
+        elif _has_class(element, JOB_CRITERIA_ITEM_CLASS):
+            # The criteria list is read once into a dict instead of being
+            # walked again for every criterion
+            header = next(element.iterdescendants("h3"), None)
+            criterion = next(
+                (
+                    span
+                    for span in element.iterdescendants("span")
+                    if _has_class(span, JOB_CRITERIA_TEXT_CLASS)
+                ),
+                None,
+            )
+            if header is not None and criterion is not None:
+                criteria.setdefault(
+                    _get_text(header).strip(), _get_text(criterion).strip()
+                )
+
+    if description_tag is None and "description" not in known_fields:
+        raise ValueError("Job description not found")
+
+    company_url = company_tag.get("href") if company_tag is not None else None
+    salary_range = (
+        parse_salary_range(_get_text(salary_tag, " ", strip=True))
+        if salary_tag is not None and "job_salary_min" not in known_fields
+        else None
+    )
+    job_poster_info = (
+        _parse_job_poster(job_poster_tag) if job_poster_tag is not None else None
+    )
+    return {
+        "title": _get_text(title_tag).strip() if title_tag is not None else "",
+        "location": _get_text(location_tag).strip()
+        if location_tag is not None
+        else None,
+        "seniority_level_id": parse_seniority_level(criteria.get("Seniority level")),
+        "employment_type_id": parse_employment_type(criteria.get("Employment type")),
+        "description": _parse_job_description(description_tag)
+        if "description" not in known_fields
+        else None,
+        "company": _get_text(company_tag).strip() if company_tag is not None else "",
+        "company_url": clean_url(company_url) if company_url is not None else None,
+        "job_salary_min": salary_range[0] if salary_range else None,
+        "job_salary_max": salary_range[1] if salary_range else None,
+        "job_poster_profile": job_poster_info.get("profile_url", None)
+        if job_poster_info
+        else None,
+        "job_poster_name": job_poster_info.get("name", None)
+        if job_poster_info
+        else None,
+        "job_functions": parse_job_functions(criteria.get("Job function")),
+        "industries": parse_industries(criteria.get("Industries")),
+        **parse_json_ld_dates(json_ld_job_posting),
+    }
+
+
+def parse_job_posting_json_ld(html: str) -> dict:
+    """
+    Reads the fields of a job posting page from its JSON-LD JobPosting, found
+    by a scan of the raw html and loaded with json.loads. Only the fields the
+    JSON-LD does not have (location, criteria, job poster and whatever is
+    missing from it) are extracted from the DOM, by parse_job_posting_lxml
+    :param html: Job posting page
+    :return: Dict of JobPostings fields
+    """
+    job_posting = find_json_ld_job_posting(html)
+    if job_posting is None:
+        return parse_job_posting_lxml(html)
+    fields = parse_json_ld_fields(job_posting)
+    # Only the elements holding the missing fields are parsed, not the page
+    fragments = [
+        _outer_html(html, class_name, tag)
+        for class_name, tag, element_fields in DOM_FALLBACK_ELEMENTS
+        if not all(field in fields for field in element_fields)
+    ]
+    dom_html = "".join(fragment for fragment in fragments if fragment)
+    return {**parse_job_posting_lxml(dom_html, known_fields=fields), **fields}
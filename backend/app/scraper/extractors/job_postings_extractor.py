@@ -2,25 +2,72 @@ import requests
 from bs4 import BeautifulSoup
 from bs4.element import Tag
 
-import random
-import time
-import re
 import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
 
 from app.models import (
     JobPostings,
     JobPostingsToScrape,
-    SeniorityLevelsEnum,
-    EmploymentTypesEnum,
 )
 from app.logger import Logger
 from app.core.db import engine
-from sqlmodel import Session, select
+from app.scraper.extractors.job_posting_parser import (
+    JOB_POSTING_FIELDS,
+    JSON_LD_TYPE,
+    clean_url,
+    hash_job_posting_fields,
+    load_json_ld_job_posting,
+    parse_employment_type,
+    parse_industries,
+    parse_job_functions,
+    parse_job_posting_json_ld,
+    parse_job_posting_lxml,
+    parse_json_ld_dates,
+    parse_salary_range,
+    parse_seniority_level,
+)
+from app.scraper.company_scrape_queue import enqueue_companies
+from app.scraper.html_store import store_html
+from app.scraper.institution_linker import link_institutions
+from app.scraper.metrics import (
+    DB_WRITE_DURATION,
+    ITEMS,
+    PARSE_DURATION,
+    RETRIES,
+    observe_duration,
+    record_request,
+)
+from app.scraper.rate_limiter import (
+    AdaptiveRateLimiter,
+    linkedin_rate_limiter,
+    parse_retry_after,
+)
+from app.scraper.request_policy import (
+    PERMANENT,
+    SUCCESS,
+    THROTTLED,
+    RequestFailed,
+    RequestPolicy,
+    classify,
+    linkedin_request_policy,
+)
+from sqlalchemy import BigInteger, any_, bindparam, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlmodel import Session, col, select
 
 JOB_POSTING_BASE_URL = "https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/"
 MAXIMUM_RETRIES = 40
 WAIT_TIME_BETWEEN_REQUESTS_LIMITS = (1, 30)
+PARSERS = ("lxml", "json_ld", "beautifulsoup")
+DEFAULT_PARSER = "lxml"
+# Re-scraping a posting only overwrites what was extracted from its page, the
+# columns filled later (institution, skills, summary) are kept
+UPSERT_COLUMNS = JOB_POSTING_FIELDS
 
 
 class JobPostingDataExtractor:
@@ -31,6 +78,9 @@ class JobPostingDataExtractor:
         job_posting_base_url: str = JOB_POSTING_BASE_URL,
         maximum_retries: int = MAXIMUM_RETRIES,
         wait_time_limits: tuple = WAIT_TIME_BETWEEN_REQUESTS_LIMITS,
+        rate_limiter: AdaptiveRateLimiter = linkedin_rate_limiter,
+        request_policy: RequestPolicy = linkedin_request_policy,
+        parser: str = DEFAULT_PARSER,
     ):
         self.logger = Logger(
             prefix="JobPostingDataExtractor", log_file_name=log_file_name
@@ -38,6 +88,14 @@ class JobPostingDataExtractor:
         self.job_posting_base_url = job_posting_base_url
         self.maximum_retries = maximum_retries
         self.wait_time_limits = wait_time_limits
+        self.rate_limiter = rate_limiter
+        self.request_policy = request_policy
+        # Totals of the postings stored by save_job_postings
+        self.write_stats: Counter[str] = Counter()
+        self._write_stats_lock = threading.Lock()
+        if parser not in PARSERS:
+            raise ValueError(f"Unknown parser {parser}, expected one of {PARSERS}")
+        self.parser = parser
         self.job_url = job_url
 
     @staticmethod
@@ -54,47 +112,25 @@ class JobPostingDataExtractor:
         return None
 
     def _extract_seniority_level(self, job_soup: BeautifulSoup) -> int | None:
-        seniority_level_string = self._extract_job_criteria_based_on_string(
-            job_soup, "Seniority level"
-        )
         # Get the id of the corresponding string in the enum
-        seniority_level_id = None
-        if seniority_level_string:
-            seniority_level_id = SeniorityLevelsEnum.get_id(
-                seniority_level_string.strip()
-            )
-
-        return seniority_level_id
+        return parse_seniority_level(
+            self._extract_job_criteria_based_on_string(job_soup, "Seniority level")
+        )
 
     def _extract_employment_type(self, job_soup: BeautifulSoup) -> int | None:
-        employment_type_str = self._extract_job_criteria_based_on_string(
-            job_soup, "Employment type"
+        return parse_employment_type(
+            self._extract_job_criteria_based_on_string(job_soup, "Employment type")
         )
-        employment_type_id = None
-        if employment_type_str:
-            employment_type_id = EmploymentTypesEnum.get_id(employment_type_str.strip())
-        return employment_type_id
 
     def _extract_job_functions(self, job_soup: BeautifulSoup) -> list:
-        job_functions = self._extract_job_criteria_based_on_string(
-            job_soup, "Job function"
+        return parse_job_functions(
+            self._extract_job_criteria_based_on_string(job_soup, "Job function")
         )
-        if job_functions:
-            job_functions = job_functions.replace("and", ",")
-            return [
-                job_function.strip().replace("and ", ",")
-                for job_function in job_functions.split(",")
-            ]
-        return []
 
     def _extract_industries(self, job_soup: BeautifulSoup) -> list[str]:
-        industries = self._extract_job_criteria_based_on_string(job_soup, "Industries")
-        if industries:
-            return [
-                industry.strip().replace("and ", "")
-                for industry in industries.split(",")
-            ]
-        return []
+        return parse_industries(
+            self._extract_job_criteria_based_on_string(job_soup, "Industries")
+        )
 
     @staticmethod
     def _extract_job_title(job_soup: BeautifulSoup) -> str:
@@ -138,7 +174,7 @@ class JobPostingDataExtractor:
             "a", class_="topcard__org-name-link topcard__flavor--black-link"
         )
         if company_url:
-            return company_url["href"].split("?trk")[0]  # type: ignore
+            return clean_url(company_url["href"])  # type: ignore
         return None
 
     @staticmethod
@@ -180,7 +216,7 @@ class JobPostingDataExtractor:
                 if isinstance(profile_tag, Tag):
                     profile_url = profile_tag.get("href", None)
                     if isinstance(profile_url, str):
-                        profile_url = profile_url.split("?trk")[0]
+                        profile_url = clean_url(profile_url)
 
                 # Extract the title
                 title = detail_title_tag.text.strip()
@@ -201,14 +237,7 @@ class JobPostingDataExtractor:
         if salary_range:
             # Extract the text and split it into low and high ranges
             salary_text = salary_range.get_text(separator=" ", strip=True)
-            # Use regex to extract the numbers from the text
-            matches = re.findall(r"\$\d{1,3}(?:,\d{3})*(?:\.\d{2})?", salary_text)
-            # if we found two matches, return them as a tuple
-            if len(matches) == 2:
-                return tuple(
-                    int(float(salary.replace("$", "").replace(",", "")))
-                    for salary in matches
-                )
+            return parse_salary_range(salary_text)
         return None
 
     @staticmethod
@@ -253,107 +282,315 @@ class JobPostingDataExtractor:
 
         return formatted_text
 
-    def _create_job_posting(self, job_id: str, job_soup: BeautifulSoup) -> int:
+    @staticmethod
+    def _extract_json_ld_job_posting(job_soup: BeautifulSoup) -> dict | None:
+        for script in job_soup.find_all("script", type=JSON_LD_TYPE):
+            job_posting = load_json_ld_job_posting(script.string)
+            if job_posting is not None:
+                return job_posting
+        return None
+
+    def _extract_fields(self, job_soup: BeautifulSoup) -> dict:
+        """
+        Extracts the JobPostings fields with BeautifulSoup. This is the reference
+        implementation the lxml parser is checked against
+        :param job_soup: BeautifulSoup object of the job posting page
+        :return: Dict of JobPostings fields
+        """
         job_poster_info = self._extract_job_poster(job_soup)
         salary_range = self._extract_salary_range(job_soup)
-
-        # You might need to adjust this part based on how you're initializing JobPosting
-        job_posting = JobPostings(
-            linkedin_id=int(job_id),
-            html=str(job_soup),
-            title=self._extract_job_title(job_soup),
-            location=self._extract_job_location(job_soup),
-            seniority_level_id=self._extract_seniority_level(job_soup),
-            employment_type_id=self._extract_employment_type(job_soup),
-            description=self._extract_job_description(job_soup),
-            company=self._extract_company_name(job_soup),
-            company_url=self._extract_company_url(job_soup),
-            job_salary_min=salary_range[0] if salary_range else None,
-            job_salary_max=salary_range[1] if salary_range else None,
-            job_poster_profile=job_poster_info.get("profile_url", None)
+        return {
+            "title": self._extract_job_title(job_soup),
+            "location": self._extract_job_location(job_soup),
+            "seniority_level_id": self._extract_seniority_level(job_soup),
+            "employment_type_id": self._extract_employment_type(job_soup),
+            "description": self._extract_job_description(job_soup),
+            "company": self._extract_company_name(job_soup),
+            "company_url": self._extract_company_url(job_soup),
+            "job_salary_min": salary_range[0] if salary_range else None,
+            "job_salary_max": salary_range[1] if salary_range else None,
+            "job_poster_profile": job_poster_info.get("profile_url", None)
             if job_poster_info
             else None,
-            job_poster_name=job_poster_info.get("name", None)
+            "job_poster_name": job_poster_info.get("name", None)
             if job_poster_info
             else None,
-            job_functions=self._extract_job_functions(job_soup),
-            industries=self._extract_industries(job_soup),
-        )
-        with Session(engine) as session:
-            self.logger.info(f"{job_id} - Successfully extracted data")
-            existing_posting = (
-                session.query(JobPostings)
-                .filter_by(linkedin_id=job_posting.linkedin_id)
-                .first()
+            "job_functions": self._extract_job_functions(job_soup),
+            "industries": self._extract_industries(job_soup),
+            **parse_json_ld_dates(self._extract_json_ld_job_posting(job_soup)),
+        }
+
+    def parse_job_posting(self, html: str) -> dict:
+        """
+        Extracts the JobPostings fields of a job posting page with the configured parser
+        :param html: Job posting page
+        :return: Dict of JobPostings fields
+        """
+        with observe_duration(PARSE_DURATION, "job_postings"):
+            if self.parser == "lxml":
+                return parse_job_posting_lxml(html)
+            if self.parser == "json_ld":
+                return parse_job_posting_json_ld(html)
+            return self._extract_fields(BeautifulSoup(html, "html.parser"))
+
+    def _create_job_posting(
+        self, job_id: str, job_soup: BeautifulSoup | str, fields: dict | None = None
+    ) -> int:
+        if fields is None:
+            fields = self._extract_fields(job_soup)  # type: ignore
+        self.logger.info(f"{job_id} - Successfully extracted data")
+        return self.save_job_postings([(job_id, str(job_soup), fields)])[0]
+
+    def save_job_postings(self, job_postings: list[tuple[str, str, dict]]) -> list[int]:
+        """
+        Stores parsed job postings and marks them as scraped in a single transaction:
+        one INSERT ... ON CONFLICT (linkedin_id) DO UPDATE for the postings and one
+        UPDATE ... WHERE linkedin_job_id = ANY(...) for the queue, which also
+        releases their leases.
+
+        Postings whose content hash did not change since they were last stored
+        are not written again, only their queue rows are updated. The companies
+        of new or changed postings are added to the company scrape queue, or
+        linked to their institution when it is already scraped.
+
+        :param job_postings: (job id, html, fields) tuples
+        :return: The LinkedIn ids of the stored job postings
+        """
+        linkedin_ids = [int(job_id) for job_id, _, _ in job_postings]
+        if not linkedin_ids:
+            return []
+        now = datetime.datetime.utcnow()
+        # A statement cannot upsert the same row twice, the last version wins
+        latest = {
+            linkedin_id: (html, fields, hash_job_posting_fields(fields))
+            for linkedin_id, (_, html, fields) in zip(
+                linkedin_ids, job_postings, strict=True
             )
-            if existing_posting:
-                for key, value in job_posting.dict().items():
-                    if key not in ["id", "linkedin_id"]:
-                        setattr(existing_posting, key, value)
-                session.add(existing_posting)
-            else:
-                session.add(job_posting)
-            scraped_table = session.exec(
-                select(JobPostingsToScrape).where(
-                    JobPostingsToScrape.linkedin_job_id == int(job_id)
+        }
+        queued_ids = bindparam("linkedin_ids", list(latest), ARRAY(BigInteger))
+        with observe_duration(DB_WRITE_DURATION, "job_postings"), Session(
+            engine
+        ) as session:
+            stored_hashes = dict(
+                session.execute(
+                    select(JobPostings.linkedin_id, JobPostings.content_hash).where(
+                        col(JobPostings.linkedin_id) == any_(queued_ids)
+                    )
+                ).all()
+            )
+            changed = {
+                linkedin_id: posting
+                for linkedin_id, posting in latest.items()
+                if stored_hashes.get(linkedin_id) != posting[2]
+            }
+            if changed:
+                html_hashes = store_html(
+                    session, [html for html, _, _ in changed.values()]
                 )
-            ).one_or_none()
-            if scraped_table:
-                scraped_table.processed = True
-                scraped_table.date_scraped = datetime.datetime.now()
-
-                self.logger.info(f"{job_id} - Marked as scraped")
-                session.add(scraped_table)
+                rows = [
+                    {
+                        **fields,
+                        "linkedin_id": linkedin_id,
+                        "html_hash": html_hash,
+                        "content_hash": content_hash,
+                        "date_created": now,
+                        "date_updated": now,
+                    }
+                    for (linkedin_id, (_, fields, content_hash)), html_hash in zip(
+                        changed.items(), html_hashes, strict=True
+                    )
+                ]
+                statement = insert(JobPostings).values(rows)
+                session.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=["linkedin_id"],
+                        set_={
+                            column: statement.excluded[column]
+                            for column in [
+                                *UPSERT_COLUMNS,
+                                "html_hash",
+                                "content_hash",
+                                "date_updated",
+                            ]
+                        },
+                        # Another writer may have stored the same version meanwhile
+                        where=col(JobPostings.content_hash).is_distinct_from(
+                            statement.excluded.content_hash
+                        ),
+                    )
+                )
+                company_urls = [
+                    fields.get("company_url") for _, fields, _ in changed.values()
+                ]
+                enqueue_companies(session, company_urls)
+                link_institutions(session, company_urls)
+            marked = session.execute(
+                update(JobPostingsToScrape)
+                .where(col(JobPostingsToScrape.linkedin_job_id) == any_(queued_ids))
+                .values(
+                    processed=True,
+                    date_scraped=now,
+                    leased_by=None,
+                    lease_expires_at=None,
+                    last_error=None,
+                )
+            ).rowcount
             session.commit()
-            return job_posting.linkedin_id
 
-    def extract_single_job_posting(self, job_id: str) -> int:
+        stats = {
+            "new": sum(linkedin_id not in stored_hashes for linkedin_id in changed),
+            "changed": sum(linkedin_id in stored_hashes for linkedin_id in changed),
+            "unchanged": len(latest) - len(changed),
+        }
+        with self._write_stats_lock:
+            self.write_stats.update(stats)
+        for outcome, count in stats.items():
+            ITEMS.labels("job_postings", outcome).inc(count)
+        self.logger.info(
+            f"Stored {len(latest)} job postings ({stats}), marked {marked} as scraped"
+        )
+        return linkedin_ids
+
+    def fetch_job_posting(self, job_id: str) -> str:
+        """
+        Downloads a job posting page, retrying while the server throttles us
+        or fails transiently
+        :param job_id: LinkedIn job id
+        :return: The html of the job posting page
+        :raises RequestFailed: If the posting is gone or every attempt failed
+        """
         job_url = self.job_posting_base_url + job_id
         self.logger.info(f"{job_id} - Scraping job")
-        retries = 0
-        while retries < self.maximum_retries:
-            job_request = requests.get(job_url)
-            if job_request.status_code == 429:
-                wait_time = random.randint(*self.wait_time_limits)
+        status_code = None
+        for retry in range(self.maximum_retries):
+            self.request_policy.wait_for_host(job_url)
+            self.rate_limiter.acquire()
+            job_request, status_code, retry_after = None, None, None
+            start_time = time.perf_counter()
+            try:
+                job_request = requests.get(job_url)
+                status_code = job_request.status_code
+                # The server's Retry-After is capped by the upper wait time limit
+                retry_after = parse_retry_after(
+                    job_request.headers.get("Retry-After"),
+                    max_wait=self.wait_time_limits[1],
+                )
+            except requests.exceptions.RequestException as e:
+                self.logger.error(f"{job_id} - Request failed: {e}")
+            finally:
+                self.rate_limiter.release(status_code, retry_after)
+                record_request(
+                    "job_postings", status_code, time.perf_counter() - start_time
+                )
+            outcome = self.request_policy.record(job_url, status_code)
+            if outcome == SUCCESS and job_request is not None:
+                return job_request.text
+            if outcome == PERMANENT:
+                self.logger.error(f"{job_id} - Job posting unavailable ({status_code})")
+                raise RequestFailed(job_url, status_code, outcome)
+            if outcome == THROTTLED:
                 self.logger.info(
-                    f"{job_id} - Too many requests, waiting {wait_time} secs..."
+                    f"{job_id} - Too many requests, slowing down to "
+                    f"{self.rate_limiter.current_rate:.2f} req/s..."
                 )
-                time.sleep(wait_time)
-                retries += 1
-                continue
-            job_data = job_request.text
-            job_soup = BeautifulSoup(job_data, "html.parser")
-            return self._create_job_posting(job_id, job_soup)
+            RETRIES.labels("job_postings").inc()
+            time.sleep(self.request_policy.backoff(outcome, retry))
 
         self.logger.error(
             f"{job_id} Failed to extract data after {self.maximum_retries} retries."
         )
-        raise (Exception(f"Failed to extract data for job ID: {job_id}"))
+        raise RequestFailed(job_url, status_code, classify(status_code))
+
+    def extract_single_job_posting(self, job_id: str) -> int:
+        job_data = self.fetch_job_posting(job_id)
+        return self._create_job_posting(
+            job_id, job_data, self.parse_job_posting(job_data)
+        )
 
-    def extract_job_postings(self, job_ids: list[str], max_workers: int = 5) -> list:
+    def stream_job_postings(
+        self,
+        job_ids: Iterable[str],
+        max_workers: int = 5,
+        max_pending: int | None = None,
+        on_result: Callable[[str, int | None, Exception | None], None] | None = None,
+    ) -> int:
+        """
+        Extracts job postings from an iterator of job ids with flat memory usage.
+
+        At most max_pending extractions are submitted at a time and the next job
+        ids are only pulled from the iterator as extractions finish, so job_ids
+        can be a lazy source such as a server-side cursor or a queue lease loop.
+
+        :param job_ids: An iterable of job ID strings, consumed lazily.
+        :param max_workers: Maximum number of threads to use.
+        :param max_pending: Maximum number of submitted but unfinished extractions,
+            defaults to twice max_workers.
+        :param on_result: Optional callback called with (job_id, result, exception)
+            as each extraction finishes.
+        :return: The number of successfully extracted job postings.
+        """
+        max_pending = max_pending or 2 * max_workers
+        job_ids_iterator = iter(job_ids)
+        extracted = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending: dict[Future, str] = {}
+            for job_id in islice(job_ids_iterator, max_pending):
+                pending[
+                    executor.submit(self.extract_single_job_posting, job_id)
+                ] = job_id
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = pending.pop(future)
+                    job_posting, error = None, None
+                    try:
+                        job_posting = future.result()
+                        extracted += 1
+                    except Exception as exc:
+                        self.logger.error(
+                            f"Job ID {job_id} generated an exception: {exc}"
+                        )
+                        error = exc
+                    if on_result is not None:
+                        on_result(job_id, job_posting, error)
+                # Refill the window only as far as extractions have finished
+                for job_id in islice(job_ids_iterator, len(done)):
+                    pending[
+                        executor.submit(self.extract_single_job_posting, job_id)
+                    ] = job_id
+
+        self.logger.info(
+            f"Extracted {extracted} job postings, "
+            f"rate limiter stats: {self.rate_limiter.stats()}"
+        )
+        return extracted
+
+    def extract_job_postings(
+        self,
+        job_ids: list[str],
+        max_workers: int = 5,
+        on_result: Callable[[str, int | None, Exception | None], None] | None = None,
+    ) -> list:
         """
         Extracts data for multiple job postings in parallel.
 
         :param job_ids: A list of job ID strings.
         :param max_workers: Maximum number of threads to use.
+        :param on_result: Optional callback called with (job_id, result, exception)
+            as each extraction finishes.
         :return: A list of JobPosting objects (or None for failed extractions).
         """
         job_postings = []
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Map each job ID to a future object
-            future_to_job_id = {
-                executor.submit(self.extract_single_job_posting, job_id): job_id
-                for job_id in job_ids
-            }
-
-            for future in as_completed(future_to_job_id):
-                job_id = future_to_job_id[future]
-                try:
-                    job_posting = future.result()
-                    job_postings.append(job_posting)
-                except Exception as exc:
-                    self.logger.error(f"Job ID {job_id} generated an exception: {exc}")
-                    job_postings.append(None)
+        def collect(job_id: str, job_posting: int | None, error: Exception | None):
+            job_postings.append(job_posting)
+            if on_result is not None:
+                on_result(job_id, job_posting, error)
 
+        self.stream_job_postings(
+            job_ids,
+            max_workers=max_workers,
+            max_pending=len(job_ids),
+            on_result=collect,
+        )
         return job_postings
@@ -0,0 +1,83 @@
+import asyncio
+
+import httpx
+
+from app.logger import Logger
+
+DEFAULT_MAX_CONCURRENCY = 20
+DEFAULT_TIMEOUT = 30.0
+
+
+class AsyncFetchEngine:
+    """
+    Shared asyncio HTTP client for the scrapers.
+
+    A single keep-alive httpx.AsyncClient is reused for every request so that
+    TCP/TLS connections are pooled across pages and across queries, and a
+    semaphore caps the number of requests in flight at any moment.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        headers: dict[str, str] | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        log_file_name: str = "scraper.log",
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.logger = Logger(
+            prefix="AsyncFetchEngine", log_file_name=log_file_name
+        ).get_logger()
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.headers = headers
+        self.transport = transport
+        self._semaphore: asyncio.Semaphore | None = None
+        self._client: httpx.AsyncClient | None = None
+
+    async def __aenter__(self) -> "AsyncFetchEngine":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        if self._client is not None:
+            return
+        limits = httpx.Limits(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=self.max_concurrency,
+        )
+        self._client = httpx.AsyncClient(
+            limits=limits,
+            timeout=self.timeout,
+            headers=self.headers,
+            follow_redirects=True,
+            transport=self.transport,
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.logger.info(
+            f"Opened HTTP client with a concurrency limit of {self.max_concurrency}"
+        )
+
+    async def close(self) -> None:
+        if self._client is None:
+            return
+        await self._client.aclose()
+        self._client = None
+        self._semaphore = None
+
+    async def get(self, url: str) -> httpx.Response:
+        """
+        Performs a GET request through the shared client, waiting for a free
+        slot when the concurrency limit has been reached.
+        :param url: URL to request
+        :return: httpx.Response (raise_for_status is left to the caller)
+        """
+        if self._client is None or self._semaphore is None:
+            raise RuntimeError("AsyncFetchEngine is not open, use 'async with'")
+        async with self._semaphore:
+            return await self._client.get(url)
@@ -0,0 +1,74 @@
+import datetime
+import hashlib
+import zlib
+from collections.abc import Iterable
+
+import zstandard
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+
+from app.models import JobPostingHtml
+
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+HTML_COMPRESSION = "zstd"
+
+
+def hash_html(html: str) -> str:
+    return hashlib.sha256(html.encode()).hexdigest()
+
+
+def compress_html(html: str, compression: str = HTML_COMPRESSION) -> bytes:
+    data = html.encode()
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if compression == "zlib":
+        return zlib.compress(data, ZLIB_LEVEL)
+    raise ValueError(f"Unknown compression {compression}")
+
+
+def decompress_html(compression: str, content: bytes) -> str:
+    if compression == "zstd":
+        return zstandard.ZstdDecompressor().decompress(content).decode()
+    if compression == "zlib":
+        return zlib.decompress(content).decode()
+    raise ValueError(f"Unknown compression {compression}")
+
+
+def store_html(session: Session, htmls: Iterable[str]) -> list[str]:
+    """
+    Stores raw pages in job_posting_html. Pages are addressed by their hash, a
+    page that is already stored is not written again. The caller commits
+    :param session: Session the rows are inserted in
+    :param htmls: Raw pages
+    :return: The hash of each page, in order
+    """
+    rows = {}
+    hashes = []
+    for html in htmls:
+        html_hash = hash_html(html)
+        hashes.append(html_hash)
+        if html_hash not in rows:
+            rows[html_hash] = {
+                "hash": html_hash,
+                "compression": HTML_COMPRESSION,
+                "content": compress_html(html),
+                "size": len(html.encode()),
+                "date_created": datetime.datetime.utcnow(),
+            }
+    if rows:
+        session.execute(
+            insert(JobPostingHtml)
+            .values(list(rows.values()))
+            .on_conflict_do_nothing(index_elements=["hash"])
+        )
+    return hashes
+
+
+def load_html(session: Session, html_hash: str) -> str | None:
+    row = session.exec(
+        select(JobPostingHtml).where(JobPostingHtml.hash == html_hash)
+    ).one_or_none()
+    if row is None:
+        return None
+    return decompress_html(row.compression, row.content)
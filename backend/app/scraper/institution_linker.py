@@ -0,0 +1,57 @@
+from collections.abc import Iterable
+
+from sqlalchemy import String, any_, bindparam, func, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import Session, col, select
+
+from app.core.db import engine
+from app.logger import Logger
+from app.models import Institutions, JobPostings
+
+logger = Logger(
+    prefix="InstitutionLinker", log_file_name="institution_linker.log"
+).get_logger()
+
+
+def link_institutions(
+    session: Session, company_urls: Iterable[str | None] | None = None
+) -> int:
+    """
+    Sets JobPostings.institution_id from the institution with the same url,
+    with one UPDATE ... FROM over the url indexes. The caller commits
+    :param session: Session the update runs in
+    :param company_urls: Only link the job postings of these companies, all of
+    them when None
+    :return: The number of job postings linked
+    """
+    # Institutions are not unique by url, the oldest one wins
+    institutions = select(
+        col(Institutions.url).label("url"), func.min(Institutions.id).label("id")
+    ).group_by(col(Institutions.url))
+    if company_urls is not None:
+        urls = sorted({url for url in company_urls if url})
+        if not urls:
+            return 0
+        institutions = institutions.where(
+            col(Institutions.url) == any_(bindparam("urls", urls, ARRAY(String)))
+        )
+    institutions = institutions.subquery()
+    statement = (
+        update(JobPostings)
+        .where(col(JobPostings.company_url) == institutions.c.url)
+        .where(col(JobPostings.institution_id).is_distinct_from(institutions.c.id))
+        .values(institution_id=institutions.c.id)
+        .execution_options(synchronize_session=False)
+    )
+    return session.execute(statement).rowcount
+
+
+def main():
+    with Session(engine) as session:
+        linked = link_institutions(session)
+        session.commit()
+    logger.info(f"Linked {linked} job postings to their institution")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,31 @@
-from app.scraper.extractors.job_postings_extractor import JobPostingDataExtractor
+from app.scraper.job_postings_pipeline import JobPostingsPipeline
+from app.scraper.job_postings_queue import JobPostingsQueue
 from app.logger import Logger
-from app.models import JobPostingsToScrape
-from app.core.db import engine
-from sqlmodel import Session, select
-
-
-def get_job_ids_to_scrape() -> list[int]:
-    with Session(engine) as session:
-        statement = select(JobPostingsToScrape.linkedin_job_id).where(
-            JobPostingsToScrape.processed == False
-        )
-        jobs_to_scrape = list(session.exec(statement).all())
-        logger.info(f"Found {len(jobs_to_scrape)} jobs to scrape")
-        return jobs_to_scrape
+from app.scraper.metrics import flush_metrics_export, start_metrics_export
 
 
 logger = Logger(
     prefix="JobQueueConsumer", log_file_name="job_consumer.log"
 ).get_logger()
-max_workers = 20
+fetch_workers = 20
+lease_batch_size = 100
 
 
 def main():
-    extractor = JobPostingDataExtractor(log_file_name="job_consumer.log")
-    job_ids = get_job_ids_to_scrape()
-    extractor.extract_job_postings(
-        [str(job_id) for job_id in job_ids], max_workers=max_workers
+    start_metrics_export()
+    pipeline = JobPostingsPipeline(
+        fetch_workers=fetch_workers, log_file_name="job_consumer.log"
     )
+    queue = JobPostingsQueue(log_file_name="job_consumer.log")
+    logger.info(f"Queue stats: {queue.stats()}")
+    try:
+        pipeline.run(
+            (str(job_id) for job_id in queue.iter_job_ids(lease_batch_size)),
+            on_result=queue.record_result,
+        )
+        logger.info(f"No more job ids to lease, queue stats: {queue.stats()}")
+    finally:
+        flush_metrics_export()
 
 
 if __name__ == "__main__":
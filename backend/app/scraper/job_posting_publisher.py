@@ -1,11 +1,12 @@
-import requests
+import asyncio
 import time
-import random
-from sqlmodel import Session
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import itertools
-from sqlalchemy.exc import IntegrityError
+import requests
+import httpx
+from collections.abc import AsyncIterator, Iterable, Iterator
+from sqlmodel import Session, col, select
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
 
 from app.models import (
     ExperienceLevelsEnum,
@@ -17,6 +18,51 @@ from app.models import (
 )
 from app.logger import Logger
 from app.core.db import engine
+from app.scraper.extractors.job_card_parser import JOB_CARD_FIELDS, parse_job_cards
+from app.scraper.fetch_engine import AsyncFetchEngine
+from app.scraper.known_ids import KnownJobIds
+from app.scraper.metrics import (
+    DB_WRITE_DURATION,
+    ITEMS,
+    PARSE_DURATION,
+    RETRIES,
+    flush_metrics_export,
+    observe_duration,
+    record_request,
+    start_metrics_export,
+)
+from app.scraper.query_planner import SEARCH_RESULTS_CAP, QueryPlanner
+from app.scraper.rate_limiter import (
+    AdaptiveRateLimiter,
+    linkedin_rate_limiter,
+    parse_retry_after,
+)
+from app.scraper.request_policy import (
+    PERMANENT,
+    THROTTLED,
+    RequestPolicy,
+    linkedin_request_policy,
+)
+
+JOB_KEYWORDS = [
+    "Machine Learning Engineer",
+    "Data Scientist",
+    "AI Researcher",
+    "Data Engineer",
+    "Research Scientist",
+    "Deep Learning Engineer",
+    "NLP Engineer",
+    "Computer Vision Engineer",
+    "Artificial Intelligence Specialist",
+    "Predictive Modeler",
+    "Applied Scientist",
+    "Data Analyst",
+    "Machine Learning Researcher",
+    "Big Data Engineer",
+    "Reinforcement Learning Engineer",
+    "Data Science Consultant",
+    "Machine Learning Developer",
+]
 
 
 def parse_input(
@@ -94,7 +140,16 @@ class QueryBuilder:
         input_str = input_str.strip().lower().replace(" ", "%20").replace(",", "%2C")
         return f"{query_parameter}={input_str}" if input_str else ""
 
-    def build_url_and_write_to_db(self):
+    def build_url_and_write_to_db(
+        self, refresh_interval_minutes: int | None = None, priority: int | None = None
+    ) -> str:
+        """
+        Builds the url and registers the query, queries are unique by url so
+        an already registered query keeps its scheduling settings and stats
+        :param refresh_interval_minutes: initial refresh interval for the scheduler
+        :param priority: scheduling priority, higher runs first
+        :return: The query url
+        """
         self.url = self.build_url()
         query = JobPostingQueries(
             url=self.url,
@@ -114,9 +169,18 @@ class QueryBuilder:
             if hasattr(self, "remote_modality")
             else None,
         )
+        if refresh_interval_minutes is not None:
+            query.refresh_interval_minutes = refresh_interval_minutes
+        if priority is not None:
+            query.priority = priority
+        statement = (
+            insert(JobPostingQueries)
+            .values(**query.model_dump(exclude={"id"}))
+            .on_conflict_do_nothing(index_elements=["url"])
+        )
         self.logger.info("Adding query to database")
         with Session(engine) as session:
-            session.add(query)
+            session.execute(statement)
             session.commit()
         return self.url
 
@@ -126,6 +190,102 @@ class QueryBuilder:
         return self.base_url + formatted_params
 
 
+class PaginationState:
+    """
+    Tracks where a paginated search ends while its pages complete out of order.
+
+    The search ends at the first short page. In incremental mode it also ends
+    after stop_after_known_pages consecutive pages made only of known ids.
+    Offsets at or beyond results_cap are never issued, the search returns
+    nothing there.
+    """
+
+    def __init__(
+        self,
+        ids_per_request: int,
+        known_job_ids: KnownJobIds | None = None,
+        stop_after_known_pages: int | None = None,
+        results_cap: int | None = None,
+    ):
+        self.ids_per_request = ids_per_request
+        self.known_job_ids = known_job_ids
+        self.stop_after_known_pages = stop_after_known_pages
+        self.results_cap = results_cap
+        self.terminal_offset: int | None = None
+        self._known_only_offsets: set[int] = set()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.terminal_offset is not None
+
+    def can_issue(self, offset: int) -> bool:
+        return not self.is_finished and (
+            self.results_cap is None or offset < self.results_cap
+        )
+
+    def is_past_end(self, offset: int) -> bool:
+        return self.terminal_offset is not None and offset > self.terminal_offset
+
+    def record_page(self, offset: int, job_ids: list[str], is_short: bool) -> None:
+        if is_short:
+            self._set_end(offset)
+        elif (
+            self.known_job_ids is not None
+            and self.stop_after_known_pages
+            and self.known_job_ids.contains_all(job_ids)
+        ):
+            self._known_only_offsets.add(offset)
+            self._check_known_pages_run(offset)
+
+    def _check_known_pages_run(self, offset: int) -> None:
+        step = self.ids_per_request
+        run_length = self.stop_after_known_pages * step  # type: ignore
+        # Any window of consecutive known-only pages that contains this offset
+        for window_start in range(offset - run_length + step, offset + step, step):
+            window = range(window_start, window_start + run_length, step)
+            if all(page in self._known_only_offsets for page in window):
+                self._set_end(window[-1])
+                return
+
+    def _set_end(self, offset: int) -> None:
+        if self.terminal_offset is None or offset < self.terminal_offset:
+            self.terminal_offset = offset
+
+
+class QueryCheckpoint:
+    """
+    Tracks how far a search is stored while its pages complete out of order.
+
+    The resume offset is the end of the run of pages, from the first one, whose
+    job ids are all in the database. A run restarted after a crash resumes
+    there and only fetches again the pages that were not stored.
+    """
+
+    def __init__(self, url: str, start: int, ids_per_request: int):
+        self.url = url
+        self.resume_offset = start
+        self.ids_per_request = ids_per_request
+        self._buffered_offsets: list[int] = []
+        self._stored_offsets: set[int] = set()
+
+    def add_page(self, offset: int) -> None:
+        """Records a page whose job ids were added to the flush buffer"""
+        self._buffered_offsets.append(offset)
+
+    def mark_stored(self) -> bool:
+        """
+        Records that the buffered pages were flushed to the database
+        :return: Whether the resume offset moved forward
+        """
+        self._stored_offsets.update(self._buffered_offsets)
+        self._buffered_offsets = []
+        resume_offset = self.resume_offset
+        while self.resume_offset in self._stored_offsets:
+            self._stored_offsets.remove(self.resume_offset)
+            self.resume_offset += self.ids_per_request
+        return self.resume_offset != resume_offset
+
+
 class JobIdsFetcher:
     def __init__(
         self,
@@ -135,46 +295,130 @@ class JobIdsFetcher:
         max_wait_time: int = 75,
         max_retries: int = 30,
         ids_per_request: int = 10,
+        max_concurrent_requests: int = 20,
+        db_batch_size: int = 1000,
+        stop_after_known_pages: int = 2,
+        rate_limiter: AdaptiveRateLimiter = linkedin_rate_limiter,
+        request_policy: RequestPolicy = linkedin_request_policy,
+        search_results_cap: int | None = SEARCH_RESULTS_CAP,
+        partition_saturated_queries: bool = True,
     ):
+        self.jobs_base_url = jobs_base_url
         self.job_ids_fetch_workers = job_ids_fetch_workers
+        self.max_concurrent_requests = max_concurrent_requests
+        self.db_batch_size = db_batch_size
+        self.stop_after_known_pages = stop_after_known_pages
         self.max_wait_time = max_wait_time
         self.max_retries = max_retries
         self.ids_per_request = ids_per_request
+        self.rate_limiter = rate_limiter
+        self.request_policy = request_policy
+        self.search_results_cap = search_results_cap
+        self.partition_saturated_queries = partition_saturated_queries
         self.logger = Logger(
             prefix="JobIdsFetcher", log_file_name=log_file_name
         ).get_logger()
         self.query_builder = QueryBuilder(base_url=jobs_base_url)
 
+    def _get_retry_after(
+        self, response: requests.Response | httpx.Response
+    ) -> float | None:
+        return parse_retry_after(
+            response.headers.get("Retry-After"), max_wait=self.max_wait_time
+        )
+
+    def _retry_delay(
+        self, url: str, status_code: int | None, error: Exception | None, retry: int
+    ) -> float | None:
+        """
+        Classifies the outcome of a failed request and logs it
+        :return: Seconds to back off before the next attempt, None if the
+            request should not be retried
+        """
+        outcome = self.request_policy.record(url, status_code)
+        if outcome == THROTTLED:
+            self.logger.info(
+                "Too many requests, slowing down before retrying "
+                f"(rate {self.rate_limiter.current_rate:.2f} req/s)..."
+            )
+        else:
+            self.logger.error(f"Request failed ({outcome}): {error or status_code}")
+        if outcome == PERMANENT:
+            return None
+        if retry == self.max_retries - 1:
+            self.logger.error(f"Max retries reached for url: {url}")
+            return None
+        RETRIES.labels("job_ids").inc()
+        return self.request_policy.backoff(outcome, retry)
+
     def perform_request(self, url: str) -> requests.Response | None:
         for retry in range(self.max_retries):
+            self.request_policy.wait_for_host(url)
+            self.rate_limiter.acquire()
+            response, error = None, None
+            status_code, retry_after = None, None
+            start_time = time.perf_counter()
             try:
                 response = requests.get(url)
-                response.raise_for_status()
-                return response
+                status_code = response.status_code
+                retry_after = self._get_retry_after(response)
             except requests.exceptions.RequestException as e:
-                if (
-                    isinstance(e, requests.exceptions.HTTPError)
-                    and e.response.status_code == 429
-                ):
-                    self.logger.info("Too many requests, waiting before retrying...")
-                    time.sleep(random.randint(1, self.max_wait_time))
-                else:
-                    self.logger.error(f"Request failed: {e}")
-                if retry == self.max_retries - 1:
-                    self.logger.error(f"Max retries reached for url: {url}")
-                    return None
+                error = e
+            finally:
+                self.rate_limiter.release(status_code, retry_after)
+                record_request("job_ids", status_code, time.perf_counter() - start_time)
+            if response is not None and response.ok:
+                self.request_policy.record(url, status_code)
+                return response
+            delay = self._retry_delay(url, status_code, error, retry)
+            if delay is None:
+                return None
+            time.sleep(delay)
+        return None
+
+    async def perform_request_async(
+        self, fetch_engine: AsyncFetchEngine, url: str
+    ) -> httpx.Response | None:
+        for retry in range(self.max_retries):
+            await self.request_policy.wait_for_host_async(url)
+            await self.rate_limiter.acquire_async()
+            response, error = None, None
+            status_code, retry_after = None, None
+            start_time = time.perf_counter()
+            try:
+                response = await fetch_engine.get(url)
+                status_code = response.status_code
+                retry_after = self._get_retry_after(response)
+            except httpx.HTTPError as e:
+                error = e
+            finally:
+                self.rate_limiter.release(status_code, retry_after)
+                record_request("job_ids", status_code, time.perf_counter() - start_time)
+            if response is not None and response.is_success:
+                self.request_policy.record(url, status_code)
+                return response
+            delay = self._retry_delay(url, status_code, error, retry)
+            if delay is None:
+                return None
+            await asyncio.sleep(delay)
         return None
 
+    def extract_job_cards(self, html_content: str) -> list[dict]:
+        """
+        :param html_content: search results page
+        :return: The job id, title, company, location and posting date of
+            each job card, see parse_job_cards
+        """
+        with observe_duration(PARSE_DURATION, "job_ids"):
+            job_cards = parse_job_cards(html_content)
+        ITEMS.labels("job_ids", "extracted").inc(len(job_cards))
+        self.logger.info(f"Extracted {len(job_cards)} job ids")
+        return job_cards
+
     def extract_job_ids(self, html_content: str) -> list[str]:
-        soup = BeautifulSoup(html_content, "html.parser")
-        job_elements = soup.find_all("div", class_="base-card")
-        job_ids = [
-            job["data-entity-urn"].split(":")[-1]
-            for job in job_elements
-            if "data-entity-urn" in job.attrs
+        return [
+            card["linkedin_job_id"] for card in self.extract_job_cards(html_content)
         ]
-        self.logger.info(f"Extracted {len(job_ids)} job ids")
-        return job_ids
 
     def get_job_ids(self, url: str) -> list[str]:
         response = self.perform_request(url)
@@ -182,42 +426,391 @@ class JobIdsFetcher:
             return []
         return self.extract_job_ids(response.text)
 
-    def get_job_ids_with_check(self, url: str, start: int) -> tuple[list[str], bool]:
+    def _check_page(
+        self, response: requests.Response | httpx.Response | None
+    ) -> tuple[list[dict] | None, bool]:
+        """
+        :return: The job cards of the page, None if its request failed, and
+            whether the search ends there. A failed page ends it too, it is
+            not known what lies beyond
+        """
+        if response is None:
+            return None, True
+        job_cards = self.extract_job_cards(response.text)
+        return job_cards, len(job_cards) < self.ids_per_request
+
+    def get_job_cards_with_check(
+        self, url: str, start: int
+    ) -> tuple[list[dict] | None, bool]:
+        partial_url = f"{url}&start={start}"
+        return self._check_page(self.perform_request(partial_url))
+
+    async def get_job_cards_with_check_async(
+        self, fetch_engine: AsyncFetchEngine, url: str, start: int
+    ) -> tuple[list[dict] | None, bool]:
         partial_url = f"{url}&start={start}"
-        job_ids = self.get_job_ids(partial_url)
-        return job_ids, len(job_ids) < self.ids_per_request
-
-    def fetch_job_ids_in_parallel(
-        self, base_url: str, batch_start: int
-    ) -> tuple[list[list[str]], bool]:
-        with ThreadPoolExecutor(max_workers=self.job_ids_fetch_workers) as executor:
-            futures = [
-                executor.submit(
-                    self.get_job_ids_with_check,
-                    base_url,
-                    batch_num * self.ids_per_request,
+        return self._check_page(
+            await self.perform_request_async(fetch_engine, partial_url)
+        )
+
+    def get_job_ids_with_check(
+        self, url: str, start: int
+    ) -> tuple[list[str] | None, bool]:
+        job_cards, is_short = self.get_job_cards_with_check(url, start)
+        return self._job_ids_or_none(job_cards), is_short
+
+    async def get_job_ids_with_check_async(
+        self, fetch_engine: AsyncFetchEngine, url: str, start: int
+    ) -> tuple[list[str] | None, bool]:
+        job_cards, is_short = await self.get_job_cards_with_check_async(
+            fetch_engine, url, start
+        )
+        return self._job_ids_or_none(job_cards), is_short
+
+    @classmethod
+    def _job_ids_or_none(cls, job_cards: list[dict] | None) -> list[str] | None:
+        return None if job_cards is None else cls._job_ids(job_cards)
+
+    @staticmethod
+    def _job_ids(job_cards: list[dict]) -> list[str]:
+        return [card["linkedin_job_id"] for card in job_cards]
+
+    def _new_pagination_state(
+        self, known_job_ids: KnownJobIds | None
+    ) -> PaginationState:
+        return PaginationState(
+            self.ids_per_request,
+            known_job_ids=known_job_ids,
+            stop_after_known_pages=self.stop_after_known_pages,
+            results_cap=self.search_results_cap,
+        )
+
+    def iter_job_ids(
+        self, url: str, start: int = 0, known_job_ids: KnownJobIds | None = None
+    ) -> Iterator[tuple[int, list[str]]]:
+        """
+        Same as iter_job_cards, with only the job ids of the pages. Pages
+        whose request failed are left out
+        """
+        for offset, job_cards in self.iter_job_cards(url, start, known_job_ids):
+            if job_cards is not None:
+                yield offset, self._job_ids(job_cards)
+
+    def iter_job_cards(
+        self, url: str, start: int = 0, known_job_ids: KnownJobIds | None = None
+    ) -> Iterator[tuple[int, list[dict] | None]]:
+        """
+        Streams the job cards of the pages of a search as they arrive.
+
+        At most job_ids_fetch_workers offsets are in flight. Once a short page
+        is seen no further offsets are issued and the pending ones beyond it
+        are cancelled. A page whose request failed (retries exhausted or a
+        permanent error) is yielded with None instead of its job cards and
+        ends the search the same way.
+        :param url: search URL without the start parameter
+        :param start: offset of the first page to fetch
+        :param known_job_ids: enables the incremental mode, the search also
+            stops after stop_after_known_pages pages made only of these ids
+        :return: iterator of (offset, job cards) tuples, in completion order
+        """
+        executor = ThreadPoolExecutor(max_workers=self.job_ids_fetch_workers)
+        pending: dict[Future, int] = {}
+        next_offset = start
+        pagination = self._new_pagination_state(known_job_ids)
+        try:
+            while True:
+                while (
+                    pagination.can_issue(next_offset)
+                    and len(pending) < self.job_ids_fetch_workers
+                ):
+                    future = executor.submit(
+                        self.get_job_cards_with_check, url, next_offset
+                    )
+                    pending[future] = next_offset
+                    next_offset += self.ids_per_request
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=pending.__getitem__):
+                    offset = pending.pop(future)
+                    if pagination.is_past_end(offset):
+                        continue
+                    job_cards, is_short = future.result()
+                    pagination.record_page(
+                        offset, self._job_ids(job_cards or []), is_short
+                    )
+                    for other in list(pending):
+                        if pagination.is_past_end(pending[other]):
+                            other.cancel()
+                            del pending[other]
+                    yield offset, job_cards
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    async def iter_job_ids_async(
+        self,
+        fetch_engine: AsyncFetchEngine,
+        url: str,
+        start: int = 0,
+        known_job_ids: KnownJobIds | None = None,
+    ) -> AsyncIterator[tuple[int, list[str]]]:
+        """Same as iter_job_ids over the shared async client"""
+        async for offset, job_cards in self.iter_job_cards_async(
+            fetch_engine, url, start, known_job_ids
+        ):
+            if job_cards is not None:
+                yield offset, self._job_ids(job_cards)
+
+    async def iter_job_cards_async(
+        self,
+        fetch_engine: AsyncFetchEngine,
+        url: str,
+        start: int = 0,
+        known_job_ids: KnownJobIds | None = None,
+    ) -> AsyncIterator[tuple[int, list[dict] | None]]:
+        """Same as iter_job_cards over the shared async client"""
+        pending: dict[asyncio.Task, int] = {}
+        next_offset = start
+        pagination = self._new_pagination_state(known_job_ids)
+        try:
+            while True:
+                while (
+                    pagination.can_issue(next_offset)
+                    and len(pending) < self.job_ids_fetch_workers
+                ):
+                    task = asyncio.create_task(
+                        self.get_job_cards_with_check_async(
+                            fetch_engine, url, next_offset
+                        )
+                    )
+                    pending[task] = next_offset
+                    next_offset += self.ids_per_request
+                if not pending:
+                    break
+                done, _ = await asyncio.wait(pending, return_when=FIRST_COMPLETED)
+                for task in sorted(done, key=pending.__getitem__):
+                    offset = pending.pop(task)
+                    if pagination.is_past_end(offset):
+                        continue
+                    job_cards, is_short = task.result()
+                    pagination.record_page(
+                        offset, self._job_ids(job_cards or []), is_short
+                    )
+                    for other in list(pending):
+                        if pagination.is_past_end(pending[other]):
+                            other.cancel()
+                            del pending[other]
+                    yield offset, job_cards
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def run_job_ids_to_db(self, job_ids: list[str]) -> int:
+        """
+        Queues job ids for scraping without their search card metadata
+        :param job_ids: LinkedIn job ids
+        :return: Number of job ids that were actually queued
+        """
+        return self.run_job_cards_to_db(
+            [{"linkedin_job_id": job_id} for job_id in job_ids]
+        )
+
+    def run_job_cards_to_db(self, job_cards: list[dict]) -> int:
+        """
+        Queues job ids for scraping in batches along with the title, company,
+        location and posting date of their search card. Ids that are already in
+        the table are skipped by the database through ON CONFLICT DO NOTHING
+        :param job_cards: dicts with a linkedin_job_id and optionally the other
+            JOB_CARD_FIELDS
+        :return: Number of job ids that were actually queued
+        """
+        rows_by_job_id: dict[int, dict] = {}
+        for card in job_cards:
+            job_id = int(card["linkedin_job_id"])
+            if job_id not in rows_by_job_id:
+                # Every row of a multi-row insert needs the same columns
+                rows_by_job_id[job_id] = {
+                    **{field: card.get(field) for field in JOB_CARD_FIELDS},
+                    "linkedin_job_id": job_id,
+                }
+        rows = list(rows_by_job_id.values())
+        if not rows:
+            return 0
+        queued = 0
+        with observe_duration(DB_WRITE_DURATION, "job_ids"), Session(engine) as session:
+            for batch_start in range(0, len(rows), self.db_batch_size):
+                batch = rows[batch_start : batch_start + self.db_batch_size]
+                statement = (
+                    insert(JobPostingsToScrape)
+                    .values(batch)
+                    .on_conflict_do_nothing(index_elements=["linkedin_job_id"])
+                    .returning(JobPostingsToScrape.linkedin_job_id)
                 )
-                for batch_num in range(
-                    batch_start, batch_start + self.job_ids_fetch_workers
+                queued += len(session.execute(statement).all())
+            session.commit()
+        ITEMS.labels("job_ids", "queued").inc(queued)
+        self.logger.info(f"Queued {queued} new job ids out of {len(rows)} fetched")
+        return queued
+
+    def run_scraping_job(
+        self,
+        keywords: str | None = None,
+        location: str | None = None,
+        salary_range: SalaryRangeFiltersEnum | None = None,
+        time_filter: TimeFiltersEnum | None = None,
+        experience_level: ExperienceLevelsEnum | None = None,
+        remote_modality: RemoteModalitiesEnum | None = None,
+        company_id: int | None = None,
+    ) -> int:
+        query_builder = self.build_query(
+            keywords,
+            location,
+            salary_range,
+            time_filter,
+            experience_level,
+            remote_modality,
+            company_id,
+        )
+        url = query_builder.build_url_and_write_to_db()
+        return self.scrape_url(url)
+
+    def scrape_url(self, url: str, known_job_ids: KnownJobIds | None = None) -> int:
+        """
+        Paginates a search URL and queues its job ids as pages arrive
+        :param url: search URL without the start parameter
+        :param known_job_ids: enables the incremental mode, see iter_job_ids
+        :return: Number of new job ids queued
+        """
+        checkpoint = self._start_checkpoint(url, known_job_ids)
+        queued = 0
+        failed = False
+        job_cards_buffer: list[dict] = []
+        for offset, job_cards in self.iter_job_cards(
+            url, start=checkpoint.resume_offset, known_job_ids=known_job_ids
+        ):
+            if job_cards is None:
+                failed = True
+                continue
+            job_cards_buffer.extend(job_cards)
+            checkpoint.add_page(offset)
+            if len(job_cards_buffer) >= self.db_batch_size:
+                queued += self._flush_job_cards(
+                    job_cards_buffer, known_job_ids, checkpoint
                 )
-            ]
-            results = [future.result() for future in as_completed(futures)]
-            job_results, flag_results = zip(*results)
-            return list(job_results), any(flag_results)
+                job_cards_buffer = []
+        queued += self._flush_job_cards(job_cards_buffer, known_job_ids, checkpoint)
+        self._finish_checkpoint(checkpoint, known_job_ids, failed)
+        return queued
+
+    async def scrape_url_async(
+        self,
+        fetch_engine: AsyncFetchEngine,
+        url: str,
+        known_job_ids: KnownJobIds | None = None,
+    ) -> int:
+        checkpoint = await asyncio.to_thread(self._start_checkpoint, url, known_job_ids)
+        queued = 0
+        failed = False
+        job_cards_buffer: list[dict] = []
+        async for offset, job_cards in self.iter_job_cards_async(
+            fetch_engine,
+            url,
+            start=checkpoint.resume_offset,
+            known_job_ids=known_job_ids,
+        ):
+            if job_cards is None:
+                failed = True
+                continue
+            job_cards_buffer.extend(job_cards)
+            checkpoint.add_page(offset)
+            if len(job_cards_buffer) >= self.db_batch_size:
+                queued += await asyncio.to_thread(
+                    self._flush_job_cards, job_cards_buffer, known_job_ids, checkpoint
+                )
+                job_cards_buffer = []
+        queued += await asyncio.to_thread(
+            self._flush_job_cards, job_cards_buffer, known_job_ids, checkpoint
+        )
+        await asyncio.to_thread(
+            self._finish_checkpoint, checkpoint, known_job_ids, failed
+        )
+        return queued
+
+    def _flush_job_cards(
+        self,
+        job_cards: list[dict],
+        known_job_ids: KnownJobIds | None,
+        checkpoint: QueryCheckpoint | None = None,
+    ) -> int:
+        queued = self.run_job_cards_to_db(job_cards)
+        if known_job_ids is not None:
+            known_job_ids.add(self._job_ids(job_cards))
+        if (
+            checkpoint is not None
+            and known_job_ids is None
+            and checkpoint.mark_stored()
+        ):
+            self.save_resume_offset(checkpoint.url, checkpoint.resume_offset)
+        return queued
+
+    def _start_checkpoint(
+        self, url: str, known_job_ids: KnownJobIds | None
+    ) -> QueryCheckpoint:
+        """
+        Full runs resume from the checkpoint of an interrupted run of url.
+        Incremental runs always start from the first page, they stop on their
+        own once they reach known job ids
+        """
+        resume_offset = self.load_resume_offset(url) if known_job_ids is None else None
+        if resume_offset:
+            self.logger.info(f"Resuming {url} at offset {resume_offset}")
+        return QueryCheckpoint(url, resume_offset or 0, self.ids_per_request)
+
+    def _finish_checkpoint(
+        self,
+        checkpoint: QueryCheckpoint,
+        known_job_ids: KnownJobIds | None,
+        failed: bool = False,
+    ) -> None:
+        """
+        Clears the checkpoint of a completed run. A run that stopped at a
+        failed page keeps it, the next run resumes from that page
+        """
+        if known_job_ids is not None:
+            return
+        if failed:
+            self.logger.warning(
+                f"Stopped {checkpoint.url} at a failed page, "
+                f"it resumes at offset {checkpoint.resume_offset}"
+            )
+        elif checkpoint.resume_offset:
+            self.save_resume_offset(checkpoint.url, None)
 
-    def run_job_ids_to_db(self, job_ids: list[str]) -> None:
+    @staticmethod
+    def load_resume_offset(url: str) -> int | None:
+        """:return: Where an interrupted run of the saved query url stopped"""
         with Session(engine) as session:
-            for job_id in job_ids:
-                try:
-                    job_posting = JobPostingsToScrape(linkedin_job_id=int(job_id))
-                    session.add(job_posting)
-                    session.commit()
-                except IntegrityError:
-                    session.rollback()
-                    print(f"Job ID {job_id} already exists in the database. Skipping.")
+            return session.exec(
+                select(JobPostingQueries.resume_offset).where(
+                    JobPostingQueries.url == url
+                )
+            ).first()
 
-    def run_scraping_job(
+    @staticmethod
+    def save_resume_offset(url: str, resume_offset: int | None) -> None:
+        """Checkpoints a run of the saved query url, None once it completed"""
+        with Session(engine) as session:
+            session.execute(
+                update(JobPostingQueries)
+                .where(col(JobPostingQueries.url) == url)
+                .values(resume_offset=resume_offset)
+            )
+            session.commit()
+
+    async def run_scraping_job_async(
         self,
+        fetch_engine: AsyncFetchEngine,
         keywords: str | None = None,
         location: str | None = None,
         salary_range: SalaryRangeFiltersEnum | None = None,
@@ -225,8 +818,8 @@ class JobIdsFetcher:
         experience_level: ExperienceLevelsEnum | None = None,
         remote_modality: RemoteModalitiesEnum | None = None,
         company_id: int | None = None,
-    ) -> None:
-        self.build_query(
+    ) -> int:
+        query_builder = self.build_query(
             keywords,
             location,
             salary_range,
@@ -235,9 +828,112 @@ class JobIdsFetcher:
             remote_modality,
             company_id,
         )
-        url = self.query_builder.build_url_and_write_to_db()
-        job_ids = self.fetch_all_job_ids(url)
-        self.run_job_ids_to_db(job_ids)
+        url = await asyncio.to_thread(query_builder.build_url_and_write_to_db)
+        return await self.scrape_url_async(fetch_engine, url)
+
+    async def run_scraping_jobs_async(self, queries: list[dict]) -> None:
+        """
+        Runs several scraping jobs concurrently over one shared HTTP client.
+        With partition_saturated_queries, queries that hit the search results
+        cap are first split into narrower ones by QueryPlanner.
+        :param queries: list of keyword arguments for run_scraping_job
+        """
+        async with AsyncFetchEngine(
+            max_concurrency=self.max_concurrent_requests
+        ) as fetch_engine:
+            if self.partition_saturated_queries and self.search_results_cap:
+                queries = await self.plan_queries(fetch_engine, queries)
+            results = await asyncio.gather(
+                *[
+                    self.run_scraping_job_async(fetch_engine, **query)
+                    for query in queries
+                ],
+                return_exceptions=True,
+            )
+        for query, result in zip(queries, results, strict=True):
+            if isinstance(result, Exception):
+                self.logger.error(f"Scraping job {query} failed: {result}")
+        self.logger.info(f"Rate limiter stats: {self.rate_limiter.stats()}")
+        self.logger.info(f"Circuit breaker stats: {self.request_policy.stats()}")
+
+    async def plan_queries(
+        self, fetch_engine: AsyncFetchEngine, queries: list[dict]
+    ) -> list[dict]:
+        """
+        :param queries: list of keyword arguments for run_scraping_job
+        :return: The queries with the saturated ones replaced by their splits
+        """
+        planner = QueryPlanner(self, results_cap=self.search_results_cap)  # type: ignore
+        plans = await asyncio.gather(
+            *[planner.plan(fetch_engine, query) for query in queries]
+        )
+        planned = [query for plan in plans for query in plan]
+        if len(planned) > len(queries):
+            self.logger.info(
+                f"Planned {len(planned)} queries from {len(queries)} "
+                f"with {planner.probes} probe requests"
+            )
+        return planned
+
+    def run_scraping_jobs(self, queries: list[dict]) -> None:
+        asyncio.run(self.run_scraping_jobs_async(queries))
+
+    @staticmethod
+    def get_saved_query_url(query: JobPostingQueries, incremental: bool) -> str:
+        # Incremental runs rely on the newest postings coming first
+        if incremental and "sortBy=" not in query.url:
+            return f"{query.url}&sortBy=DD"
+        return query.url
+
+    async def run_saved_queries_async(
+        self,
+        queries: list[JobPostingQueries],
+        incremental: bool = True,
+        known_job_ids: KnownJobIds | None = None,
+    ) -> int:
+        """
+        Re-scrapes saved queries concurrently. In incremental mode the known
+        job ids are loaded once and each query stops paginating after
+        stop_after_known_pages pages that only contain known ids.
+        :param queries: saved JobPostingQueries rows
+        :param incremental: stop early on pages of already known ids
+        :param known_job_ids: index to reuse, loaded from the database if None
+        :return: Number of new job ids queued
+        """
+        if incremental and known_job_ids is None:
+            known_job_ids = await asyncio.to_thread(KnownJobIds.from_database)
+        urls = list(
+            dict.fromkeys(
+                self.get_saved_query_url(query, incremental) for query in queries
+            )
+        )
+        async with AsyncFetchEngine(
+            max_concurrency=self.max_concurrent_requests
+        ) as fetch_engine:
+            results = await asyncio.gather(
+                *[
+                    self.scrape_url_async(
+                        fetch_engine,
+                        url,
+                        known_job_ids=known_job_ids if incremental else None,
+                    )
+                    for url in urls
+                ],
+                return_exceptions=True,
+            )
+        queued = 0
+        for url, result in zip(urls, results, strict=True):
+            if isinstance(result, Exception):
+                self.logger.error(f"Saved query {url} failed: {result}")
+            else:
+                queued += result
+        self.logger.info(f"Queued {queued} new job ids from {len(urls)} saved queries")
+        return queued
+
+    def run_saved_queries(self, incremental: bool = True) -> int:
+        with Session(engine) as session:
+            queries = list(session.exec(select(JobPostingQueries)).all())
+        return asyncio.run(self.run_saved_queries_async(queries, incremental))
 
     def build_query(
         self,
@@ -248,63 +944,57 @@ class JobIdsFetcher:
         experience_level,
         remote_modality,
         company_id,
-    ):
+    ) -> QueryBuilder:
+        # A fresh builder per query, parameters would otherwise accumulate
+        # across runs and concurrent jobs would overwrite each other's state
+        self.query_builder = QueryBuilder(base_url=self.jobs_base_url)
+        query_builder = self.query_builder
         if keywords:
-            self.query_builder.add_keyword(keywords)
+            query_builder.add_keyword(keywords)
         if location:
-            self.query_builder.add_location(location)
+            query_builder.add_location(location)
         if salary_range:
-            self.query_builder.add_salary_range(salary_range)
+            query_builder.add_salary_range(salary_range)
         if time_filter:
-            self.query_builder.add_time_filter(time_filter)
+            query_builder.add_time_filter(time_filter)
         if experience_level:
-            self.query_builder.add_experience_level(experience_level)
+            query_builder.add_experience_level(experience_level)
         if remote_modality:
-            self.query_builder.add_remote_modality(remote_modality)
+            query_builder.add_remote_modality(remote_modality)
         if company_id:
-            self.query_builder.add_company_id(company_id)
+            query_builder.add_company_id(company_id)
+        return query_builder
 
     def fetch_all_job_ids(self, url: str) -> list[str]:
-        batch_start = 0
-        all_job_ids = []
-        while True:
-            fetched_ids, process_should_stop = self.fetch_job_ids_in_parallel(
-                url, batch_start
-            )
-            all_job_ids.extend(list(itertools.chain(*fetched_ids)))
-            if process_should_stop:
-                break
-            batch_start += self.job_ids_fetch_workers
-        return list(set(all_job_ids))
+        return self._unique_job_ids(job_ids for _, job_ids in self.iter_job_ids(url))
+
+    async def fetch_all_job_ids_async(
+        self, fetch_engine: AsyncFetchEngine, url: str
+    ) -> list[str]:
+        pages = [
+            job_ids async for _, job_ids in self.iter_job_ids_async(fetch_engine, url)
+        ]
+        return self._unique_job_ids(pages)
+
+    @staticmethod
+    def _unique_job_ids(pages: Iterable[list[str]]) -> list[str]:
+        return list({job_id for job_ids in pages for job_id in job_ids})
 
 
 def main():
-    job_keywords = [
-        "Machine Learning Engineer",
-        "Data Scientist",
-        "AI Researcher",
-        "Data Engineer",
-        "Research Scientist",
-        "Deep Learning Engineer",
-        "NLP Engineer",
-        "Computer Vision Engineer",
-        "Artificial Intelligence Specialist",
-        "Predictive Modeler",
-        "Applied Scientist",
-        "Data Analyst",
-        "Machine Learning Researcher",
-        "Big Data Engineer",
-        "Reinforcement Learning Engineer",
-        "Data Science Consultant",
-        "Machine Learning Developer",
-    ]
-
-    job_ids_fetcher = JobIdsFetcher(job_ids_fetch_workers=10, max_wait_time=10)
-    for job_keyword in job_keywords:
-        job_ids_fetcher.run_scraping_job(
-            keywords=job_keyword,
-            location="Washington DC",
+    start_metrics_export()
+    job_ids_fetcher = JobIdsFetcher(
+        job_ids_fetch_workers=10, max_wait_time=10, max_concurrent_requests=20
+    )
+    try:
+        job_ids_fetcher.run_scraping_jobs(
+            [
+                {"keywords": job_keyword, "location": "Washington DC"}
+                for job_keyword in JOB_KEYWORDS
+            ]
         )
+    finally:
+        flush_metrics_export()
 
 
 if __name__ == "__main__":
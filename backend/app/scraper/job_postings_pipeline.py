@@ -0,0 +1,263 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+from app.logger import Logger
+from app.scraper.extractors.job_postings_extractor import (
+    DEFAULT_PARSER,
+    JobPostingDataExtractor,
+)
+from app.scraper.metrics import PARSE_DURATION
+
+WRITE_BATCH_SIZE = 100
+WRITE_FLUSH_INTERVAL = 2.0
+
+# Extractor used by the parse processes, set by _init_parse_process
+_parse_extractor: JobPostingDataExtractor | None = None
+_STOP = object()
+
+
+def _init_parse_process(parser: str, log_file_name: str) -> None:
+    global _parse_extractor
+    _parse_extractor = JobPostingDataExtractor(
+        log_file_name=log_file_name, parser=parser
+    )
+
+
+def _parse_job_posting(html: str) -> tuple[dict, float]:
+    # Metrics recorded in the parse processes are not exported, the duration
+    # is sent back to be recorded by the parent
+    start_time = time.perf_counter()
+    fields = _parse_extractor.parse_job_posting(html)  # type: ignore
+    return fields, time.perf_counter() - start_time
+
+
+class JobPostingsPipeline:
+    """
+    Scrapes job postings in three stages sized independently: a thread pool
+    downloads the pages, a process pool parses them into JobPostings fields
+    and a single writer thread stores the results in batches.
+
+    Parsing is CPU bound, running it in separate processes keeps it from
+    holding the GIL the download threads need. At most max_pending job
+    postings are being downloaded or parsed at a time and the writer queue
+    is bounded, so memory stays flat whatever the size of the input.
+    """
+
+    def __init__(
+        self,
+        extractor: JobPostingDataExtractor | None = None,
+        fetch_workers: int = 20,
+        parse_workers: int | None = None,
+        write_batch_size: int = WRITE_BATCH_SIZE,
+        write_flush_interval: float = WRITE_FLUSH_INTERVAL,
+        max_pending: int | None = None,
+        parser: str = DEFAULT_PARSER,
+        log_file_name: str = "job_consumer.log",
+    ):
+        self.logger = Logger(
+            prefix="JobPostingsPipeline", log_file_name=log_file_name
+        ).get_logger()
+        self.log_file_name = log_file_name
+        self.extractor = extractor or JobPostingDataExtractor(
+            log_file_name=log_file_name, parser=parser
+        )
+        self.parser = parser
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.write_batch_size = write_batch_size
+        self.write_flush_interval = write_flush_interval
+        self.max_pending = max_pending or 2 * (fetch_workers + self.parse_workers)
+
+    def run(
+        self,
+        job_ids: Iterable[str],
+        on_result: Callable[[str, int | None, Exception | None], None] | None = None,
+    ) -> int:
+        """
+        Scrapes and stores the given job postings
+        :param job_ids: An iterable of job ID strings, consumed lazily
+        :param on_result: Optional callback called with (job_id, result, exception)
+            as each job posting is stored or fails. It is called from the
+            pipeline and writer threads, so it must be thread safe
+        :return: The number of stored job postings
+        """
+        write_queue: queue.Queue = queue.Queue(maxsize=2 * self.write_batch_size)
+        stored = [0]
+        writer_errors: list[Exception] = []
+        writer = threading.Thread(
+            target=self._run_writer,
+            args=(write_queue, on_result, stored, writer_errors),
+            name="JobPostingsWriter",
+            daemon=True,
+        )
+        writer.start()
+
+        def put(item: object) -> None:
+            self._put_for_writer(write_queue, item, writer, writer_errors)
+
+        try:
+            self._fetch_and_parse(iter(job_ids), put, on_result)
+        finally:
+            put(_STOP)
+            writer.join()
+        if writer_errors:
+            raise RuntimeError("The job postings writer failed") from writer_errors[0]
+        self.logger.info(
+            f"Stored {stored[0]} job postings, "
+            f"write stats: {dict(self.extractor.write_stats)}, "
+            f"rate limiter stats: {self.extractor.rate_limiter.stats()}"
+        )
+        return stored[0]
+
+    def _fetch_and_parse(
+        self,
+        job_ids: Iterator[str],
+        put: Callable[[object], None],
+        on_result: Callable[[str, int | None, Exception | None], None] | None,
+    ) -> None:
+        # The parse processes are spawned rather than forked, forking a process
+        # that already runs download threads can deadlock the children
+        with ThreadPoolExecutor(
+            max_workers=self.fetch_workers
+        ) as fetch_executor, ProcessPoolExecutor(
+            max_workers=self.parse_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_parse_process,
+            initargs=(self.parser, self.log_file_name),
+        ) as parse_executor:
+            fetches: dict[Future, str] = {}
+            parses: dict[Future, tuple[str, str]] = {}
+
+            def fill_fetches() -> None:
+                while len(fetches) + len(parses) < self.max_pending:
+                    job_id = next(job_ids, None)
+                    if job_id is None:
+                        return
+                    future = fetch_executor.submit(
+                        self.extractor.fetch_job_posting, job_id
+                    )
+                    fetches[future] = job_id
+
+            fill_fetches()
+            while fetches or parses:
+                done, _ = wait([*fetches, *parses], return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in fetches:
+                        job_id = fetches.pop(future)
+                        html = self._get_result(future, job_id, on_result)
+                        if html is not None:
+                            parses[parse_executor.submit(_parse_job_posting, html)] = (
+                                job_id,
+                                html,
+                            )
+                    else:
+                        job_id, html = parses.pop(future)
+                        result = self._get_result(future, job_id, on_result)
+                        if result is not None:
+                            fields, parse_duration = result
+                            PARSE_DURATION.labels("job_postings").observe(
+                                parse_duration
+                            )
+                            # Blocks while the writer is behind
+                            put((job_id, html, fields))
+                fill_fetches()
+
+    def _get_result(
+        self,
+        future: Future,
+        job_id: str,
+        on_result: Callable[[str, int | None, Exception | None], None] | None,
+    ):
+        try:
+            return future.result()
+        except Exception as exc:
+            self.logger.error(f"Job ID {job_id} generated an exception: {exc}")
+            if on_result is not None:
+                on_result(job_id, None, exc)
+            return None
+
+    def _put_for_writer(
+        self,
+        write_queue: queue.Queue,
+        item: object,
+        writer: threading.Thread,
+        writer_errors: list[Exception],
+    ) -> None:
+        """
+        Puts item on the bounded write queue, blocking while the writer is
+        behind. Raises instead of blocking forever once the writer is gone
+        """
+        while writer.is_alive():
+            try:
+                write_queue.put(item, timeout=self.write_flush_interval)
+                return
+            except queue.Full:
+                continue
+        raise RuntimeError("The job postings writer stopped") from (
+            writer_errors[0] if writer_errors else None
+        )
+
+    def _run_writer(
+        self,
+        write_queue: queue.Queue,
+        on_result: Callable[[str, int | None, Exception | None], None] | None,
+        stored: list[int],
+        writer_errors: list[Exception],
+    ) -> None:
+        """Writer thread, its failure is handed back to run through writer_errors"""
+        try:
+            self._write(write_queue, on_result, stored)
+        except Exception as exc:
+            self.logger.error(f"Job postings writer failed: {exc}")
+            writer_errors.append(exc)
+
+    def _write(
+        self,
+        write_queue: queue.Queue,
+        on_result: Callable[[str, int | None, Exception | None], None] | None,
+        stored: list[int],
+    ) -> None:
+        batch: list[tuple[str, str, dict]] = []
+        while True:
+            try:
+                item = write_queue.get(timeout=self.write_flush_interval)
+            except queue.Empty:
+                item = None
+            if item is not None and item is not _STOP:
+                batch.append(item)
+            if batch and (
+                item is None or item is _STOP or len(batch) >= self.write_batch_size
+            ):
+                stored[0] += self._write_batch(batch, on_result)
+                batch = []
+            if item is _STOP:
+                return
+
+    def _write_batch(
+        self,
+        batch: list[tuple[str, str, dict]],
+        on_result: Callable[[str, int | None, Exception | None], None] | None,
+    ) -> int:
+        try:
+            linkedin_ids = self.extractor.save_job_postings(batch)
+        except Exception as exc:
+            self.logger.error(f"Failed to store {len(batch)} job postings: {exc}")
+            if on_result is not None:
+                for job_id, _, _ in batch:
+                    on_result(job_id, None, exc)
+            return 0
+        if on_result is not None:
+            for (job_id, _, _), linkedin_id in zip(batch, linkedin_ids, strict=True):
+                on_result(job_id, linkedin_id, None)
+        return len(linkedin_ids)
@@ -0,0 +1,287 @@
+import datetime
+import os
+import socket
+from collections.abc import Iterator
+
+from sqlalchemy import func, update
+from sqlmodel import Session, col, or_, select
+
+from app.core.db import engine
+from app.logger import Logger
+from app.models import JobPostingsToScrape
+from app.scraper.metrics import ITEMS, set_backlog
+from app.scraper.request_policy import RequestFailed
+
+LEASE_SECONDS = 15 * 60
+MAX_ATTEMPTS = 5
+
+
+def default_consumer_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class JobPostingsQueue:
+    """
+    Work queue over the job_postings_to_scrape table.
+
+    Consumers lease batches with SELECT ... FOR UPDATE SKIP LOCKED, so any
+    number of them can run on any number of machines without scraping the
+    same posting twice. A lease expires after lease_seconds, which hands the
+    items of a crashed consumer back to the others, and items that fail
+    max_attempts times are dead-lettered instead of being retried forever.
+
+    The search card metadata stored with the job ids decides what is leased
+    first and what is left out: the newest postings are leased first,
+    postings whose card said they no longer accept applications are skipped
+    unless skip_closed is False, and a consumer can restrict itself to titles
+    matching title_pattern (a case insensitive regular expression) and to
+    postings at most max_age_days old. Job ids queued without card metadata
+    are always leased, last.
+    """
+
+    def __init__(
+        self,
+        consumer_id: str | None = None,
+        lease_seconds: int = LEASE_SECONDS,
+        max_attempts: int = MAX_ATTEMPTS,
+        newest_first: bool = True,
+        title_pattern: str | None = None,
+        max_age_days: int | None = None,
+        skip_closed: bool = True,
+        log_file_name: str = "job_consumer.log",
+    ):
+        self.logger = Logger(
+            prefix="JobPostingsQueue", log_file_name=log_file_name
+        ).get_logger()
+        self.consumer_id = consumer_id or default_consumer_id()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.newest_first = newest_first
+        self.title_pattern = title_pattern
+        self.max_age_days = max_age_days
+        self.skip_closed = skip_closed
+
+    @staticmethod
+    def _pending():
+        return (
+            col(JobPostingsToScrape.processed) == False,  # noqa: E712
+            col(JobPostingsToScrape.dead_lettered) == False,  # noqa: E712
+        )
+
+    def _card_filters(self, now: datetime.datetime) -> list:
+        filters = []
+        if self.skip_closed:
+            filters.append(col(JobPostingsToScrape.closed).is_not(True))
+        if self.title_pattern is not None:
+            filters.append(
+                or_(
+                    col(JobPostingsToScrape.title).is_(None),
+                    col(JobPostingsToScrape.title).regexp_match(
+                        self.title_pattern, flags="i"
+                    ),
+                )
+            )
+        if self.max_age_days is not None:
+            filters.append(
+                or_(
+                    col(JobPostingsToScrape.date_posted).is_(None),
+                    col(JobPostingsToScrape.date_posted)
+                    >= now - datetime.timedelta(days=self.max_age_days),
+                )
+            )
+        return filters
+
+    def _lease_order(self) -> list:
+        if self.newest_first:
+            return [
+                col(JobPostingsToScrape.date_posted).desc().nulls_last(),
+                col(JobPostingsToScrape.id),
+            ]
+        return [col(JobPostingsToScrape.id)]
+
+    def _sort_leased(self, rows: list) -> list:
+        """
+        UPDATE ... RETURNING does not keep the order of the candidates
+        subquery, so the leased rows are put back in _lease_order
+        """
+        rows = sorted(rows, key=lambda row: row.id)
+        if self.newest_first:
+            # Stable, so ties keep the id order, and postings without a date last
+            rows.sort(
+                key=lambda row: row.date_posted or datetime.datetime.min, reverse=True
+            )
+        return rows
+
+    def lease(self, batch_size: int) -> list[int]:
+        """
+        Leases up to batch_size job ids that are neither processed, dead-lettered
+        nor leased by another consumer
+        :param batch_size: maximum number of job ids to lease
+        :return: The leased LinkedIn job ids
+        """
+        now = datetime.datetime.utcnow()
+        with Session(engine) as session:
+            self._dead_letter_expired(session, now)
+            candidates = (
+                select(JobPostingsToScrape.id)
+                .where(*self._pending())
+                .where(col(JobPostingsToScrape.attempts) < self.max_attempts)
+                .where(
+                    or_(
+                        col(JobPostingsToScrape.lease_expires_at).is_(None),
+                        col(JobPostingsToScrape.lease_expires_at) < now,
+                    )
+                )
+                .where(*self._card_filters(now))
+                .order_by(*self._lease_order())
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            statement = (
+                update(JobPostingsToScrape)
+                .where(col(JobPostingsToScrape.id).in_(candidates.scalar_subquery()))
+                .values(
+                    leased_by=self.consumer_id,
+                    lease_expires_at=now
+                    + datetime.timedelta(seconds=self.lease_seconds),
+                    attempts=JobPostingsToScrape.attempts + 1,
+                )
+                .returning(
+                    JobPostingsToScrape.linkedin_job_id,
+                    JobPostingsToScrape.id,
+                    JobPostingsToScrape.date_posted,
+                )
+            )
+            rows = session.execute(statement).all()
+            session.commit()
+        job_ids = [row.linkedin_job_id for row in self._sort_leased(rows)]
+        self.logger.info(f"{self.consumer_id} leased {len(job_ids)} job ids")
+        return job_ids
+
+    def iter_job_ids(self, batch_size: int) -> Iterator[int]:
+        """
+        Yields leased job ids until the queue is drained. A new batch is only
+        leased once the previous one has been consumed, so a bounded consumer
+        never holds leases it is not about to work on
+        """
+        while job_ids := self.lease(batch_size):
+            yield from job_ids
+
+    def _dead_letter_expired(self, session: Session, now: datetime.datetime) -> None:
+        """Dead-letters items whose last allowed attempt was lost with its consumer"""
+        statement = (
+            update(JobPostingsToScrape)
+            .where(*self._pending())
+            .where(col(JobPostingsToScrape.attempts) >= self.max_attempts)
+            .where(col(JobPostingsToScrape.lease_expires_at) < now)
+            .values(
+                dead_lettered=True,
+                leased_by=None,
+                lease_expires_at=None,
+                last_error=func.coalesce(
+                    JobPostingsToScrape.last_error, "Lease expired"
+                ),
+            )
+        )
+        dead_lettered = session.execute(statement).rowcount
+        if dead_lettered:
+            self.logger.warning(f"Dead-lettered {dead_lettered} expired job ids")
+
+    def _lease_lost(self, count: int, action: str) -> None:
+        """Records job ids whose lease expired and was taken over by another consumer"""
+        if count:
+            ITEMS.labels("job_postings", "lease_lost").inc(count)
+            self.logger.warning(
+                f"{self.consumer_id} no longer holds the lease of {count} job ids, "
+                f"they were not {action}"
+            )
+
+    def complete(self, job_ids: list[int]) -> None:
+        """Marks job ids processed, unless their lease was taken over meanwhile"""
+        if not job_ids:
+            return
+        with Session(engine) as session:
+            completed = session.execute(
+                update(JobPostingsToScrape)
+                .where(col(JobPostingsToScrape.linkedin_job_id).in_(job_ids))
+                .where(JobPostingsToScrape.leased_by == self.consumer_id)
+                .values(
+                    processed=True,
+                    date_scraped=datetime.datetime.utcnow(),
+                    leased_by=None,
+                    lease_expires_at=None,
+                    last_error=None,
+                )
+            ).rowcount
+            session.commit()
+        self._lease_lost(len(job_ids) - completed, "completed")
+
+    def fail(self, job_id: int, error: str, permanent: bool = False) -> None:
+        """
+        Releases a failed job id so that it is retried, or dead-letters it when
+        the failure is permanent or it has used all its attempts. Nothing is
+        changed if its lease was taken over meanwhile
+        """
+        with Session(engine) as session:
+            dead_lettered = session.execute(
+                update(JobPostingsToScrape)
+                .where(JobPostingsToScrape.linkedin_job_id == job_id)
+                .where(JobPostingsToScrape.leased_by == self.consumer_id)
+                .values(
+                    leased_by=None,
+                    lease_expires_at=None,
+                    last_error=error,
+                    dead_lettered=(
+                        permanent or JobPostingsToScrape.attempts >= self.max_attempts
+                    ),
+                )
+                .returning(JobPostingsToScrape.dead_lettered)
+            ).scalar_one_or_none()
+            session.commit()
+        if dead_lettered is None:
+            self._lease_lost(1, "failed")
+        elif dead_lettered:
+            self.logger.warning(f"{job_id} - Dead-lettered: {error}")
+
+    def record_result(
+        self, job_id: str, result: int | None, error: Exception | None
+    ) -> None:
+        """
+        Callback for JobPostingsPipeline.run and
+        JobPostingDataExtractor.extract_job_postings. Stored job postings are
+        already marked processed and released by the batched update of
+        save_job_postings, only failures need a write
+        """
+        if error is None:
+            return
+        self.fail(
+            int(job_id),
+            str(error),
+            permanent=isinstance(error, RequestFailed) and error.permanent,
+        )
+
+    def stats(self) -> dict:
+        now = datetime.datetime.utcnow()
+        leased = col(JobPostingsToScrape.lease_expires_at) >= now
+        not_leased = or_(
+            col(JobPostingsToScrape.lease_expires_at).is_(None),
+            col(JobPostingsToScrape.lease_expires_at) < now,
+        )
+        with Session(engine) as session:
+            row = session.exec(
+                select(
+                    func.count().filter(*self._pending(), not_leased),
+                    func.count().filter(*self._pending(), leased),
+                    func.count().filter(col(JobPostingsToScrape.processed)),
+                    func.count().filter(col(JobPostingsToScrape.dead_lettered)),
+                )
+            ).one()
+        pending, leased_count, processed, dead_lettered = row
+        stats = {
+            "pending": pending,
+            "leased": leased_count,
+            "processed": processed,
+            "dead_lettered": dead_lettered,
+        }
+        set_backlog("job_postings", stats)
+        return stats
@@ -0,0 +1,233 @@
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+
+from sqlalchemy import update
+from sqlmodel import Session, col, select
+
+from app.core.db import engine
+from app.logger import Logger
+from app.models import JobPostingHtml, JobPostings
+from app.scraper.company_scrape_queue import enqueue_companies
+from app.scraper.extractors.job_posting_parser import (
+    JOB_POSTING_FIELDS,
+    hash_job_posting_fields,
+)
+from app.scraper.extractors.job_postings_extractor import (
+    DEFAULT_PARSER,
+    JobPostingDataExtractor,
+)
+from app.scraper.html_store import decompress_html
+from app.scraper.institution_linker import link_institutions
+
+BATCH_SIZE = 500
+# In backend/logs whatever the working directory, so any run can resume
+CHECKPOINT_PATH = str(
+    Path(__file__).resolve().parents[2] / "logs" / "reextract_checkpoint.json"
+)
+
+# Extractor used by the worker processes, set by _init_worker
+_worker_extractor: JobPostingDataExtractor | None = None
+
+
+def _init_worker(parser: str, log_file_name: str) -> None:
+    global _worker_extractor
+    _worker_extractor = JobPostingDataExtractor(
+        log_file_name=log_file_name, parser=parser
+    )
+
+
+def _reextract_batch(
+    pages: list[tuple[int, str, bytes]],
+) -> list[tuple[int, dict | None, str | None]]:
+    """
+    Runs in the worker processes
+    :param pages: (job posting id, compression, compressed html) tuples
+    :return: (job posting id, fields, error) tuples
+    """
+    results: list[tuple[int, dict | None, str | None]] = []
+    for job_posting_id, compression, content in pages:
+        try:
+            html = decompress_html(compression, content)
+            fields = _worker_extractor.parse_job_posting(html)  # type: ignore
+            results.append((job_posting_id, fields, None))
+        except Exception as e:
+            results.append((job_posting_id, None, str(e)))
+    return results
+
+
+class JobPostingsReextractor:
+    """
+    Re-runs the job posting field extractors over the stored pages, without
+    any network call, and writes back the fields that changed.
+
+    Pages are streamed out of the database with a server-side cursor, parsed
+    in batches across a process pool and the changes are written with one
+    bulk UPDATE per batch. Progress is checkpointed after every batch, so an
+    interrupted run resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        parser: str = DEFAULT_PARSER,
+        workers: int | None = None,
+        batch_size: int = BATCH_SIZE,
+        checkpoint_path: str | None = CHECKPOINT_PATH,
+        log_file_name: str = "reextract.log",
+    ):
+        self.logger = Logger(
+            prefix="JobPostingsReextractor", log_file_name=log_file_name
+        ).get_logger()
+        self.log_file_name = log_file_name
+        self.parser = parser
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.checkpoint_path = checkpoint_path
+
+    def load_checkpoint(self) -> int:
+        """:return: The id of the last job posting already re-extracted"""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return 0
+        with open(self.checkpoint_path) as f:
+            return json.load(f)["last_id"]
+
+    def save_checkpoint(self, last_id: int) -> None:
+        if not self.checkpoint_path:
+            return
+        # Written to a temporary file first so a crash never leaves it truncated
+        os.makedirs(os.path.dirname(self.checkpoint_path) or ".", exist_ok=True)
+        temporary_path = f"{self.checkpoint_path}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump({"last_id": last_id}, f)
+        os.replace(temporary_path, self.checkpoint_path)
+
+    def iter_batches(self, after_id: int) -> Iterator[list]:
+        """
+        Streams the stored pages and current fields of the job postings with
+        an id greater than after_id, in batches of batch_size
+        """
+        statement = (
+            select(
+                JobPostings.id,
+                JobPostingHtml.compression,
+                JobPostingHtml.content,
+                *[getattr(JobPostings, field) for field in JOB_POSTING_FIELDS],
+            )
+            .join(JobPostingHtml, JobPostingHtml.hash == JobPostings.html_hash)
+            .where(col(JobPostings.id) > after_id)
+            .order_by(col(JobPostings.id))
+            .execution_options(yield_per=self.batch_size)
+        )
+        with Session(engine) as session:
+            yield from session.execute(statement).partitions()
+
+    @staticmethod
+    def get_changes(current: dict, fields: dict) -> dict:
+        return {
+            field: value for field, value in fields.items() if current[field] != value
+        }
+
+    def write_changes(self, changes: list[dict]) -> None:
+        """
+        Writes the changed fields of a batch. Job postings whose company changed
+        are unlinked from the old institution, linked to the new one when it is
+        already scraped and its company is queued for scraping otherwise
+        """
+        if not changes:
+            return
+        company_urls = [
+            change["company_url"] for change in changes if "company_url" in change
+        ]
+        with Session(engine) as session:
+            # ORM bulk UPDATE by primary key, executed as executemany
+            session.execute(update(JobPostings), changes)
+            if company_urls:
+                enqueue_companies(session, company_urls)
+                link_institutions(session, company_urls)
+            session.commit()
+
+    def _process_results(
+        self, results: list[tuple[int, dict | None, str | None]], currents: dict
+    ) -> tuple[int, int]:
+        changes = []
+        failed = 0
+        for job_posting_id, fields, error in results:
+            if fields is None:
+                failed += 1
+                self.logger.error(f"Job posting {job_posting_id} - {error}")
+                continue
+            changed_fields = self.get_changes(currents[job_posting_id], fields)
+            if changed_fields:
+                change = {
+                    "id": job_posting_id,
+                    **changed_fields,
+                    "content_hash": hash_job_posting_fields(fields),
+                }
+                if "company_url" in changed_fields:
+                    change["institution_id"] = None
+                changes.append(change)
+        self.write_changes(changes)
+        return len(changes), failed
+
+    def run(self, resume: bool = True) -> dict:
+        """
+        Re-extracts every stored job posting
+        :param resume: start after the checkpoint of a previous run
+        :return: Counts of processed, updated and failed job postings
+        """
+        last_id = self.load_checkpoint() if resume else 0
+        self.logger.info(f"Re-extracting job postings after id {last_id}")
+        stats = {"processed": 0, "updated": 0, "failed": 0}
+        start_time = time.perf_counter()
+        in_flight: deque[tuple[Future, dict, int]] = deque()
+
+        def drain_oldest() -> None:
+            # Batches are written in order so the checkpoint only moves past
+            # fully written batches
+            future, currents, batch_last_id = in_flight.popleft()
+            updated, failed = self._process_results(future.result(), currents)
+            stats["processed"] += len(currents)
+            stats["updated"] += updated
+            stats["failed"] += failed
+            self.save_checkpoint(batch_last_id)
+            rate = stats["processed"] / (time.perf_counter() - start_time)
+            self.logger.info(
+                f"Re-extracted up to id {batch_last_id}: {stats}, "
+                f"{rate:.0f} job postings/s"
+            )
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.parser, self.log_file_name),
+        ) as executor:
+            for batch in self.iter_batches(last_id):
+                pages = [(row[0], row[1], row[2]) for row in batch]
+                currents = {
+                    row[0]: dict(zip(JOB_POSTING_FIELDS, row[3:], strict=True))
+                    for row in batch
+                }
+                future = executor.submit(_reextract_batch, pages)
+                in_flight.append((future, currents, batch[-1][0]))
+                if len(in_flight) >= 2 * self.workers:
+                    drain_oldest()
+            while in_flight:
+                drain_oldest()
+
+        self.logger.info(f"Re-extraction finished: {stats}")
+        return stats
+
+
+def main():
+    reextractor = JobPostingsReextractor()
+    reextractor.run(resume=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+
+from sqlmodel import Session, select
+
+from app.core.db import engine
+from app.logger import Logger
+from app.models import JobPostingsToScrape
+
+LOAD_BATCH_SIZE = 50_000
+
+
+class KnownJobIds:
+    """
+    Compact membership index of the LinkedIn job ids already queued for scraping.
+
+    Ids loaded from the database are kept in a sorted array of 64-bit ints
+    (8 bytes per id) and looked up with a binary search. Ids added during a
+    run go to a small set until the index is reloaded.
+    """
+
+    def __init__(self, job_ids: Iterable[int] = ()):
+        self._sorted_ids = array("q", sorted(set(job_ids)))
+        self._added_ids: set[int] = set()
+
+    @classmethod
+    def from_sorted(cls, sorted_ids: array) -> "KnownJobIds":
+        """
+        Wraps an array of unique ids that is already sorted, without copying it
+        :param sorted_ids: array of 64-bit ints ("q") in increasing order
+        """
+        known_job_ids = cls()
+        known_job_ids._sorted_ids = sorted_ids
+        return known_job_ids
+
+    @classmethod
+    def from_database(cls, log_file_name: str = "scraper.log") -> "KnownJobIds":
+        logger = Logger(prefix="KnownJobIds", log_file_name=log_file_name).get_logger()
+        job_ids = array("q")
+        with Session(engine) as session:
+            # linkedin_job_id is unique, the database streams the ids sorted
+            # through its index and they go straight into the array
+            statement = (
+                select(JobPostingsToScrape.linkedin_job_id)
+                .where(JobPostingsToScrape.linkedin_job_id.is_not(None))  # type: ignore
+                .order_by(JobPostingsToScrape.linkedin_job_id)
+                .execution_options(yield_per=LOAD_BATCH_SIZE)
+            )
+            for partition in session.exec(statement).partitions():
+                job_ids.extend(partition)
+        known_job_ids = cls.from_sorted(job_ids)
+        logger.info(f"Loaded {len(known_job_ids)} known job ids")
+        return known_job_ids
+
+    def __len__(self) -> int:
+        return len(self._sorted_ids) + len(self._added_ids)
+
+    def __contains__(self, job_id: object) -> bool:
+        job_id = int(job_id)  # type: ignore
+        if job_id in self._added_ids:
+            return True
+        index = bisect_left(self._sorted_ids, job_id)
+        return index < len(self._sorted_ids) and self._sorted_ids[index] == job_id
+
+    def contains_all(self, job_ids: Iterable[str | int]) -> bool:
+        return all(job_id in self for job_id in job_ids)
+
+    def add(self, job_ids: Iterable[str | int]) -> None:
+        for job_id in job_ids:
+            if job_id not in self:
+                self._added_ids.add(int(job_id))
@@ -0,0 +1,117 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import prometheus_client
+
+from app.core.config import settings
+
+DURATION_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _counter(
+    name: str, documentation: str, labelnames: list[str]
+) -> prometheus_client.Counter:
+    return prometheus_client.Counter(name, documentation, labelnames)
+
+
+def _histogram(
+    name: str, documentation: str, labelnames: list[str]
+) -> prometheus_client.Histogram:
+    return prometheus_client.Histogram(
+        name, documentation, labelnames, buckets=DURATION_BUCKETS
+    )
+
+
+def _gauge(
+    name: str, documentation: str, labelnames: list[str]
+) -> prometheus_client.Gauge:
+    return prometheus_client.Gauge(name, documentation, labelnames)
+
+
+# The scraper label is one of job_ids, job_postings or companies
+REQUESTS = _counter(
+    "scraper_requests_total",
+    "HTTP requests sent to LinkedIn, by response status",
+    ["scraper", "status"],
+)
+REQUEST_DURATION = _histogram(
+    "scraper_request_duration_seconds",
+    "Duration of the HTTP requests sent to LinkedIn",
+    ["scraper"],
+)
+RETRIES = _counter(
+    "scraper_retries_total",
+    "Requests retried after a throttled or failed response",
+    ["scraper"],
+)
+PARSE_DURATION = _histogram(
+    "scraper_parse_duration_seconds",
+    "Time spent parsing a page",
+    ["scraper"],
+)
+DB_WRITE_DURATION = _histogram(
+    "scraper_db_write_duration_seconds",
+    "Time spent writing a batch of results to the database",
+    ["scraper"],
+)
+ITEMS = _counter(
+    "scraper_items_total",
+    "Items processed by the scrapers, by outcome",
+    ["scraper", "outcome"],
+)
+BACKLOG = _gauge(
+    "scraper_backlog_size",
+    "Items in the scrape queues, by state",
+    ["queue", "state"],
+)
+
+
+def record_request(scraper: str, status_code: int | None, duration: float) -> None:
+    """
+    :param scraper: job_ids, job_postings or companies
+    :param status_code: HTTP status of the response, None if no response was received
+    :param duration: seconds the request took
+    """
+    REQUESTS.labels(scraper, str(status_code) if status_code else "error").inc()
+    REQUEST_DURATION.labels(scraper).observe(duration)
+
+
+@contextmanager
+def observe_duration(histogram, scraper: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(scraper).observe(time.perf_counter() - start)
+
+
+def set_backlog(queue: str, stats: dict) -> None:
+    """Publishes the counts returned by the stats() of a scrape queue"""
+    for state, count in stats.items():
+        BACKLOG.labels(queue, state).set(count)
+
+
+def start_metrics_server(port: int) -> None:
+    """Serves the metrics of this process in the Prometheus format on port"""
+    prometheus_client.start_http_server(port)
+
+
+def write_metrics_textfile(path: str) -> None:
+    """
+    Writes the metrics of this process to path in the Prometheus format, for
+    the node exporter textfile collector
+    """
+    prometheus_client.write_to_textfile(path, prometheus_client.REGISTRY)
+
+
+def start_metrics_export() -> None:
+    """Starts the metrics server of a scraper process if SCRAPER_METRICS_PORT is set"""
+    if settings.SCRAPER_METRICS_PORT:
+        start_metrics_server(settings.SCRAPER_METRICS_PORT)
+
+
+def flush_metrics_export() -> None:
+    """Writes the metrics textfile of a scraper process if SCRAPER_METRICS_TEXTFILE is set"""
+    if settings.SCRAPER_METRICS_TEXTFILE:
+        write_metrics_textfile(settings.SCRAPER_METRICS_TEXTFILE)
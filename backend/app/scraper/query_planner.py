@@ -0,0 +1,165 @@
+import asyncio
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from app.logger import Logger
+from app.models import (
+    ExperienceLevelsEnum,
+    RemoteModalitiesEnum,
+    SalaryRangeFiltersEnum,
+    TimeFiltersEnum,
+)
+from app.scraper.fetch_engine import AsyncFetchEngine
+
+if TYPE_CHECKING:
+    from app.scraper.job_posting_publisher import JobIdsFetcher
+
+# The guest search stops returning results after about this many
+SEARCH_RESULTS_CAP = 1000
+
+
+@dataclass(frozen=True)
+class SplitDimension:
+    """
+    A search filter a saturated query can be split along.
+
+    The values of a partition filter are disjoint. They cover the whole
+    query when it is exhaustive, otherwise postings that do not set the facet
+    (a "Not Applicable" experience level) match none of them. The values of a
+    nested filter contain each other (the past week is in the past month,
+    100k+ is in 80k+), they are listed widest first and no value covers the
+    unfiltered query.
+    """
+
+    name: str
+    values: tuple
+    nested: bool = False
+    exhaustive: bool = False
+
+
+# Partitions first, they split without overlap
+SPLIT_DIMENSIONS = (
+    SplitDimension("experience_level", tuple(ExperienceLevelsEnum)),
+    # A workplace type is required on every posting
+    SplitDimension("remote_modality", tuple(RemoteModalitiesEnum), exhaustive=True),
+    SplitDimension(
+        "time_filter",
+        (
+            TimeFiltersEnum.PAST_MONTH,
+            TimeFiltersEnum.PAST_WEEK,
+            TimeFiltersEnum.PAST_24_HOURS,
+        ),
+        nested=True,
+    ),
+    SplitDimension("salary_range", tuple(SalaryRangeFiltersEnum), nested=True),
+)
+
+
+class QueryPlanner:
+    """
+    Splits search queries whose results are capped into narrower queries.
+
+    A query is saturated when the page just below the results cap is full,
+    which costs one request. Saturated queries are split recursively along
+    the filters they do not set yet, partitions first. A query split along a
+    filter whose values do not cover it is kept as well as its children: its
+    first results_cap results are the only way to reach postings that match
+    no value. The overlap is deduplicated when the job ids are queued. A query
+    split along an exhaustive partition is dropped, its children return
+    everything it would.
+    """
+
+    def __init__(
+        self,
+        job_ids_fetcher: "JobIdsFetcher",
+        results_cap: int = SEARCH_RESULTS_CAP,
+        dimensions: tuple[SplitDimension, ...] = SPLIT_DIMENSIONS,
+        log_file_name: str = "scraper.log",
+    ):
+        self.logger = Logger(
+            prefix="QueryPlanner", log_file_name=log_file_name
+        ).get_logger()
+        self.job_ids_fetcher = job_ids_fetcher
+        self.results_cap = results_cap
+        self.dimensions = dimensions
+        self.probes = 0
+        self._saturated: dict[str, bool] = {}
+
+    def build_url(self, query: dict) -> str:
+        return self.job_ids_fetcher.build_query(
+            keywords=query.get("keywords"),
+            location=query.get("location"),
+            salary_range=query.get("salary_range"),
+            time_filter=query.get("time_filter"),
+            experience_level=query.get("experience_level"),
+            remote_modality=query.get("remote_modality"),
+            company_id=query.get("company_id"),
+        ).build_url()
+
+    async def is_saturated(self, fetch_engine: AsyncFetchEngine, query: dict) -> bool:
+        url = self.build_url(query)
+        if url not in self._saturated:
+            self.probes += 1
+            last_page = self.results_cap - self.job_ids_fetcher.ids_per_request
+            _, is_short = await self.job_ids_fetcher.get_job_ids_with_check_async(
+                fetch_engine, url, last_page
+            )
+            self._saturated[url] = not is_short
+        return self._saturated[url]
+
+    async def plan(self, fetch_engine: AsyncFetchEngine, query: dict) -> list[dict]:
+        """
+        :param fetch_engine: client the probe requests are sent with
+        :param query: keyword arguments for JobIdsFetcher.build_query
+        :return: Queries that together cover the results of query, as keyword
+            arguments for JobIdsFetcher.build_query
+        """
+        probes = self.probes
+        queries, complete = await self._plan(fetch_engine, query, self.dimensions)
+        if len(queries) > 1 or not complete:
+            self.logger.info(
+                f"Split {query} into {len(queries)} queries with "
+                f"{self.probes - probes} probe requests"
+                + ("" if complete else ", some results stay capped")
+            )
+        return queries
+
+    async def _plan(
+        self,
+        fetch_engine: AsyncFetchEngine,
+        query: dict,
+        dimensions: tuple[SplitDimension, ...],
+    ) -> tuple[list[dict], bool]:
+        """
+        :return: The queries and whether the partitions they end up in are all
+            below the results cap
+        """
+        if not await self.is_saturated(fetch_engine, query):
+            return [query], True
+        dimensions = tuple(
+            dimension for dimension in dimensions if query.get(dimension.name) is None
+        )
+        if not dimensions:
+            return [query], False
+        dimension, remaining = dimensions[0], dimensions[1:]
+        children = [{**query, dimension.name: value} for value in dimension.values]
+        queries = [] if dimension.exhaustive else [query]
+
+        if not dimension.nested:
+            plans = await asyncio.gather(
+                *[self._plan(fetch_engine, child, remaining) for child in children]
+            )
+            queries.extend(
+                child_query
+                for child_queries, _ in plans
+                for child_query in child_queries
+            )
+            return queries, all(complete for _, complete in plans)
+
+        # Narrower values are only needed while the wider ones stay capped
+        for child in children:
+            child_queries, complete = await self._plan(fetch_engine, child, remaining)
+            queries.extend(child_queries)
+            if complete:
+                break
+        return queries, False
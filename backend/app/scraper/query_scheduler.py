@@ -0,0 +1,266 @@
+import asyncio
+import datetime
+import time
+
+from sqlalchemy import update
+from sqlmodel import Session, col, or_, select
+
+from app.core.db import engine
+from app.logger import Logger
+from app.models import JobPostingQueries
+from app.scraper.fetch_engine import AsyncFetchEngine
+from app.scraper.job_posting_publisher import JOB_KEYWORDS, JobIdsFetcher
+from app.scraper.known_ids import KnownJobIds
+
+MIN_REFRESH_INTERVAL_MINUTES = 15
+MAX_REFRESH_INTERVAL_MINUTES = 60 * 24
+HIGH_YIELD_NEW_IDS = 50
+POLL_INTERVAL_SECONDS = 60
+# How long a claimed query is kept from other schedulers while it runs
+CLAIM_SECONDS = 15 * 60
+
+
+class QueryScheduler:
+    """
+    Runs the registered JobPostingQueries when they are due.
+
+    Queries are claimed by priority and due time (several schedulers can
+    share the registry), run concurrently through one shared HTTP client
+    (the global request budget) and rescheduled according to how many new
+    job ids they yielded: productive queries are refreshed more often,
+    queries that yield nothing back off.
+    """
+
+    def __init__(
+        self,
+        job_ids_fetcher: JobIdsFetcher | None = None,
+        max_concurrent_queries: int = 5,
+        max_queries_per_cycle: int = 100,
+        incremental: bool = True,
+        min_refresh_interval_minutes: int = MIN_REFRESH_INTERVAL_MINUTES,
+        max_refresh_interval_minutes: int = MAX_REFRESH_INTERVAL_MINUTES,
+        high_yield_new_ids: int = HIGH_YIELD_NEW_IDS,
+        claim_seconds: int = CLAIM_SECONDS,
+        log_file_name: str = "query_scheduler.log",
+    ):
+        self.logger = Logger(
+            prefix="QueryScheduler", log_file_name=log_file_name
+        ).get_logger()
+        self.job_ids_fetcher = job_ids_fetcher or JobIdsFetcher(
+            log_file_name=log_file_name
+        )
+        self.max_concurrent_queries = max_concurrent_queries
+        self.max_queries_per_cycle = max_queries_per_cycle
+        self.incremental = incremental
+        self.min_refresh_interval_minutes = min_refresh_interval_minutes
+        self.max_refresh_interval_minutes = max_refresh_interval_minutes
+        self.high_yield_new_ids = high_yield_new_ids
+        self.claim_seconds = claim_seconds
+
+    def register_queries(
+        self,
+        queries: list[dict],
+        refresh_interval_minutes: int | None = None,
+        priority: int | None = None,
+    ) -> list[str]:
+        """
+        Adds queries to the registry, already registered ones are left untouched
+        :param queries: keyword arguments for JobIdsFetcher.build_query
+        :return: The urls of the queries
+        """
+        urls = []
+        for query in queries:
+            query_builder = self.job_ids_fetcher.build_query(
+                query.get("keywords"),
+                query.get("location"),
+                query.get("salary_range"),
+                query.get("time_filter"),
+                query.get("experience_level"),
+                query.get("remote_modality"),
+                query.get("company_id"),
+            )
+            urls.append(
+                query_builder.build_url_and_write_to_db(
+                    refresh_interval_minutes=refresh_interval_minutes,
+                    priority=priority,
+                )
+            )
+        return urls
+
+    def get_due_queries(self) -> list[JobPostingQueries]:
+        """
+        Claims up to max_queries_per_cycle due queries. They are picked with
+        SELECT ... FOR UPDATE SKIP LOCKED and their next_run_at is pushed
+        claim_seconds ahead in the same statement, so concurrent schedulers
+        never run the same query. record_run sets the actual next run, and
+        the queries of a crashed scheduler are due again once the claim ends
+        :return: The claimed queries, highest priority first
+        """
+        now = datetime.datetime.utcnow()
+        with Session(engine, expire_on_commit=False) as session:
+            candidates = (
+                select(JobPostingQueries.id)
+                .where(JobPostingQueries.is_active == True)  # noqa: E712
+                .where(
+                    or_(
+                        col(JobPostingQueries.next_run_at).is_(None),
+                        col(JobPostingQueries.next_run_at) <= now,
+                    )
+                )
+                .order_by(
+                    col(JobPostingQueries.priority).desc(),
+                    col(JobPostingQueries.next_run_at).asc().nulls_first(),
+                )
+                .limit(self.max_queries_per_cycle)
+                .with_for_update(skip_locked=True)
+            )
+            statement = (
+                update(JobPostingQueries)
+                .where(col(JobPostingQueries.id).in_(candidates.scalar_subquery()))
+                .values(
+                    next_run_at=now + datetime.timedelta(seconds=self.claim_seconds)
+                )
+                .returning(JobPostingQueries)
+            )
+            queries = list(session.execute(statement).scalars().all())
+            session.commit()
+        # UPDATE ... RETURNING does not keep the order of the candidates subquery
+        queries.sort(key=lambda query: query.id)  # type: ignore
+        queries.sort(key=lambda query: query.priority, reverse=True)
+        return queries
+
+    def next_refresh_interval(self, current_interval: int, new_ids: int) -> int:
+        """
+        Doubles the interval of queries that yielded nothing and halves it for
+        the ones that yielded a lot, within the configured bounds
+        """
+        if new_ids == 0:
+            interval = current_interval * 2
+        elif new_ids >= self.high_yield_new_ids:
+            interval = current_interval // 2
+        else:
+            interval = current_interval
+        return max(
+            self.min_refresh_interval_minutes,
+            min(self.max_refresh_interval_minutes, interval),
+        )
+
+    def record_run(
+        self,
+        query_id: int,
+        started_at: datetime.datetime,
+        duration_seconds: float,
+        new_ids: int | None,
+    ) -> None:
+        """
+        Stores the run stats and schedules the next run. Failed runs (new_ids is
+        None) are retried after the current interval without changing it
+        """
+        with Session(engine) as session:
+            query = session.get(JobPostingQueries, query_id)
+            if query is None:
+                return
+            if new_ids is not None:
+                query.refresh_interval_minutes = self.next_refresh_interval(
+                    query.refresh_interval_minutes, new_ids
+                )
+                query.last_run_new_ids = new_ids
+                query.total_new_ids += new_ids
+                query.total_runs += 1
+            query.last_run_at = started_at
+            query.last_run_duration_seconds = duration_seconds
+            query.next_run_at = started_at + datetime.timedelta(
+                minutes=query.refresh_interval_minutes
+            )
+            session.add(query)
+            session.commit()
+
+    async def _run_query(
+        self,
+        fetch_engine: AsyncFetchEngine,
+        query: JobPostingQueries,
+        semaphore: asyncio.Semaphore,
+        known_job_ids: KnownJobIds | None,
+    ) -> int:
+        async with semaphore:
+            started_at = datetime.datetime.utcnow()
+            start_time = time.perf_counter()
+            url = self.job_ids_fetcher.get_saved_query_url(query, self.incremental)
+            new_ids = None
+            try:
+                new_ids = await self.job_ids_fetcher.scrape_url_async(
+                    fetch_engine, url, known_job_ids=known_job_ids
+                )
+                self.logger.info(f"Query {query.id} yielded {new_ids} new job ids")
+            except Exception as e:
+                self.logger.error(f"Query {query.id} failed: {e}")
+            await asyncio.to_thread(
+                self.record_run,
+                query.id,  # type: ignore
+                started_at,
+                time.perf_counter() - start_time,
+                new_ids,
+            )
+            return new_ids or 0
+
+    async def run_due_queries_async(self) -> int:
+        """
+        Runs every due query concurrently
+        :return: Number of new job ids queued
+        """
+        queries = await asyncio.to_thread(self.get_due_queries)
+        if not queries:
+            self.logger.info("No queries are due")
+            return 0
+        self.logger.info(f"Running {len(queries)} due queries")
+        known_job_ids = (
+            await asyncio.to_thread(KnownJobIds.from_database)
+            if self.incremental
+            else None
+        )
+        semaphore = asyncio.Semaphore(self.max_concurrent_queries)
+        async with AsyncFetchEngine(
+            max_concurrency=self.job_ids_fetcher.max_concurrent_requests
+        ) as fetch_engine:
+            results = await asyncio.gather(
+                *[
+                    self._run_query(fetch_engine, query, semaphore, known_job_ids)
+                    for query in queries
+                ]
+            )
+        new_ids = sum(results)
+        self.logger.info(
+            f"Queued {new_ids} new job ids from {len(queries)} queries, "
+            f"rate limiter stats: {self.job_ids_fetcher.rate_limiter.stats()}"
+        )
+        return new_ids
+
+    def run_once(self) -> int:
+        return asyncio.run(self.run_due_queries_async())
+
+    def run_forever(self, poll_interval_seconds: int = POLL_INTERVAL_SECONDS) -> None:
+        while True:
+            self.run_once()
+            time.sleep(poll_interval_seconds)
+
+
+def main():
+    scheduler = QueryScheduler(
+        job_ids_fetcher=JobIdsFetcher(
+            job_ids_fetch_workers=10,
+            max_wait_time=10,
+            max_concurrent_requests=20,
+            log_file_name="query_scheduler.log",
+        )
+    )
+    scheduler.register_queries(
+        [
+            {"keywords": job_keyword, "location": "Washington DC"}
+            for job_keyword in JOB_KEYWORDS
+        ]
+    )
+    scheduler.run_forever()
+
+
+if __name__ == "__main__":
+    main()
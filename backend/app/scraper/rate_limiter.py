@@ -0,0 +1,211 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from app.logger import Logger
+
+THROTTLE_STATUS_CODES = (429,)
+CONCURRENCY_POLL_INTERVAL = 0.05
+OBSERVED_RATE_WINDOW = 60.0
+
+
+def parse_retry_after(value: str | None, max_wait: float | None = None) -> float | None:
+    """
+    Parses a Retry-After header, which is either a number of seconds or an HTTP date
+    :param value: raw header value
+    :param max_wait: optional cap for the returned number of seconds
+    :return: seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        seconds = max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    if max_wait is not None:
+        seconds = min(seconds, max_wait)
+    return seconds
+
+
+class AdaptiveRateLimiter:
+    """
+    Process-wide rate controller shared by every scraper that talks to the same host.
+
+    Requests are admitted by a token bucket (requests per second) and by a
+    concurrency limit (requests in flight). Both follow AIMD: they grow
+    additively while responses succeed and are cut multiplicatively when the
+    server throttles us, at which point every caller is paused, honouring
+    Retry-After when the server sends it.
+    """
+
+    def __init__(
+        self,
+        name: str = "linkedin",
+        initial_rate: float = 2.0,
+        min_rate: float = 0.1,
+        max_rate: float = 20.0,
+        rate_increase: float = 0.1,
+        initial_concurrency: int = 10,
+        min_concurrency: int = 1,
+        max_concurrency: int = 50,
+        decrease_factor: float = 0.5,
+        max_pause: float = 120.0,
+        log_file_name: str = "scraper.log",
+    ):
+        self.logger = Logger(
+            prefix="AdaptiveRateLimiter", log_file_name=log_file_name
+        ).get_logger()
+        self.name = name
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_increase = rate_increase
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.max_pause = max_pause
+
+        self._lock = threading.Lock()
+        self._rate = min(max(initial_rate, min_rate), max_rate)
+        self._concurrency = float(
+            min(max(initial_concurrency, min_concurrency), max_concurrency)
+        )
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._decrease_allowed_at = 0.0
+        self._successes = 0
+        self._throttles = 0
+        self._completions: deque[float] = deque()
+
+    @property
+    def current_rate(self) -> float:
+        """Currently allowed requests per second"""
+        with self._lock:
+            return self._rate
+
+    @property
+    def concurrency_limit(self) -> int:
+        """Currently allowed number of requests in flight"""
+        with self._lock:
+            return int(self._concurrency)
+
+    @property
+    def observed_rate(self) -> float:
+        """Successful responses per second over the last observation window"""
+        with self._lock:
+            self._trim_completions(time.monotonic())
+            return len(self._completions) / OBSERVED_RATE_WINDOW
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            self._trim_completions(now)
+            return {
+                "name": self.name,
+                "rate": round(self._rate, 3),
+                "concurrency_limit": int(self._concurrency),
+                "in_flight": self._in_flight,
+                "observed_rate": round(
+                    len(self._completions) / OBSERVED_RATE_WINDOW, 3
+                ),
+                "paused_for": round(max(0.0, self._paused_until - now), 3),
+                "successes": self._successes,
+                "throttles": self._throttles,
+            }
+
+    def acquire(self) -> None:
+        """Blocks until a request may be sent. Must be paired with release()"""
+        while (wait_time := self._try_acquire()) > 0:
+            time.sleep(wait_time)
+
+    async def acquire_async(self) -> None:
+        """Same as acquire() without blocking the event loop"""
+        while (wait_time := self._try_acquire()) > 0:
+            await asyncio.sleep(wait_time)
+
+    def release(
+        self, status_code: int | None, retry_after: float | None = None
+    ) -> None:
+        """
+        Frees the slot taken by acquire() and feeds the outcome back to the controller
+        :param status_code: HTTP status of the response, None if no response was received
+        :param retry_after: seconds requested by the server through Retry-After
+        """
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            now = time.monotonic()
+            if status_code in THROTTLE_STATUS_CODES:
+                self._on_throttle(now, retry_after)
+            elif status_code is not None and status_code < 400:
+                self._on_success(now)
+
+    def _try_acquire(self) -> float:
+        """Takes a slot if possible, otherwise returns the number of seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._in_flight >= int(self._concurrency):
+                return CONCURRENCY_POLL_INTERVAL
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self._in_flight += 1
+                return 0.0
+            return (1 - self._tokens) / self._rate
+
+    def _refill(self, now: float) -> None:
+        # The bucket holds at most one second worth of requests to avoid bursts
+        capacity = max(1.0, self._rate)
+        elapsed = now - self._last_refill
+        self._tokens = min(capacity, self._tokens + elapsed * self._rate)
+        self._last_refill = now
+
+    def _on_success(self, now: float) -> None:
+        self._successes += 1
+        self._completions.append(now)
+        self._trim_completions(now)
+        # Additive increase: roughly +rate_increase req/s per second of successes
+        self._rate = min(self.max_rate, self._rate + self.rate_increase / self._rate)
+        self._concurrency = min(
+            float(self.max_concurrency), self._concurrency + 1 / self._concurrency
+        )
+
+    def _on_throttle(self, now: float, retry_after: float | None) -> None:
+        self._throttles += 1
+        # Responses already in flight when we got throttled belong to the same
+        # congestion event, so only the first one cuts the rate
+        if now >= self._decrease_allowed_at:
+            self._rate = max(self.min_rate, self._rate * self.decrease_factor)
+            self._concurrency = max(
+                float(self.min_concurrency), self._concurrency * self.decrease_factor
+            )
+            self.logger.info(
+                f"{self.name} - Throttled, rate lowered to {self._rate:.2f} req/s "
+                f"and {int(self._concurrency)} concurrent requests"
+            )
+        pause = retry_after if retry_after is not None else 1 / self._rate
+        pause = min(pause, self.max_pause)
+        self._paused_until = max(self._paused_until, now + pause)
+        self._decrease_allowed_at = self._paused_until
+        self._tokens = 0.0
+        self._last_refill = self._paused_until
+
+    def _trim_completions(self, now: float) -> None:
+        while self._completions and now - self._completions[0] > OBSERVED_RATE_WINDOW:
+            self._completions.popleft()
+
+
+# Shared by every scraper hitting LinkedIn in this process
+linkedin_rate_limiter = AdaptiveRateLimiter(name="linkedin")
@@ -0,0 +1,243 @@
+import asyncio
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from app.logger import Logger
+
+# Outcomes of a request
+SUCCESS = "success"
+THROTTLED = "throttled"
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+THROTTLE_STATUS_CODES = (429,)
+# Client errors that may succeed when retried
+TRANSIENT_CLIENT_STATUS_CODES = (408,)
+
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT_SECONDS = 30.0
+MAX_RESET_TIMEOUT_SECONDS = 300.0
+
+
+class RequestFailed(Exception):
+    """A request that failed for good, or that used all its attempts"""
+
+    def __init__(self, url: str, status_code: int | None, outcome: str):
+        super().__init__(
+            f"Request to {url} failed "
+            f"({status_code if status_code is not None else 'no response'}, {outcome})"
+        )
+        self.url = url
+        self.status_code = status_code
+        self.outcome = outcome
+
+    @property
+    def permanent(self) -> bool:
+        return self.outcome == PERMANENT
+
+
+def classify(status_code: int | None) -> str:
+    """
+    :param status_code: HTTP status of the response, None if no response was
+        received (connection error, timeout)
+    :return: SUCCESS, THROTTLED, TRANSIENT (worth retrying after a backoff) or
+        PERMANENT (retrying will not help)
+    """
+    if status_code is None or status_code >= 500:
+        return TRANSIENT
+    if status_code in THROTTLE_STATUS_CODES:
+        return THROTTLED
+    if status_code in TRANSIENT_CLIENT_STATUS_CODES:
+        return TRANSIENT
+    if status_code >= 400:
+        return PERMANENT
+    return SUCCESS
+
+
+def backoff_seconds(
+    attempt: int,
+    base: float = BACKOFF_BASE_SECONDS,
+    cap: float = BACKOFF_MAX_SECONDS,
+) -> float:
+    """Exponential backoff with full jitter before retrying attempt (from 0)"""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class CircuitBreaker:
+    """
+    Stops every worker from sending requests to a host that keeps failing.
+
+    After failure_threshold consecutive transient failures (connection errors,
+    5xx) the circuit opens and requests wait for reset_timeout seconds. Then a
+    single trial request is let through: the circuit closes if it succeeds and
+    opens again for twice as long, up to max_reset_timeout, if it fails.
+    Throttling is left to the rate limiter and permanent errors say nothing
+    about the health of the host, neither counts as a failure.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT_SECONDS,
+        max_reset_timeout: float = MAX_RESET_TIMEOUT_SECONDS,
+        log_file_name: str = "scraper.log",
+    ):
+        self.logger = Logger(
+            prefix="CircuitBreaker", log_file_name=log_file_name
+        ).get_logger()
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open_until: float | None = None
+        self._open_timeout = reset_timeout
+        self._trial_in_flight = False
+        self._opened = 0
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._open_until is not None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "open": self._open_until is not None,
+                "consecutive_failures": self._failures,
+                "times_opened": self._opened,
+            }
+
+    def try_acquire(self) -> float:
+        """
+        Lets a request through if the circuit allows it, otherwise returns the
+        number of seconds to wait before asking again
+        """
+        with self._lock:
+            if self._open_until is None:
+                return 0.0
+            now = time.monotonic()
+            if now < self._open_until:
+                return self._open_until - now
+            if self._trial_in_flight:
+                return min(1.0, self.reset_timeout)
+            self._trial_in_flight = True
+            return 0.0
+
+    def wait(self) -> None:
+        while (wait_time := self.try_acquire()) > 0:
+            time.sleep(wait_time)
+
+    async def wait_async(self) -> None:
+        while (wait_time := self.try_acquire()) > 0:
+            await asyncio.sleep(wait_time)
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            trial = self._trial_in_flight
+            self._trial_in_flight = False
+            if outcome == TRANSIENT:
+                self._failures += 1
+                if trial:
+                    self._open(min(self._open_timeout * 2, self.max_reset_timeout))
+                elif (
+                    self._open_until is None
+                    and self._failures >= self.failure_threshold
+                ):
+                    self._open(self.reset_timeout)
+            elif outcome != THROTTLED:
+                if self._open_until is not None and trial:
+                    self.logger.info(f"{self.name} - Host recovered, circuit closed")
+                if trial or self._open_until is None:
+                    self._failures = 0
+                    self._open_until = None
+                    self._open_timeout = self.reset_timeout
+
+    def _open(self, timeout: float) -> None:
+        self._open_timeout = timeout
+        self._open_until = time.monotonic() + timeout
+        self._opened += 1
+        self.logger.warning(
+            f"{self.name} - {self._failures} consecutive failures, "
+            f"pausing requests for {timeout:.0f}s"
+        )
+
+
+class RequestPolicy:
+    """
+    Retry policy shared by the scrapers: it classifies the outcome of each
+    request, spaces transient failures with exponential backoff and jitter and
+    keeps one CircuitBreaker per host, so all the workers of a process stop
+    hitting a host that is down.
+    """
+
+    def __init__(
+        self,
+        backoff_base: float = BACKOFF_BASE_SECONDS,
+        backoff_max: float = BACKOFF_MAX_SECONDS,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT_SECONDS,
+        max_reset_timeout: float = MAX_RESET_TIMEOUT_SECONDS,
+    ):
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def circuit_breaker(self, url: str) -> CircuitBreaker:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(
+                    host,
+                    failure_threshold=self.failure_threshold,
+                    reset_timeout=self.reset_timeout,
+                    max_reset_timeout=self.max_reset_timeout,
+                )
+            return self._breakers[host]
+
+    def wait_for_host(self, url: str) -> None:
+        """Blocks while the circuit of the host of url is open"""
+        self.circuit_breaker(url).wait()
+
+    async def wait_for_host_async(self, url: str) -> None:
+        await self.circuit_breaker(url).wait_async()
+
+    def record(self, url: str, status_code: int | None) -> str:
+        """
+        Feeds the outcome of a request to the circuit breaker of its host
+        :param status_code: HTTP status of the response, None if no response was received
+        :return: The outcome of the request, see classify
+        """
+        outcome = classify(status_code)
+        self.circuit_breaker(url).record(outcome)
+        return outcome
+
+    def backoff(self, outcome: str, attempt: int) -> float:
+        """
+        Seconds to wait before retrying a request that failed with outcome.
+        Throttled requests are paused by the rate limiter instead
+        """
+        if outcome != TRANSIENT:
+            return 0.0
+        return backoff_seconds(attempt, self.backoff_base, self.backoff_max)
+
+    def stats(self) -> list[dict]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return [breaker.stats() for breaker in breakers]
+
+
+# Shared by every scraper hitting LinkedIn in this process
+linkedin_request_policy = RequestPolicy()
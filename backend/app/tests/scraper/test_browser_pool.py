@@ -0,0 +1,79 @@
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import pytest
+
+from app.scraper.browser_pool import BrowserPool
+
+
+@pytest.fixture
+def chrome():
+    with patch("app.scraper.browser_pool.ChromeDriverManager.install") as install:
+        install.return_value = "/path/to/chromedriver"
+        with patch("app.scraper.browser_pool.webdriver.Chrome") as chrome:
+            chrome.side_effect = lambda **kwargs: MagicMock()
+            chrome.install = install
+            yield chrome
+
+
+def test_browsers_are_reused(chrome):
+    pool = BrowserPool(size=2)
+    drivers = []
+    for _ in range(5):
+        with pool.browser() as driver:
+            drivers.append(driver)
+
+    assert chrome.call_count == 1
+    assert chrome.install.call_count == 1
+    assert all(driver is drivers[0] for driver in drivers)
+    drivers[0].quit.assert_not_called()
+
+
+def test_browser_is_recycled_after_max_pages(chrome):
+    pool = BrowserPool(size=1, max_pages_per_browser=2)
+    drivers = []
+    for _ in range(4):
+        with pool.browser() as driver:
+            drivers.append(driver)
+
+    assert chrome.call_count == 2
+    assert chrome.install.call_count == 1
+    assert drivers[0] is drivers[1] and drivers[2] is drivers[3]
+    drivers[0].quit.assert_called_once()
+    assert pool.recycled == 2
+
+
+def test_browser_is_recycled_when_the_block_raises(chrome):
+    pool = BrowserPool(size=1)
+    with pytest.raises(RuntimeError):
+        with pool.browser() as broken_driver:
+            raise RuntimeError("Chrome crashed")
+    with pool.browser() as driver:
+        pass
+
+    broken_driver.quit.assert_called_once()
+    assert driver is not broken_driver
+    assert chrome.call_count == 2
+
+
+@pytest.mark.usefixtures("chrome")
+def test_unhealthy_browser_is_discarded():
+    pool = BrowserPool(size=1)
+    with pool.browser() as crashed_driver:
+        pass
+    type(crashed_driver).current_url = PropertyMock(side_effect=Exception("gone"))
+    with pool.browser() as driver:
+        pass
+
+    assert driver is not crashed_driver
+    crashed_driver.quit.assert_called_once()
+
+
+@pytest.mark.usefixtures("chrome")
+def test_close_quits_idle_browsers():
+    with BrowserPool(size=2) as pool:
+        with pool.browser() as first_driver:
+            with pool.browser() as second_driver:
+                pass
+
+    first_driver.quit.assert_called_once()
+    second_driver.quit.assert_called_once()
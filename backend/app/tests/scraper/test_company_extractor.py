@@ -1,12 +1,15 @@
 from typing import ChainMap
 from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
 from bs4 import BeautifulSoup
 from sqlmodel import Session, select
 
 from app.models import Institutions
+from app.scraper.company_scrape_queue import CompanyPageNotFound
 from app.scraper.extractors.company_extractor import CompanyExtractor
+from app.scraper.rate_limiter import AdaptiveRateLimiter
 
 HTML_COMPANY_1 = """
 <div class="mb-2" data-test-id="about-us__size">
@@ -156,14 +159,14 @@ def test_parse_company_html():
 
 
 @patch("selenium.webdriver.Chrome")
-@patch("app.scraper.extractors.company_extractor.ChromeDriverManager.install")
+@patch("app.scraper.browser_pool.ChromeDriverManager.install")
 def test_process_company(mock_chrome_driver_manager, mock_chrome, session_mock):
     # Set up mocks
     mock_chrome.return_value = driver_mock
     mock_chrome_driver_manager.return_value = "/path/to/chromedriver"
 
     extractor = CompanyExtractor()
-    with patch.object(
+    with patch.object(extractor, "fetch_company_html", return_value=None), patch.object(
         extractor, "search_linkedin_company_and_get_html", return_value=HTML_COMPANY_1
     ):
         result = extractor.process_company("www.linkedin.com/company/test-company")
@@ -271,6 +274,8 @@ def test_process_companies_parallel(db: Session):
             return None
 
     with patch.object(
+        CompanyExtractor, "fetch_company_html", return_value=None
+    ), patch.object(
         CompanyExtractor,
         "search_linkedin_company_and_get_html",
         mock_search_linkedin_company_and_get_html,
@@ -330,3 +335,77 @@ def test_process_companies_parallel(db: Session):
         db.delete(company)
 
     db.commit()
+
+
+def http_extractor(handler) -> CompanyExtractor:
+    return CompanyExtractor(
+        wait_time=300,
+        browser_pool=MagicMock(),
+        rate_limiter=AdaptiveRateLimiter(name="test", initial_rate=100.0),
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def test_fetch_company_html_over_http():
+    requested_urls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested_urls.append(str(request.url))
+        return httpx.Response(200, text=HTML_COMPANY_1)
+
+    extractor = http_extractor(handler)
+    html = extractor.fetch_company_html("www.linkedin.com/company/test-company")
+
+    assert html == HTML_COMPANY_1
+    assert requested_urls == ["https://www.linkedin.com/company/test-company"]
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        httpx.Response(200, text="<html>Sign in to see this page</html>"),
+        httpx.Response(429, headers={"Retry-After": "1"}),
+        httpx.Response(999),
+    ],
+)
+def test_fetch_company_html_falls_back_when_the_page_is_not_served(response):
+    extractor = http_extractor(lambda request: response)
+    assert extractor.fetch_company_html("www.linkedin.com/company/test") is None
+
+
+@pytest.mark.usefixtures("session_mock")
+def test_process_company_over_http_skips_the_browser():
+    extractor = http_extractor(lambda request: httpx.Response(200, text=HTML_COMPANY_1))
+    with patch("app.scraper.extractors.company_extractor.time.sleep") as sleep:
+        result = extractor.process_company("www.linkedin.com/company/test-company")
+
+    assert result.name == "Test Company 1"
+    extractor.browser_pool.browser.assert_not_called()
+    sleep.assert_not_called()
+
+
+def test_search_linkedin_company_waits_for_the_company_page(driver_mock):
+    search_result = MagicMock()
+    search_result.get_attribute.return_value = "https://www.linkedin.com/company/test"
+    other_result = MagicMock()
+    other_result.get_attribute.return_value = "https://example.com"
+    driver_mock.find_elements.return_value = [other_result, search_result]
+    wait = MagicMock()
+    extractor = http_extractor(lambda request: httpx.Response(404))
+
+    with patch("app.scraper.extractors.company_extractor.time.sleep") as sleep:
+        html = extractor.search_linkedin_company_and_get_html(
+            "www.linkedin.com/company/test", driver_mock, wait
+        )
+
+    assert html == HTML_COMPANY_1
+    search_result.click.assert_called_once()
+    other_result.click.assert_not_called()
+    assert wait.until.call_count == 3
+    sleep.assert_not_called()
+
+
+def test_fetch_company_html_raises_when_the_company_has_no_page():
+    extractor = http_extractor(lambda request: httpx.Response(404))
+    with pytest.raises(CompanyPageNotFound):
+        extractor.fetch_company_html("www.linkedin.com/company/gone")
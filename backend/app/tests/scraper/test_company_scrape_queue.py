@@ -0,0 +1,101 @@
+import datetime
+
+import pytest
+from sqlalchemy import delete
+from sqlmodel import Session, col, select
+
+from app.models import CompaniesToScrape
+from app.scraper.company_scrape_queue import (
+    BACKOFF_BASE_SECONDS,
+    BACKOFF_MAX_SECONDS,
+    DONE,
+    FAILED,
+    PENDING,
+    CompanyPageNotFound,
+    CompanyScrapeQueue,
+    backoff_seconds,
+    enqueue_companies,
+)
+
+TEST_COMPANY_URLS = [
+    "https://www.linkedin.com/company/queue-test-1",
+    "https://www.linkedin.com/company/queue-test-2",
+    "https://www.linkedin.com/company/queue-test-3",
+]
+
+
+def test_backoff_seconds():
+    assert backoff_seconds(1) == BACKOFF_BASE_SECONDS
+    assert backoff_seconds(2) == 2 * BACKOFF_BASE_SECONDS
+    assert backoff_seconds(3) == 4 * BACKOFF_BASE_SECONDS
+    assert backoff_seconds(50) == BACKOFF_MAX_SECONDS
+
+
+@pytest.fixture
+def queued_companies(db: Session):
+    # Other due companies would be leased first, push them back meanwhile
+    pending = db.exec(
+        select(CompaniesToScrape).where(CompaniesToScrape.status == PENDING)
+    ).all()
+    next_attempts = {row.id: row.next_attempt_at for row in pending}
+    for row in pending:
+        row.next_attempt_at = datetime.datetime(2100, 1, 1)
+        db.add(row)
+    assert enqueue_companies(db, [*TEST_COMPANY_URLS, None, TEST_COMPANY_URLS[0]]) == 3
+    db.commit()
+    yield TEST_COMPANY_URLS
+    db.execute(
+        delete(CompaniesToScrape).where(
+            col(CompaniesToScrape.company_url).in_(TEST_COMPANY_URLS)
+        )
+    )
+    for row in pending:
+        row.next_attempt_at = next_attempts[row.id]
+        db.add(row)
+    db.commit()
+
+
+def get_company(db: Session, company_url: str) -> CompaniesToScrape:
+    db.expire_all()
+    return db.exec(
+        select(CompaniesToScrape).where(CompaniesToScrape.company_url == company_url)
+    ).one()
+
+
+def test_enqueue_skips_queued_companies(queued_companies, db: Session):
+    assert enqueue_companies(db, queued_companies) == 0
+
+
+def test_lease_complete_and_backoff(queued_companies, db: Session):
+    queue = CompanyScrapeQueue()
+    leased = queue.lease(10)
+    assert sorted(leased) == queued_companies
+    # Leased companies are not due again until their lease expires
+    assert queue.lease(10) == []
+
+    queue.complete(leased[0])
+    queue.fail(leased[1], "Timed out")
+    queue.fail(leased[2], "No page", permanent=True)
+
+    assert get_company(db, leased[0]).status == DONE
+    retried = get_company(db, leased[1])
+    assert retried.status == PENDING
+    assert retried.next_attempt_at > datetime.datetime.utcnow() + datetime.timedelta(
+        seconds=BACKOFF_BASE_SECONDS - 60
+    )
+    assert get_company(db, leased[2]).status == FAILED
+    assert queue.lease(10) == []
+
+
+def test_company_fails_after_max_attempts(queued_companies, db: Session):
+    queue = CompanyScrapeQueue(max_attempts=1)
+    company_url = queued_companies[0]
+    queue.lease(10)
+    queue.record_result(company_url, None, Exception("Failed to get HTML"))
+    queue.record_result(
+        queued_companies[1], None, CompanyPageNotFound("No LinkedIn page")
+    )
+
+    assert get_company(db, company_url).status == FAILED
+    assert get_company(db, queued_companies[1]).status == FAILED
+    assert get_company(db, queued_companies[2]).status == PENDING
@@ -0,0 +1,104 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.scraper.fetch_engine import AsyncFetchEngine
+from app.scraper.job_posting_publisher import JobIdsFetcher
+
+test_base_url = "https://example.com?param=value"
+
+
+def make_page(first_id: int, size: int) -> str:
+    cards = "".join(
+        f'<li><div class="base-card" data-entity-urn="urn:li:jobPosting:{first_id + i}"></div></li>'
+        for i in range(size)
+    )
+    return f"<html><body><ul>{cards}</ul></body></html>"
+
+
+def test_engine_limits_concurrency():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(_request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, text="ok")
+
+    async def run():
+        async with AsyncFetchEngine(
+            max_concurrency=3, transport=httpx.MockTransport(handler)
+        ) as fetch_engine:
+            responses = await asyncio.gather(
+                *[fetch_engine.get(f"https://example.com/{i}") for i in range(12)]
+            )
+        return responses
+
+    responses = asyncio.run(run())
+    assert all(response.status_code == 200 for response in responses)
+    assert max_in_flight == 3
+
+
+def test_engine_must_be_opened():
+    with pytest.raises(RuntimeError):
+        asyncio.run(AsyncFetchEngine().get("https://example.com"))
+
+
+def test_fetch_all_job_ids_async():
+    def handler(request: httpx.Request) -> httpx.Response:
+        start = int(request.url.params["start"])
+        # Two full pages of 10 ids followed by a short page
+        if start < 20:
+            return httpx.Response(200, text=make_page(start, 10))
+        if start == 20:
+            return httpx.Response(200, text=make_page(start, 5))
+        return httpx.Response(200, text=make_page(start, 0))
+
+    job_ids_fetcher = JobIdsFetcher(job_ids_fetch_workers=2, max_wait_time=1)
+
+    async def run():
+        async with AsyncFetchEngine(
+            transport=httpx.MockTransport(handler)
+        ) as fetch_engine:
+            return await job_ids_fetcher.fetch_all_job_ids_async(
+                fetch_engine, test_base_url
+            )
+
+    job_ids = asyncio.run(run())
+    assert sorted(job_ids, key=int) == [str(i) for i in range(25)]
+
+
+def test_iter_job_ids_async_stops_issuing_offsets():
+    requested_offsets = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        start = int(request.url.params["start"])
+        requested_offsets.append(start)
+        # Later pages answer faster, the terminal page arrives first
+        await asyncio.sleep(0.05 if start < 20 else 0.01)
+        if start < 20:
+            return httpx.Response(200, text=make_page(start, 10))
+        return httpx.Response(200, text=make_page(start, 3 if start == 20 else 0))
+
+    job_ids_fetcher = JobIdsFetcher(job_ids_fetch_workers=4, max_wait_time=1)
+
+    async def run():
+        async with AsyncFetchEngine(
+            transport=httpx.MockTransport(handler)
+        ) as fetch_engine:
+            return [
+                page
+                async for page in job_ids_fetcher.iter_job_ids_async(
+                    fetch_engine, test_base_url
+                )
+            ]
+
+    pages = asyncio.run(run())
+    offsets = sorted(offset for offset, job_ids in pages if job_ids)
+    assert offsets == [0, 10, 20]
+    assert sum(len(job_ids) for _, job_ids in pages) == 23
+    assert max(requested_offsets) <= 30
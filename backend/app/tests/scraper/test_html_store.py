@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import delete
+from sqlmodel import Session, col
+
+from app.models import JobPostingHtml
+from app.scraper.html_store import (
+    compress_html,
+    decompress_html,
+    hash_html,
+    load_html,
+    store_html,
+)
+from app.tests.scraper.test_job_extractor import HTML_CONTENT
+
+
+@pytest.mark.parametrize("compression", ["zstd", "zlib"])
+def test_compression_round_trip(compression):
+    content = compress_html(HTML_CONTENT, compression)
+    assert len(content) < len(HTML_CONTENT.encode()) / 2
+    assert decompress_html(compression, content) == HTML_CONTENT
+
+
+def test_unknown_compression():
+    with pytest.raises(ValueError):
+        compress_html(HTML_CONTENT, "lz4")
+
+
+def test_store_and_load_html(db: Session):
+    other_html = HTML_CONTENT + "<!-- another page -->"
+    hashes = store_html(db, [HTML_CONTENT, other_html, HTML_CONTENT])
+    # Storing a page again is a no-op
+    store_html(db, [other_html])
+    db.commit()
+
+    assert hashes == [
+        hash_html(HTML_CONTENT),
+        hash_html(other_html),
+        hash_html(HTML_CONTENT),
+    ]
+    assert load_html(db, hashes[0]) == HTML_CONTENT
+    assert load_html(db, hashes[1]) == other_html
+    assert load_html(db, "missing") is None
+
+    db.execute(delete(JobPostingHtml).where(col(JobPostingHtml.hash).in_(hashes)))
+    db.commit()
@@ -0,0 +1,94 @@
+from array import array
+
+import requests_mock
+
+from app.models import JobPostingQueries
+from app.scraper.job_posting_publisher import JobIdsFetcher, PaginationState
+from app.scraper.known_ids import KnownJobIds
+
+test_base_url = "https://example.com?param=value"
+
+
+def make_page(first_id: int, size: int) -> str:
+    cards = "".join(
+        f'<li><div class="base-card" data-entity-urn="urn:li:jobPosting:{first_id + i}"></div></li>'
+        for i in range(size)
+    )
+    return f"<html><body><ul>{cards}</ul></body></html>"
+
+
+def test_known_job_ids_membership():
+    known_job_ids = KnownJobIds([30, 10, 20, 10])
+    assert len(known_job_ids) == 3
+    assert 10 in known_job_ids
+    assert "20" in known_job_ids
+    assert 15 not in known_job_ids
+    known_job_ids.add(["15", "10"])
+    assert 15 in known_job_ids
+    assert len(known_job_ids) == 4
+    assert known_job_ids.contains_all(["10", "15", "30"])
+    assert not known_job_ids.contains_all(["10", "40"])
+
+
+def test_known_job_ids_from_sorted_array():
+    sorted_ids = array("q", [10, 20, 30])
+    known_job_ids = KnownJobIds.from_sorted(sorted_ids)
+    assert known_job_ids._sorted_ids is sorted_ids
+    assert len(known_job_ids) == 3
+    assert "20" in known_job_ids
+    assert 25 not in known_job_ids
+
+
+def test_pagination_state_short_page():
+    pagination = PaginationState(ids_per_request=10)
+    pagination.record_page(20, ["1"], is_short=True)
+    pagination.record_page(40, [], is_short=True)
+    assert pagination.terminal_offset == 20
+    assert pagination.is_past_end(30)
+    assert not pagination.is_past_end(10)
+
+
+def test_pagination_state_stops_after_consecutive_known_pages():
+    known_job_ids = KnownJobIds(range(100))
+    pagination = PaginationState(
+        ids_per_request=10, known_job_ids=known_job_ids, stop_after_known_pages=2
+    )
+    known_page = [str(job_id) for job_id in range(10)]
+    pagination.record_page(30, known_page, is_short=False)
+    # Pages 30 and 50 are not consecutive
+    pagination.record_page(50, known_page, is_short=False)
+    assert not pagination.is_finished
+    pagination.record_page(40, known_page, is_short=False)
+    assert pagination.terminal_offset == 40
+
+
+def test_pagination_state_ignores_known_pages_without_index():
+    pagination = PaginationState(ids_per_request=10, stop_after_known_pages=1)
+    pagination.record_page(0, ["1"], is_short=False)
+    assert not pagination.is_finished
+
+
+def test_iter_job_ids_incremental():
+    job_ids_fetcher = JobIdsFetcher(
+        job_ids_fetch_workers=1, ids_per_request=10, stop_after_known_pages=2
+    )
+    # Page 0 holds new ids 100-109, the following pages hold known ids
+    known_job_ids = KnownJobIds(range(10, 60))
+    with requests_mock.Mocker() as m:
+        m.get(f"{test_base_url}&start=0", text=make_page(100, 10))
+        for start in range(10, 60, 10):
+            m.get(f"{test_base_url}&start={start}", text=make_page(start, 10))
+
+        pages = list(
+            job_ids_fetcher.iter_job_ids(test_base_url, known_job_ids=known_job_ids)
+        )
+
+    assert [offset for offset, _ in pages] == [0, 10, 20]
+
+
+def test_get_saved_query_url():
+    query = JobPostingQueries(url=f"{test_base_url}&keywords=data", keywords="data")
+    assert JobIdsFetcher.get_saved_query_url(query, incremental=False) == query.url
+    assert JobIdsFetcher.get_saved_query_url(query, incremental=True).endswith(
+        "&sortBy=DD"
+    )
@@ -0,0 +1,66 @@
+from unittest.mock import MagicMock
+
+from sqlalchemy import delete
+from sqlmodel import Session, col, select
+
+from app.models import (
+    CompaniesToScrape,
+    Institutions,
+    InstitutionSizesEnum,
+    JobPostings,
+)
+from app.scraper.extractors.company_extractor import CompanyExtractor
+from app.scraper.extractors.job_postings_extractor import JobPostingDataExtractor
+from app.scraper.institution_linker import link_institutions
+from app.tests.scraper.test_job_extractor import HTML_CONTENT
+
+TEST_JOB_ID = "990000000201"
+TEST_COMPANY_URL = "https://www.linkedin.com/company/linker-test"
+
+
+def test_job_postings_are_linked_to_their_institution(db: Session):
+    job_extractor = JobPostingDataExtractor(parser="lxml")
+    fields = {
+        **job_extractor.parse_job_posting(HTML_CONTENT),
+        "company_url": TEST_COMPANY_URL,
+    }
+    job_extractor.save_job_postings([(TEST_JOB_ID, HTML_CONTENT, fields)])
+
+    company_extractor = CompanyExtractor(browser_pool=MagicMock())
+    company_extractor.write_company_to_database(
+        Institutions(
+            url=TEST_COMPANY_URL,
+            name="Linker Test",
+            about="About",
+            website="www.linker-test.com",
+            industry="Software Development",
+            size_id=InstitutionSizesEnum.get_id("51-200 employees"),
+        )
+    )
+    institution = db.exec(
+        select(Institutions).where(Institutions.url == TEST_COMPANY_URL)
+    ).one()
+    job_posting = db.exec(
+        select(JobPostings).where(JobPostings.linkedin_id == int(TEST_JOB_ID))
+    ).one()
+    assert job_posting.institution_id == institution.id
+
+    # The backfill only touches the job postings that are not linked yet
+    assert link_institutions(db) == 0
+    job_posting.institution_id = None
+    db.add(job_posting)
+    db.commit()
+    assert link_institutions(db, [TEST_COMPANY_URL, None]) == 1
+    db.commit()
+    db.refresh(job_posting)
+    assert job_posting.institution_id == institution.id
+
+    db.delete(job_posting)
+    db.execute(
+        delete(CompaniesToScrape).where(
+            col(CompaniesToScrape.company_url) == TEST_COMPANY_URL
+        )
+    )
+    db.commit()
+    db.delete(institution)
+    db.commit()
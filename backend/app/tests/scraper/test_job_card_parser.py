@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from app.scraper.benchmark.standin_server import PAGES_DIR
+from app.scraper.extractors.job_card_parser import parse_job_cards
+from app.scraper.job_posting_publisher import JobIdsFetcher
+
+SEARCH_CARD = (PAGES_DIR / "search_card.html").read_text()
+
+
+def test_parse_job_cards():
+    html_content = (
+        SEARCH_CARD.format(job_id=4000000001, position=1)
+        + '<li><div class="base-card"></div></li>'
+        + '<li><div class="base-card" data-entity-urn="urn:li:jobPosting:4000000002"></div></li>'
+    )
+
+    job_cards = parse_job_cards(html_content)
+
+    assert job_cards == [
+        {
+            "linkedin_job_id": "4000000001",
+            "title": "Data Engineer",
+            "company": "Acme",
+            "company_url": "https://www.linkedin.com/company/acme",
+            "location": "Washington, DC",
+            "date_posted": datetime(2024, 8, 1),
+            "closed": False,
+        },
+        {
+            "linkedin_job_id": "4000000002",
+            "title": None,
+            "company": None,
+            "company_url": None,
+            "location": None,
+            "date_posted": None,
+            "closed": False,
+        },
+    ]
+
+
+def test_parse_closed_job_card():
+    html_content = SEARCH_CARD.format(job_id=4000000001, position=1).replace(
+        "Actively Hiring", "No longer accepting applications"
+    )
+    [job_card] = parse_job_cards(html_content)
+    assert job_card["closed"]
+
+
+def test_extract_job_ids_from_cards():
+    html_content = SEARCH_CARD.format(job_id=4000000001, position=1)
+    assert JobIdsFetcher().extract_job_ids(html_content) == ["4000000001"]
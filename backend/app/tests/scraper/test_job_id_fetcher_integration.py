@@ -1,6 +1,8 @@
 import pytest
 import requests_mock
 
+from app.scraper.job_posting_publisher import JobIdsFetcher
+
 
 test_base_url = "https://example.com?param=value"
 html = """
@@ -42,31 +44,45 @@ def test_get_job_ids_with_check(job_ids_fetcher):
         assert process_should_stop_flag
 
 
-def test_fetch_job_ids_integration(job_ids_fetcher):
+def test_iter_job_ids_integration(job_ids_fetcher):
     with requests_mock.Mocker() as m:
         paginated_url = f"{test_base_url}&start=0"
         m.get(paginated_url, text=html, status_code=200)
 
-        job_ids, process_should_stop_flag = job_ids_fetcher.fetch_job_ids_in_parallel(
-            test_base_url, 0
-        )
-        assert len(job_ids) == 1
-        assert "12345" in job_ids[0]
-        assert "67890" in job_ids[0]
-        assert process_should_stop_flag
+        pages = list(job_ids_fetcher.iter_job_ids(test_base_url))
+        assert len(pages) == 1
+        offset, job_ids = pages[0]
+        assert offset == 0
+        assert "12345" in job_ids
+        assert "67890" in job_ids
 
         paginated_url = f"{test_base_url}&start=1"
         m.get(paginated_url, text=html_single_job, status_code=200)
+        paginated_url = f"{test_base_url}&start=2"
+        m.get(paginated_url, text="<html></html>", status_code=200)
 
         job_ids_fetcher_with_one_job_id_per_request = JobIdsFetcher(
             job_ids_fetch_workers=1, jobs_base_url=test_base_url, ids_per_request=1
         )
-        job_ids, process_should_stop_flag = (
-            job_ids_fetcher_with_one_job_id_per_request.fetch_job_ids_in_parallel(
-                test_base_url, 1
+        pages = list(
+            job_ids_fetcher_with_one_job_id_per_request.iter_job_ids(
+                test_base_url, start=1
             )
         )
-        assert len(job_ids) == 1
-        assert "12345" in job_ids[0]
-        assert "67890" not in job_ids[0]
-        assert not process_should_stop_flag
+        # A full page keeps the pagination going until the empty page
+        assert pages == [(1, ["12345"]), (2, [])]
+
+
+def test_iter_job_ids_stops_at_terminal_page():
+    job_ids_fetcher = JobIdsFetcher(job_ids_fetch_workers=5, ids_per_request=2)
+    with requests_mock.Mocker() as m:
+        m.get(f"{test_base_url}&start=0", text=html, status_code=200)
+        m.get(f"{test_base_url}&start=2", text=html_single_job, status_code=200)
+        for start in range(4, 40, 2):
+            m.get(f"{test_base_url}&start={start}", text="<html></html>")
+
+        job_ids = job_ids_fetcher.fetch_all_job_ids(test_base_url)
+
+        assert sorted(job_ids) == ["12345", "67890"]
+        # Offsets stop being issued once the short page at start=2 is seen
+        assert m.call_count < len(range(4, 40, 2))
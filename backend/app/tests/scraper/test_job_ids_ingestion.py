@@ -0,0 +1,75 @@
+from sqlmodel import Session, col, delete, select
+
+from app.models import JobPostingsToScrape
+from app.scraper.job_posting_publisher import JobIdsFetcher
+
+TEST_JOB_IDS = ["9000000001", "9000000002", "9000000003"]
+
+
+def _cleanup(db: Session) -> None:
+    db.exec(
+        delete(JobPostingsToScrape).where(
+            col(JobPostingsToScrape.linkedin_job_id).in_(
+                [int(job_id) for job_id in TEST_JOB_IDS]
+            )
+        )
+    )
+    db.commit()
+
+
+def test_run_job_ids_to_db_counts_only_new_ids(db: Session):
+    job_ids_fetcher = JobIdsFetcher(db_batch_size=2)
+    _cleanup(db)
+
+    assert job_ids_fetcher.run_job_ids_to_db(TEST_JOB_IDS[:2]) == 2
+    # Overlapping and duplicated ids are skipped by the database
+    assert job_ids_fetcher.run_job_ids_to_db(TEST_JOB_IDS + TEST_JOB_IDS[:1]) == 1
+
+    queued = db.exec(
+        select(JobPostingsToScrape.linkedin_job_id).where(
+            col(JobPostingsToScrape.linkedin_job_id).in_(
+                [int(job_id) for job_id in TEST_JOB_IDS]
+            )
+        )
+    ).all()
+    assert sorted(queued) == [int(job_id) for job_id in TEST_JOB_IDS]
+
+    _cleanup(db)
+
+
+def test_run_job_ids_to_db_empty():
+    assert JobIdsFetcher().run_job_ids_to_db([]) == 0
+
+
+def test_run_job_cards_to_db_stores_card_fields(db: Session):
+    _cleanup(db)
+    job_ids_fetcher = JobIdsFetcher()
+    job_cards = [
+        {
+            "linkedin_job_id": TEST_JOB_IDS[0],
+            "title": "Data Engineer",
+            "company": "Acme",
+            "closed": True,
+        },
+        {"linkedin_job_id": TEST_JOB_IDS[1]},
+    ]
+
+    assert job_ids_fetcher.run_job_cards_to_db(job_cards) == 2
+
+    rows = {
+        row.linkedin_job_id: row
+        for row in db.exec(
+            select(JobPostingsToScrape).where(
+                col(JobPostingsToScrape.linkedin_job_id).in_(
+                    [int(job_id) for job_id in TEST_JOB_IDS]
+                )
+            )
+        ).all()
+    }
+    assert rows[int(TEST_JOB_IDS[0])].title == "Data Engineer"
+    assert rows[int(TEST_JOB_IDS[0])].company == "Acme"
+    assert rows[int(TEST_JOB_IDS[0])].closed
+    assert rows[int(TEST_JOB_IDS[1])].title is None
+    assert rows[int(TEST_JOB_IDS[1])].closed is None
+
+    _cleanup(db)
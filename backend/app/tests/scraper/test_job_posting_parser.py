@@ -0,0 +1,178 @@
+import html
+import json
+from datetime import datetime
+
+import pytest
+
+from app.scraper.extractors.job_posting_parser import (
+    find_json_ld_job_posting,
+    parse_job_posting_json_ld,
+    parse_job_posting_lxml,
+)
+from app.scraper.extractors.job_postings_extractor import JobPostingDataExtractor
+from app.tests.scraper.test_job_extractor import HTML_CONTENT
+
+HTML_WITH_POSTER_AND_SALARY = """
+<section class="top-card-layout">
+  <h2 class="top-card-layout__title font-sans text-lg papabear:text-xl font-bold leading-open text-color-text mb-0 topcard__title">
+    Data Engineer &amp; Analyst
+  </h2>
+  <a class="topcard__org-name-link topcard__flavor--black-link" href="https://www.linkedin.com/company/acme?trk=public_jobs_topcard-org-name">
+    Acme <!-- company --> Corp
+  </a>
+  <span class="topcard__flavor topcard__flavor--bullet">Arlington, VA</span>
+</section>
+<div class="salary compensation__salary">
+  $120,000.00/yr <span>-</span> $150,500.00/yr
+</div>
+<div class="message-the-recruiter">
+  <a class="base-card__full-link absolute top-0 right-0 bottom-0 left-0 p-0 z-[2]" href="https://www.linkedin.com/in/jane?trk=public_jobs">
+    <span class="sr-only">Jane Doe</span>
+  </a>
+  <h4 class="base-main-card__subtitle body-text text-color-text overflow-hidden">Recruiter at Acme</h4>
+</div>
+<div class="description__text">
+  <div class="show-more-less-html__markup">
+    Intro text
+    <!-- a comment -->
+    <strong>About the role</strong>
+    <p>First line<br>Second line</p>
+    <ul><li>Python</li><li>SQL <em>and</em> Spark</li></ul>
+    <br>
+    <ol><li>One</li></ol>
+    <span>Closing</span> tail text
+    <script>ignored()</script>
+  </div>
+</div>
+<ul class="description__job-criteria-list">
+  <li class="description__job-criteria-item">
+    <h3 class="description__job-criteria-subheader">Seniority level</h3>
+    <span class="description__job-criteria-text description__job-criteria-text--criteria">
+      Mid-Senior level
+    </span>
+  </li>
+  <li class="description__job-criteria-item">
+    <h3 class="description__job-criteria-subheader">Employment type</h3>
+  </li>
+  <li class="description__job-criteria-item">
+    <h3 class="description__job-criteria-subheader">Employment type</h3>
+    <span class="description__job-criteria-text">Contract</span>
+  </li>
+  <li class="description__job-criteria-item">
+    <h3 class="description__job-criteria-subheader">Job function</h3>
+    <span class="description__job-criteria-text">Engineering and Information Technology</span>
+  </li>
+  <li class="description__job-criteria-item">
+    <h3 class="description__job-criteria-subheader">Industries</h3>
+    <span class="description__job-criteria-text">Software Development, Banking</span>
+  </li>
+</ul>
+"""
+
+DESCRIPTION_MARKUP = HTML_WITH_POSTER_AND_SALARY.split(
+    '<div class="show-more-less-html__markup">'
+)[1].split("</div>")[0]
+JSON_LD = {
+    "@context": "http://schema.org",
+    "@type": "JobPosting",
+    "datePosted": "2024-08-01T14:23:51.000Z",
+    "validThrough": "2024-08-31T14:23:51.000Z",
+    "title": "Data Engineer & Analyst",
+    "description": html.escape(DESCRIPTION_MARKUP),
+    "employmentType": "CONTRACTOR",
+    "hiringOrganization": {
+        "@type": "Organization",
+        "name": "Acme Corp",
+        "sameAs": "https://www.linkedin.com/company/acme?trk=public_jobs",
+    },
+    "baseSalary": {
+        "@type": "MonetaryAmount",
+        "currency": "USD",
+        "value": {"minValue": 120000, "maxValue": 150500, "unitText": "YEAR"},
+    },
+}
+HTML_WITH_JSON_LD = (
+    '<script type="application/ld+json">'
+    + json.dumps(JSON_LD)
+    + "</script>"
+    + HTML_WITH_POSTER_AND_SALARY
+)
+
+HTML_MINIMAL = """
+<div class="message-the-recruiter"><a href="/in/nobody">Nobody</a></div>
+<div class="show-more-less-html__markup"><p>Only a description</p></div>
+"""
+
+
+@pytest.mark.parametrize(
+    "html_content",
+    [HTML_CONTENT, HTML_WITH_POSTER_AND_SALARY, HTML_WITH_JSON_LD, HTML_MINIMAL],
+)
+def test_lxml_parser_matches_beautifulsoup(html_content):
+    reference = JobPostingDataExtractor(parser="beautifulsoup").parse_job_posting(
+        html_content
+    )
+    assert parse_job_posting_lxml(html_content) == reference
+
+
+def test_lxml_parser_fields():
+    fields = JobPostingDataExtractor(parser="lxml").parse_job_posting(
+        HTML_WITH_POSTER_AND_SALARY
+    )
+    assert fields["title"] == "Data Engineer & Analyst"
+    assert fields["company_url"] == "https://www.linkedin.com/company/acme"
+    assert (fields["job_salary_min"], fields["job_salary_max"]) == (120000, 150500)
+    assert fields["job_poster_name"] == "Jane Doe"
+    assert fields["job_poster_profile"] == "https://www.linkedin.com/in/jane"
+    assert fields["industries"] == ["Software Development", "Banking"]
+    assert fields["description"].startswith("Intro text\n\nAbout the role\n")
+
+
+def test_lxml_parser_requires_description():
+    with pytest.raises(ValueError):
+        parse_job_posting_lxml("<div>No description</div>")
+
+
+def test_unknown_parser():
+    with pytest.raises(ValueError):
+        JobPostingDataExtractor(parser="regex")
+
+
+@pytest.mark.parametrize("missing", [(), ("title", "baseSalary", "description")])
+def test_json_ld_parser_matches_dom_extraction(missing):
+    json_ld = {key: value for key, value in JSON_LD.items() if key not in missing}
+    fields = JobPostingDataExtractor(parser="json_ld").parse_job_posting(
+        f'<script type="application/ld+json">{json.dumps(json_ld)}</script>'
+        + HTML_WITH_POSTER_AND_SALARY
+    )
+    # The DOM keeps the spaces around the comment in the company link
+    assert fields == {
+        **parse_job_posting_lxml(HTML_WITH_JSON_LD),
+        "company": "Acme Corp",
+    }
+    assert fields["date_posted"] == datetime(2024, 8, 1, 14, 23, 51)
+    assert fields["valid_through"] == datetime(2024, 8, 31, 14, 23, 51)
+
+
+@pytest.mark.parametrize(
+    "html_content", [HTML_CONTENT, HTML_WITH_POSTER_AND_SALARY, HTML_MINIMAL]
+)
+def test_json_ld_parser_without_json_ld(html_content):
+    assert parse_job_posting_json_ld(html_content) == parse_job_posting_lxml(
+        html_content
+    )
+
+
+def test_find_json_ld_job_posting():
+    graph = {
+        "@graph": [{"@type": "Organization"}, {"@type": "JobPosting", "title": "A"}]
+    }
+    html_content = (
+        '<script type="application/ld+json">{not json</script>'
+        f'<script type="application/ld+json">{json.dumps(graph)}</script>'
+    )
+    assert find_json_ld_job_posting(html_content) == {
+        "@type": "JobPosting",
+        "title": "A",
+    }
+    assert find_json_ld_job_posting("<html></html>") is None
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from app.scraper.extractors.job_postings_extractor import JobPostingDataExtractor
+from app.scraper.job_postings_pipeline import JobPostingsPipeline
+from app.tests.scraper.test_job_extractor import HTML_CONTENT
+
+
+class FakeExtractor(JobPostingDataExtractor):
+    def __init__(self):
+        super().__init__(parser="lxml")
+        self.lock = threading.Lock()
+        self.batches: list[list[tuple[str, str, dict]]] = []
+
+    def fetch_job_posting(self, job_id: str) -> str:
+        if job_id == "404":
+            raise ValueError("Not found")
+        if job_id == "500":
+            # The description is missing, parsing fails
+            return "<html></html>"
+        return HTML_CONTENT
+
+    def save_job_postings(self, job_postings: list[tuple[str, str, dict]]) -> list[int]:
+        with self.lock:
+            self.batches.append(job_postings)
+        return [int(job_id) for job_id, _, _ in job_postings]
+
+
+def test_pipeline_fetches_parses_and_writes_in_batches():
+    extractor = FakeExtractor()
+    pipeline = JobPostingsPipeline(
+        extractor=extractor,
+        fetch_workers=4,
+        parse_workers=2,
+        write_batch_size=5,
+        max_pending=6,
+        parser="lxml",
+    )
+    job_ids = [str(job_id) for job_id in range(1, 21)] + ["404", "500"]
+    results = {}
+
+    stored = pipeline.run(
+        iter(job_ids),
+        on_result=lambda job_id, result, error: results.update(
+            {job_id: (result, error)}
+        ),
+    )
+
+    assert stored == 20
+    assert set(results) == set(job_ids)
+    assert isinstance(results["404"][1], ValueError)
+    assert isinstance(results["500"][1], ValueError)
+    assert all(results[str(job_id)] == (job_id, None) for job_id in range(1, 21))
+    assert all(len(batch) <= 5 for batch in extractor.batches)
+    _, _, fields = extractor.batches[0][0]
+    assert fields["title"] == "Lead Sales Engineer, Enterprise"
+
+
+class FailingWriteExtractor(FakeExtractor):
+    def save_job_postings(self, job_postings: list[tuple[str, str, dict]]) -> list[int]:
+        raise ValueError("Database is down")
+
+
+def test_pipeline_stops_when_the_writer_fails():
+    pipeline = JobPostingsPipeline(
+        extractor=FailingWriteExtractor(),
+        fetch_workers=4,
+        parse_workers=2,
+        write_batch_size=2,
+        write_flush_interval=0.1,
+        parser="lxml",
+    )
+
+    def on_result(job_id: str, _result: int | None, _error: Exception | None) -> None:
+        # Raised in the writer thread, which dies with it
+        raise RuntimeError(f"Callback failed for {job_id}")
+
+    # More postings than the write queue holds, the pipeline must not block
+    with pytest.raises(RuntimeError, match="writer"):
+        pipeline.run((str(job_id) for job_id in range(1, 41)), on_result=on_result)
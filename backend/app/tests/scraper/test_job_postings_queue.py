@@ -0,0 +1,143 @@
+import datetime
+
+import pytest
+from sqlalchemy import delete
+from sqlmodel import Session, col, select
+
+from app.models import JobPostingsToScrape
+from app.scraper.job_postings_queue import JobPostingsQueue
+
+TEST_JOB_IDS = [990000000001, 990000000002, 990000000003]
+
+
+@pytest.fixture
+def queued_job_ids(db: Session):
+    # Older rows would be leased first, so the test rows are the only pending ones
+    pending = db.exec(
+        select(JobPostingsToScrape).where(
+            col(JobPostingsToScrape.processed) == False  # noqa: E712
+        )
+    ).all()
+    for row in pending:
+        row.processed = True
+        db.add(row)
+    for job_id in TEST_JOB_IDS:
+        db.add(JobPostingsToScrape(linkedin_job_id=job_id))
+    db.commit()
+    yield TEST_JOB_IDS
+    db.execute(
+        delete(JobPostingsToScrape).where(
+            col(JobPostingsToScrape.linkedin_job_id).in_(TEST_JOB_IDS)
+        )
+    )
+    for row in pending:
+        row.processed = False
+        db.add(row)
+    db.commit()
+
+
+def test_consumers_lease_disjoint_batches(queued_job_ids):
+    first = JobPostingsQueue(consumer_id="consumer-1")
+    second = JobPostingsQueue(consumer_id="consumer-2")
+
+    first_batch = first.lease(2)
+    second_batch = second.lease(2)
+
+    assert len(first_batch) == 2
+    assert len(second_batch) == 1
+    assert sorted(first_batch + second_batch) == queued_job_ids
+    assert second.lease(2) == []
+
+
+def test_complete_and_fail(queued_job_ids, db: Session):
+    queue = JobPostingsQueue(consumer_id="consumer-1", max_attempts=2)
+    leased = queue.lease(3)
+    queue.complete(leased[:2])
+    queue.fail(leased[2], "boom")
+
+    # The failed job id is released and retried until it runs out of attempts
+    assert queue.lease(3) == [leased[2]]
+    queue.fail(leased[2], "boom again")
+    assert queue.lease(3) == []
+
+    rows = {
+        row.linkedin_job_id: row
+        for row in db.exec(
+            select(JobPostingsToScrape).where(
+                col(JobPostingsToScrape.linkedin_job_id).in_(queued_job_ids)
+            )
+        ).all()
+    }
+    for row in rows.values():
+        db.refresh(row)
+    assert all(rows[job_id].processed for job_id in leased[:2])
+    failed = rows[leased[2]]
+    assert failed.dead_lettered
+    assert failed.attempts == 2
+    assert failed.last_error == "boom again"
+    assert failed.leased_by is None
+
+
+def test_lease_by_search_card(queued_job_ids, db: Session):
+    now = datetime.datetime.utcnow()
+    cards = {
+        queued_job_ids[0]: ("Data Engineer", now - datetime.timedelta(days=40)),
+        queued_job_ids[1]: ("Sales Manager", now - datetime.timedelta(days=1)),
+        queued_job_ids[2]: ("Senior Data Engineer", now - datetime.timedelta(days=2)),
+    }
+    for row in db.exec(
+        select(JobPostingsToScrape).where(
+            col(JobPostingsToScrape.linkedin_job_id).in_(queued_job_ids)
+        )
+    ).all():
+        row.title, row.date_posted = cards[row.linkedin_job_id]
+        db.add(row)
+    db.commit()
+
+    filtered = JobPostingsQueue(
+        consumer_id="consumer-1", title_pattern="data engineer", max_age_days=30
+    )
+    assert filtered.lease(3) == [queued_job_ids[2]]
+    # Newest first
+    assert JobPostingsQueue(consumer_id="consumer-2").lease(3) == [
+        queued_job_ids[1],
+        queued_job_ids[0],
+    ]
+
+
+def test_expired_lease_cannot_complete_or_fail(queued_job_ids, db: Session):
+    # The lease of the first consumer expires at once
+    first = JobPostingsQueue(consumer_id="consumer-1", lease_seconds=-1)
+    second = JobPostingsQueue(consumer_id="consumer-2")
+    leased = first.lease(3)
+    assert sorted(second.lease(3)) == sorted(leased)
+
+    first.complete(leased[:2])
+    first.fail(leased[2], "boom", permanent=True)
+
+    rows = db.exec(
+        select(JobPostingsToScrape).where(
+            col(JobPostingsToScrape.linkedin_job_id).in_(queued_job_ids)
+        )
+    ).all()
+    for row in rows:
+        db.refresh(row)
+        assert not row.processed
+        assert not row.dead_lettered
+        assert row.leased_by == "consumer-2"
+
+
+def test_closed_postings_are_skipped(queued_job_ids, db: Session):
+    closed = db.exec(
+        select(JobPostingsToScrape).where(
+            JobPostingsToScrape.linkedin_job_id == queued_job_ids[0]
+        )
+    ).one()
+    closed.closed = True
+    db.add(closed)
+    db.commit()
+
+    leased = JobPostingsQueue(consumer_id="consumer-1").lease(3)
+    assert sorted(leased) == queued_job_ids[1:]
+    everything = JobPostingsQueue(consumer_id="consumer-2", skip_closed=False)
+    assert everything.lease(3) == [queued_job_ids[0]]
@@ -0,0 +1,86 @@
+from unittest.mock import patch
+
+from app.scraper.extractors.job_posting_parser import hash_job_posting_fields
+from app.scraper.html_store import compress_html
+from app.scraper.job_postings_reextractor import (
+    JobPostingsReextractor,
+    _init_worker,
+    _reextract_batch,
+)
+from app.tests.scraper.test_job_extractor import HTML_CONTENT
+
+
+def test_reextract_batch():
+    _init_worker("lxml", "reextract.log")
+    results = _reextract_batch(
+        [
+            (1, "zlib", compress_html(HTML_CONTENT, "zlib")),
+            (2, "zlib", compress_html("<html></html>", "zlib")),
+        ]
+    )
+
+    (first_id, fields, error), (second_id, no_fields, second_error) = results
+    assert (first_id, error) == (1, None)
+    assert fields["title"] == "Lead Sales Engineer, Enterprise"
+    assert fields["job_functions"] == ["Sales", "Business Development"]
+    assert (second_id, no_fields) == (2, None)
+    assert second_error
+
+
+def test_checkpoint(tmp_path):
+    reextractor = JobPostingsReextractor(
+        checkpoint_path=str(tmp_path / "checkpoint.json")
+    )
+    assert reextractor.load_checkpoint() == 0
+    reextractor.save_checkpoint(1234)
+    assert reextractor.load_checkpoint() == 1234
+
+
+def test_only_changed_fields_are_written():
+    reextractor = JobPostingsReextractor(checkpoint_path=None)
+    currents = {
+        1: {"title": "Engineer", "industries": ["Banking"]},
+        2: {"title": "Analyst", "industries": ["Retail"]},
+    }
+    results = [
+        (1, {"title": "Engineer", "industries": ["Banking", "Insurance"]}, None),
+        (2, {"title": "Analyst", "industries": ["Retail"]}, None),
+        (3, None, "Job description not found"),
+    ]
+
+    with patch.object(JobPostingsReextractor, "write_changes") as write_changes:
+        updated, failed = reextractor._process_results(results, currents)
+
+    assert (updated, failed) == (1, 1)
+    write_changes.assert_called_once_with(
+        [
+            {
+                "id": 1,
+                "industries": ["Banking", "Insurance"],
+                "content_hash": hash_job_posting_fields(results[0][1]),
+            }
+        ]
+    )
+
+
+def test_changed_company_is_relinked():
+    reextractor = JobPostingsReextractor(checkpoint_path=None)
+    currents = {1: {"company_url": "www.linkedin.com/company/old"}}
+    results = [(1, {"company_url": "www.linkedin.com/company/new"}, None)]
+
+    with patch.object(JobPostingsReextractor, "write_changes") as write_changes:
+        reextractor._process_results(results, currents)
+
+    [changes] = write_changes.call_args.args
+    assert changes[0]["institution_id"] is None
+
+    with patch("app.scraper.job_postings_reextractor.Session") as session, patch(
+        "app.scraper.job_postings_reextractor.enqueue_companies"
+    ) as enqueue_companies, patch(
+        "app.scraper.job_postings_reextractor.link_institutions"
+    ) as link_institutions:
+        reextractor.write_changes(changes)
+
+    db = session.return_value.__enter__.return_value
+    enqueue_companies.assert_called_once_with(db, ["www.linkedin.com/company/new"])
+    link_institutions.assert_called_once_with(db, ["www.linkedin.com/company/new"])
@@ -0,0 +1,53 @@
+import threading
+import time
+
+from app.scraper.extractors.job_postings_extractor import JobPostingDataExtractor
+
+
+def test_stream_job_postings_bounds_pending_work():
+    extractor = JobPostingDataExtractor()
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    pulled = []
+
+    def fake_extract(job_id: str) -> int:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.001)
+        with lock:
+            in_flight -= 1
+        if job_id.endswith("7"):
+            raise ValueError(job_id)
+        return int(job_id)
+
+    def job_ids():
+        for job_id in range(100):
+            # The producer never runs further ahead than the pending window
+            assert len(pulled) - len(results) <= 4
+            pulled.append(job_id)
+            yield str(job_id)
+
+    results = []
+    extractor.extract_single_job_posting = fake_extract  # type: ignore
+    extracted = extractor.stream_job_postings(
+        job_ids(),
+        max_workers=2,
+        max_pending=4,
+        on_result=lambda job_id, result, error: results.append((job_id, result, error)),
+    )
+
+    assert extracted == 90
+    assert max_in_flight <= 2
+    assert sorted(int(job_id) for job_id, _, _ in results) == list(range(100))
+    failed = [job_id for job_id, result, error in results if error is not None]
+    assert sorted(failed, key=int) == [str(i) for i in range(7, 100, 10)]
+
+
+def test_extract_job_postings_returns_every_result():
+    extractor = JobPostingDataExtractor()
+    extractor.extract_single_job_posting = int  # type: ignore
+    assert sorted(extractor.extract_job_postings(["3", "1", "2"])) == [1, 2, 3]
+    assert extractor.extract_job_postings([]) == []
@@ -0,0 +1,68 @@
+from sqlalchemy import delete
+from sqlmodel import Session, col, select
+
+from app.models import JobPostings, JobPostingsToScrape
+from app.scraper.extractors.job_postings_extractor import JobPostingDataExtractor
+from app.tests.scraper.test_job_extractor import HTML_CONTENT
+
+TEST_JOB_IDS = ["990000000101", "990000000102"]
+
+
+def test_save_job_postings_upserts_and_marks_processed(db: Session):
+    extractor = JobPostingDataExtractor(parser="lxml")
+    fields = extractor.parse_job_posting(HTML_CONTENT)
+    for job_id in TEST_JOB_IDS:
+        db.add(JobPostingsToScrape(linkedin_job_id=int(job_id), leased_by="consumer-1"))
+    db.commit()
+
+    extractor.save_job_postings(
+        [(job_id, HTML_CONTENT, fields) for job_id in TEST_JOB_IDS]
+    )
+    first = db.exec(
+        select(JobPostings).where(JobPostings.linkedin_id == int(TEST_JOB_IDS[0]))
+    ).one()
+    first.summary = {"kept": True}
+    db.add(first)
+    db.commit()
+
+    # An unchanged posting is not written again
+    extractor.save_job_postings([(TEST_JOB_IDS[1], HTML_CONTENT, fields)])
+    # Scraping the posting again updates it in place and keeps the other columns
+    extractor.save_job_postings(
+        [(TEST_JOB_IDS[0], HTML_CONTENT, {**fields, "title": "Updated title"})]
+    )
+    assert extractor.write_stats == {"new": 2, "changed": 1, "unchanged": 1}
+
+    linkedin_ids = [int(job_id) for job_id in TEST_JOB_IDS]
+    job_postings = db.exec(
+        select(JobPostings).where(col(JobPostings.linkedin_id).in_(linkedin_ids))
+    ).all()
+    for job_posting in job_postings:
+        db.refresh(job_posting)
+    titles = {
+        job_posting.linkedin_id: job_posting.title for job_posting in job_postings
+    }
+    assert titles == {
+        linkedin_ids[0]: "Updated title",
+        linkedin_ids[1]: fields["title"],
+    }
+    db.refresh(first)
+    assert first.summary == {"kept": True}
+    assert first.html_hash is not None
+
+    scraped = db.exec(
+        select(JobPostingsToScrape).where(
+            col(JobPostingsToScrape.linkedin_job_id).in_(linkedin_ids)
+        )
+    ).all()
+    assert all(row.processed and row.leased_by is None for row in scraped)
+
+    db.execute(
+        delete(JobPostings).where(col(JobPostings.linkedin_id).in_(linkedin_ids))
+    )
+    db.execute(
+        delete(JobPostingsToScrape).where(
+            col(JobPostingsToScrape.linkedin_job_id).in_(linkedin_ids)
+        )
+    )
+    db.commit()
@@ -0,0 +1,54 @@
+import prometheus_client
+
+from app.scraper.metrics import (
+    ITEMS,
+    record_request,
+    set_backlog,
+    write_metrics_textfile,
+)
+
+
+def get_sample(name: str, labels: dict) -> float:
+    return prometheus_client.REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_record_request_counts_by_status():
+    before_ok = get_sample(
+        "scraper_requests_total", {"scraper": "test", "status": "200"}
+    )
+    before_error = get_sample(
+        "scraper_requests_total", {"scraper": "test", "status": "error"}
+    )
+    before_count = get_sample(
+        "scraper_request_duration_seconds_count", {"scraper": "test"}
+    )
+
+    record_request("test", 200, 0.2)
+    record_request("test", 200, 0.3)
+    record_request("test", None, 1.0)
+
+    assert (
+        get_sample("scraper_requests_total", {"scraper": "test", "status": "200"})
+        == before_ok + 2
+    )
+    assert (
+        get_sample("scraper_requests_total", {"scraper": "test", "status": "error"})
+        == before_error + 1
+    )
+    assert (
+        get_sample("scraper_request_duration_seconds_count", {"scraper": "test"})
+        == before_count + 3
+    )
+
+
+def test_metrics_textfile(tmp_path):
+    set_backlog("test", {"pending": 12, "failed": 3})
+    ITEMS.labels("test", "queued").inc(5)
+    path = tmp_path / "scraper.prom"
+
+    write_metrics_textfile(str(path))
+
+    content = path.read_text()
+    assert 'scraper_backlog_size{queue="test",state="pending"} 12.0' in content
+    assert 'scraper_backlog_size{queue="test",state="failed"} 3.0' in content
+    assert 'scraper_items_total{outcome="queued",scraper="test"}' in content
@@ -0,0 +1,85 @@
+import requests_mock
+
+from app.scraper.job_posting_publisher import JobIdsFetcher, QueryCheckpoint
+from app.scraper.known_ids import KnownJobIds
+
+test_base_url = "https://example.com?param=value"
+
+
+def make_page(first_id: int, size: int) -> str:
+    cards = "".join(
+        f'<li><div class="base-card" data-entity-urn="urn:li:jobPosting:{first_id + i}"></div></li>'
+        for i in range(size)
+    )
+    return f"<html><body><ul>{cards}</ul></body></html>"
+
+
+def test_checkpoint_advances_over_stored_pages_only():
+    checkpoint = QueryCheckpoint(test_base_url, start=0, ids_per_request=10)
+    checkpoint.add_page(10)
+    checkpoint.add_page(20)
+    # Page 0 is still in flight
+    assert not checkpoint.mark_stored()
+    assert checkpoint.resume_offset == 0
+
+    checkpoint.add_page(0)
+    checkpoint.add_page(40)
+    assert checkpoint.mark_stored()
+    assert checkpoint.resume_offset == 30
+
+
+def test_scrape_url_resumes_from_checkpoint(mocker):
+    mocker.patch.object(JobIdsFetcher, "load_resume_offset", return_value=20)
+    save_resume_offset = mocker.patch.object(JobIdsFetcher, "save_resume_offset")
+    mocker.patch.object(
+        JobIdsFetcher, "run_job_cards_to_db", side_effect=lambda cards: len(cards)
+    )
+    job_ids_fetcher = JobIdsFetcher(
+        job_ids_fetch_workers=1, ids_per_request=10, db_batch_size=10
+    )
+    with requests_mock.Mocker() as m:
+        m.get(f"{test_base_url}&start=20", text=make_page(20, 10))
+        m.get(f"{test_base_url}&start=30", text=make_page(30, 4))
+
+        assert job_ids_fetcher.scrape_url(test_base_url) == 14
+
+    assert [request.qs["start"] for request in m.request_history] == [["20"], ["30"]]
+    assert save_resume_offset.call_args_list == [
+        mocker.call(test_base_url, 30),
+        mocker.call(test_base_url, 40),
+        mocker.call(test_base_url, None),
+    ]
+
+
+def test_incremental_scrape_ignores_checkpoint(mocker):
+    load_resume_offset = mocker.patch.object(JobIdsFetcher, "load_resume_offset")
+    save_resume_offset = mocker.patch.object(JobIdsFetcher, "save_resume_offset")
+    mocker.patch.object(JobIdsFetcher, "run_job_cards_to_db", return_value=0)
+    job_ids_fetcher = JobIdsFetcher(job_ids_fetch_workers=1, ids_per_request=10)
+    with requests_mock.Mocker() as m:
+        m.get(f"{test_base_url}&start=0", text=make_page(0, 3))
+
+        job_ids_fetcher.scrape_url(test_base_url, known_job_ids=KnownJobIds([]))
+
+    load_resume_offset.assert_not_called()
+    save_resume_offset.assert_not_called()
+
+
+def test_failed_page_keeps_checkpoint(mocker):
+    mocker.patch.object(JobIdsFetcher, "load_resume_offset", return_value=None)
+    save_resume_offset = mocker.patch.object(JobIdsFetcher, "save_resume_offset")
+    mocker.patch.object(
+        JobIdsFetcher, "run_job_cards_to_db", side_effect=lambda cards: len(cards)
+    )
+    job_ids_fetcher = JobIdsFetcher(
+        job_ids_fetch_workers=1, ids_per_request=10, db_batch_size=10, max_retries=1
+    )
+    with requests_mock.Mocker() as m:
+        m.get(f"{test_base_url}&start=0", text=make_page(0, 10))
+        m.get(f"{test_base_url}&start=10", status_code=403)
+
+        assert job_ids_fetcher.scrape_url(test_base_url) == 10
+
+    assert m.call_count == 2
+    # The run is not complete, the next one resumes at the failed page
+    assert save_resume_offset.call_args_list == [mocker.call(test_base_url, 10)]
@@ -0,0 +1,127 @@
+import asyncio
+from collections.abc import Callable
+
+import requests_mock
+
+from app.models import (
+    ExperienceLevelsEnum,
+    RemoteModalitiesEnum,
+    SalaryRangeFiltersEnum,
+    TimeFiltersEnum,
+)
+from app.scraper.job_posting_publisher import JobIdsFetcher, PaginationState
+from app.scraper.query_planner import QueryPlanner
+
+test_base_url = "https://example.com?param=value"
+query = {"keywords": "Data Engineer", "location": "Washington DC"}
+
+
+class ProbedJobIdsFetcher(JobIdsFetcher):
+    """Answers the saturation probes from a predicate on the search URL"""
+
+    def __init__(self, is_saturated: Callable[[str], bool]):
+        super().__init__(jobs_base_url="https://example.com/search")
+        self.is_saturated = is_saturated
+        self.probed: list[tuple[str, int]] = []
+
+    async def get_job_ids_with_check_async(self, fetch_engine, url, start):
+        self.probed.append((url, start))
+        if self.is_saturated(url):
+            return [str(job_id) for job_id in range(self.ids_per_request)], False
+        return [], True
+
+
+def plan(is_saturated: Callable[[str], bool]) -> tuple[list[dict], QueryPlanner]:
+    planner = QueryPlanner(ProbedJobIdsFetcher(is_saturated))
+    return asyncio.run(planner.plan(None, query)), planner  # type: ignore
+
+
+def test_unsaturated_query_is_kept():
+    queries, planner = plan(lambda url: False)
+    assert queries == [query]
+    assert planner.probes == 1
+    assert planner.job_ids_fetcher.probed[0][1] == 990  # type: ignore
+
+
+def test_saturated_query_is_partitioned():
+    entry_level = ExperienceLevelsEnum.ENTRY_LEVEL
+    entry_level_param = entry_level.get_query_param(
+        entry_level.value, "f_E=", value_index=0
+    )
+    # Only the entry level part is still capped, by remote modality it is not
+    queries, _ = plan(
+        lambda url: "f_E=" not in url
+        or (entry_level_param in url and "f_WT=" not in url)
+    )
+
+    # Postings without an experience level are only in the saturated query
+    assert queries[0] == query
+    assert len(queries) == 1 + len(ExperienceLevelsEnum) - 1 + len(RemoteModalitiesEnum)
+    assert {query.get("experience_level") for query in queries} == {
+        None,
+        *ExperienceLevelsEnum,
+    }
+    assert [
+        query.get("remote_modality")
+        for query in queries
+        if query.get("experience_level") == entry_level
+    ] == list(RemoteModalitiesEnum)
+
+
+def test_nested_filters_keep_the_saturated_query():
+    # Partitions do not help, the past week is the widest uncapped time filter
+    queries, _ = plan(
+        lambda url: "f_TPR=r604800" not in url and "f_TPR=r86400" not in url
+    )
+    capped = {
+        **query,
+        "experience_level": ExperienceLevelsEnum.INTERNSHIP,
+        "remote_modality": RemoteModalitiesEnum.ON_SITE,
+    }
+    # Every posting has a workplace type, the internship query is not kept
+    assert queries[0] == query
+    queries = queries[1:]
+    # The past month is capped and split by salary before the past week
+    assert queries[: len(SalaryRangeFiltersEnum) + 2] == [
+        capped,
+        {**capped, "time_filter": TimeFiltersEnum.PAST_MONTH},
+        *[
+            {
+                **capped,
+                "time_filter": TimeFiltersEnum.PAST_MONTH,
+                "salary_range": salary,
+            }
+            for salary in SalaryRangeFiltersEnum
+        ],
+    ]
+    assert queries[len(SalaryRangeFiltersEnum) + 2] == {
+        **capped,
+        "time_filter": TimeFiltersEnum.PAST_WEEK,
+    }
+    assert not any(
+        query.get("time_filter") == TimeFiltersEnum.PAST_24_HOURS for query in queries
+    )
+
+
+def test_query_without_filters_left_stays_capped():
+    planner = QueryPlanner(ProbedJobIdsFetcher(lambda url: True), dimensions=())
+    assert asyncio.run(planner.plan(None, query)) == [query]  # type: ignore
+
+
+def test_pagination_stops_at_results_cap():
+    pagination = PaginationState(ids_per_request=10, results_cap=30)
+    assert pagination.can_issue(20)
+    assert not pagination.can_issue(30)
+
+    job_ids_fetcher = JobIdsFetcher(
+        job_ids_fetch_workers=5, ids_per_request=1, search_results_cap=3
+    )
+    page = (
+        '<li><div class="base-card" data-entity-urn="urn:li:jobPosting:1"></div></li>'
+    )
+    with requests_mock.Mocker() as m:
+        m.get(requests_mock.ANY, text=page)
+        pages = list(job_ids_fetcher.iter_job_ids(test_base_url))
+
+    assert sorted(offset for offset, _ in pages) == [0, 1, 2]
+    assert m.call_count == 3
@@ -0,0 +1,81 @@
+import datetime
+
+import pytest
+from sqlmodel import Session, select
+
+from app.models import JobPostingQueries
+from app.scraper.query_scheduler import QueryScheduler
+
+
+@pytest.fixture
+def scheduler():
+    return QueryScheduler(
+        min_refresh_interval_minutes=15,
+        max_refresh_interval_minutes=240,
+        high_yield_new_ids=50,
+    )
+
+
+@pytest.mark.parametrize(
+    "current_interval, new_ids, expected",
+    [
+        (60, 0, 120),
+        (60, 10, 60),
+        (60, 50, 30),
+        (20, 100, 15),
+        (200, 0, 240),
+    ],
+)
+def test_next_refresh_interval(scheduler, current_interval, new_ids, expected):
+    assert scheduler.next_refresh_interval(current_interval, new_ids) == expected
+
+
+def test_register_and_schedule_query(scheduler, db: Session):
+    query = {"keywords": "scheduler test keyword", "location": "Nowhere"}
+    (url,) = scheduler.register_queries([query], refresh_interval_minutes=60)
+    # Registering the same query again does not duplicate it
+    scheduler.register_queries([query], refresh_interval_minutes=30, priority=5)
+
+    rows = db.exec(select(JobPostingQueries).where(JobPostingQueries.url == url)).all()
+    assert len(rows) == 1
+    registered = rows[0]
+    assert registered.refresh_interval_minutes == 60
+    assert registered.priority == 0
+    assert registered.id in [due.id for due in scheduler.get_due_queries()]
+
+    started_at = datetime.datetime.utcnow()
+    scheduler.record_run(registered.id, started_at, 1.5, new_ids=0)
+    db.refresh(registered)
+    assert registered.total_runs == 1
+    assert registered.last_run_new_ids == 0
+    assert registered.refresh_interval_minutes == 120
+    assert registered.next_run_at == started_at + datetime.timedelta(minutes=120)
+    assert registered.id not in [due.id for due in scheduler.get_due_queries()]
+
+    db.delete(registered)
+    db.commit()
+
+
+def test_due_query_is_claimed_once(db: Session):
+    first = QueryScheduler(claim_seconds=60)
+    second = QueryScheduler(claim_seconds=60)
+    (url,) = first.register_queries(
+        [{"keywords": "scheduler claim test keyword", "location": "Nowhere"}]
+    )
+    registered = db.exec(
+        select(JobPostingQueries).where(JobPostingQueries.url == url)
+    ).one()
+
+    claimed = [due.id for due in first.get_due_queries()]
+    assert registered.id in claimed
+    assert registered.id not in [due.id for due in second.get_due_queries()]
+
+    # The claim of a scheduler that never recorded the run runs out
+    db.refresh(registered)
+    registered.next_run_at = datetime.datetime.utcnow()
+    db.add(registered)
+    db.commit()
+    assert registered.id in [due.id for due in second.get_due_queries()]
+
+    db.delete(registered)
+    db.commit()
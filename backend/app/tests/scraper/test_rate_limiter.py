@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from app.scraper.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+
+
+@pytest.fixture
+def rate_limiter():
+    return AdaptiveRateLimiter(
+        name="test", initial_rate=10.0, initial_concurrency=4, max_pause=5.0
+    )
+
+
+@pytest.mark.parametrize(
+    "value, max_wait, expected",
+    [
+        (None, None, None),
+        ("", None, None),
+        ("12", None, 12.0),
+        ("120", 30, 30),
+        ("not a date", None, None),
+    ],
+)
+def test_parse_retry_after(value, max_wait, expected):
+    assert parse_retry_after(value, max_wait=max_wait) == expected
+
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    seconds = parse_retry_after(format_datetime(retry_at, usegmt=True))
+    assert 25 <= seconds <= 30
+
+
+def test_throttle_decreases_rate_and_pauses(rate_limiter):
+    rate_limiter.acquire()
+    rate_limiter.release(429, retry_after=2.0)
+    stats = rate_limiter.stats()
+    assert stats["rate"] == 5.0
+    assert stats["concurrency_limit"] == 2
+    assert stats["throttles"] == 1
+    assert 1.5 < stats["paused_for"] <= 2.0
+    assert rate_limiter._try_acquire() > 1.5
+
+
+def test_throttles_from_the_same_event_decrease_once(rate_limiter):
+    for _ in range(3):
+        rate_limiter.acquire()
+    for _ in range(3):
+        rate_limiter.release(429, retry_after=1.0)
+    assert rate_limiter.current_rate == 5.0
+    assert rate_limiter.stats()["throttles"] == 3
+
+
+def test_retry_after_is_capped(rate_limiter):
+    rate_limiter.acquire()
+    rate_limiter.release(429, retry_after=600.0)
+    assert rate_limiter.stats()["paused_for"] <= 5.0
+
+
+def test_success_increases_rate(rate_limiter):
+    rate_limiter.acquire()
+    rate_limiter.release(200)
+    assert rate_limiter.current_rate > 10.0
+    assert rate_limiter.stats()["successes"] == 1
+
+
+def test_errors_do_not_change_rate(rate_limiter):
+    rate_limiter.acquire()
+    rate_limiter.release(None)
+    rate_limiter.acquire()
+    rate_limiter.release(500)
+    assert rate_limiter.current_rate == 10.0
+    assert rate_limiter.stats()["in_flight"] == 0
+
+
+def test_concurrency_limit(rate_limiter):
+    rate_limiter._tokens = 10.0
+    for _ in range(4):
+        assert rate_limiter._try_acquire() == 0.0
+    assert rate_limiter._try_acquire() > 0
+    rate_limiter.release(200)
+    assert rate_limiter._try_acquire() == 0.0
+
+
+def test_acquire_async(rate_limiter):
+    async def run():
+        for _ in range(3):
+            await rate_limiter.acquire_async()
+            rate_limiter.release(200)
+
+    asyncio.run(run())
+    assert rate_limiter.stats()["successes"] == 3
@@ -0,0 +1,153 @@
+import pytest
+import requests_mock
+
+from app.scraper.extractors.job_postings_extractor import JobPostingDataExtractor
+from app.scraper.job_posting_publisher import JobIdsFetcher
+from app.scraper.rate_limiter import AdaptiveRateLimiter
+from app.scraper.request_policy import (
+    PERMANENT,
+    SUCCESS,
+    THROTTLED,
+    TRANSIENT,
+    CircuitBreaker,
+    RequestFailed,
+    RequestPolicy,
+    backoff_seconds,
+    classify,
+)
+
+job_posting_base_url = "https://example.com/jobPosting/"
+
+
+@pytest.fixture
+def request_policy():
+    return RequestPolicy(backoff_base=0.001, backoff_max=0.01, reset_timeout=0.05)
+
+
+@pytest.fixture
+def extractor(request_policy):
+    return JobPostingDataExtractor(
+        job_posting_base_url=job_posting_base_url,
+        maximum_retries=3,
+        rate_limiter=AdaptiveRateLimiter(name="test", initial_rate=100.0),
+        request_policy=request_policy,
+    )
+
+
+@pytest.mark.parametrize(
+    "status_code, expected",
+    [
+        (200, SUCCESS),
+        (429, THROTTLED),
+        (404, PERMANENT),
+        (410, PERMANENT),
+        (408, TRANSIENT),
+        (503, TRANSIENT),
+        (None, TRANSIENT),
+    ],
+)
+def test_classify(status_code, expected):
+    assert classify(status_code) == expected
+
+
+def test_backoff_is_bounded():
+    for attempt in range(10):
+        assert 0 <= backoff_seconds(attempt, base=1.0, cap=8.0) <= min(8.0, 2**attempt)
+
+
+def test_backoff_only_for_transient_failures(request_policy):
+    assert request_policy.backoff(THROTTLED, 3) == 0
+    assert request_policy.backoff(PERMANENT, 3) == 0
+    assert 0 <= request_policy.backoff(TRANSIENT, 3) <= 0.01
+
+
+def test_circuit_opens_and_recovers():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+
+    breaker.record(TRANSIENT)
+    breaker.record(PERMANENT)
+    breaker.record(TRANSIENT)
+    assert not breaker.is_open
+    breaker.record(TRANSIENT)
+    assert breaker.is_open
+    assert 0 < breaker.try_acquire() <= 0.05
+
+    # A single trial request once the timeout has elapsed, it fails
+    breaker.wait()
+    assert breaker.try_acquire() > 0
+    breaker.record(TRANSIENT)
+    assert 0.05 < breaker.try_acquire() <= 0.1
+
+    breaker.wait()
+    breaker.record(SUCCESS)
+    assert not breaker.is_open
+    assert breaker.try_acquire() == 0
+    assert breaker.stats()["times_opened"] == 2
+
+
+def test_throttling_does_not_open_the_circuit():
+    breaker = CircuitBreaker("test", failure_threshold=1)
+    breaker.record(THROTTLED)
+    assert not breaker.is_open
+
+
+def test_circuit_breakers_are_per_host(request_policy):
+    for _ in range(request_policy.failure_threshold):
+        request_policy.record("https://down.example.com/a", 503)
+
+    assert request_policy.circuit_breaker("https://down.example.com/b").is_open
+    assert not request_policy.circuit_breaker("https://example.com/a").is_open
+
+
+def test_missing_job_posting_is_not_retried(extractor):
+    with requests_mock.Mocker() as m:
+        m.get(job_posting_base_url + "1", text="not found", status_code=404)
+        with pytest.raises(RequestFailed) as exc_info:
+            extractor.fetch_job_posting("1")
+
+    assert exc_info.value.permanent
+    assert m.call_count == 1
+
+
+def test_server_errors_are_retried(extractor):
+    with requests_mock.Mocker() as m:
+        m.get(
+            job_posting_base_url + "1",
+            [
+                {"text": "unavailable", "status_code": 503},
+                {"text": "unavailable", "status_code": 503},
+                {"text": "<html></html>", "status_code": 200},
+            ],
+        )
+        assert extractor.fetch_job_posting("1") == "<html></html>"
+
+    assert m.call_count == 3
+
+
+def test_server_errors_fail_after_maximum_retries(extractor):
+    with requests_mock.Mocker() as m:
+        m.get(job_posting_base_url + "1", text="unavailable", status_code=503)
+        with pytest.raises(RequestFailed) as exc_info:
+            extractor.fetch_job_posting("1")
+
+    assert not exc_info.value.permanent
+    assert m.call_count == extractor.maximum_retries
+
+
+def test_job_ids_request_waits_for_open_circuit():
+    url = "https://example.com/search"
+    job_ids_fetcher = JobIdsFetcher(
+        max_retries=3,
+        rate_limiter=AdaptiveRateLimiter(name="test", initial_rate=100.0),
+        request_policy=RequestPolicy(
+            backoff_base=0.001, failure_threshold=1, reset_timeout=0.05
+        ),
+    )
+    with requests_mock.Mocker() as m:
+        m.get(url, [{"status_code": 500}, {"status_code": 200, "text": "ok"}])
+        assert job_ids_fetcher.perform_request(url).text == "ok"
+        m.get(url, status_code=403)
+        assert job_ids_fetcher.perform_request(url) is None
+
+    assert m.call_count == 3
+    assert job_ids_fetcher.request_policy.stats()[0]["times_opened"] == 1
@@ -0,0 +1,50 @@
+import pytest
+import requests
+
+from app.scraper.benchmark.run_benchmark import (
+    benchmark_job_ids_fetcher,
+    benchmark_job_postings_extractor,
+)
+from app.scraper.benchmark.standin_server import LinkedInStandIn
+
+
+@pytest.fixture
+def standin():
+    with LinkedInStandIn(total_results=35, latency=0.0, jitter=0.0) as standin:
+        yield standin
+
+
+def test_search_pagination(standin):
+    url = f"{standin.search_url}?keywords=data%20engineer"
+    first_page = requests.get(f"{url}&start=0")
+    last_page = requests.get(f"{url}&start=30")
+    past_the_end = requests.get(f"{url}&start=40")
+    other_search = requests.get(f"{standin.search_url}?keywords=analyst&start=0")
+
+    assert first_page.text.count("urn:li:jobPosting:") == 10
+    assert last_page.text.count("urn:li:jobPosting:") == 5
+    assert past_the_end.status_code == 200 and past_the_end.text == ""
+    assert other_search.text != first_page.text
+
+
+def test_throttling_is_injected():
+    with LinkedInStandIn(latency=0.0, jitter=0.0, throttle_probability=1.0) as standin:
+        response = requests.get(standin.job_posting_url + "1")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert standin.stats["throttled"] == 1
+
+
+def test_benchmark_job_ids_fetcher(standin):
+    result = benchmark_job_ids_fetcher(standin, workers=4)
+
+    assert result["items"] == 35
+    assert result["items_per_second"] > 0
+
+
+def test_benchmark_job_postings_extractor(standin):
+    result = benchmark_job_postings_extractor(standin, workers=4, job_postings=12)
+
+    assert result["items"] == 12
+    assert result["requests"] == 12